@@ -0,0 +1,192 @@
+import logging
+from contextlib import contextmanager
+from functools import partial
+from threading import Lock
+from typing import Dict, Iterator, List, Set, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Field, Model
+
+from analytics.signals import ingested
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class BulkLogic:
+    """
+    Business logic related to bulk inserts.
+
+    Rows reference related rows by plain ids, which are validated with
+    one query per related model. Valid rows are inserted in batches
+    inside a single transaction, and the ingested signal replaces the
+    post_save signals that bulk_create does not send. Creation times
+    given in the rows are written as given, rather than the time of
+    the insert.
+    """
+
+    LOCK: Lock = Lock()
+
+    REQUIRED: str = "This field is required."
+    INVALID: str = 'Invalid pk "{}" - object does not exist.'
+    INCORRECT: str = "Incorrect type. Expected pk value, received {}."
+
+    def __init__(self, model: type, fields: List[str]) -> None:
+        """
+        Bulk Logic constructor.
+        """
+        self.model: type = model
+        self.fields: List[Field] = [
+            model._meta.get_field(name) for name in fields
+        ]
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.model.__name__}>"
+
+    def clean(
+        self, data: Dict
+    ) -> Tuple[Dict[str, object], Dict[str, List[str]]]:
+        """
+        Cleans the fields of a row, leaving related ids unchecked.
+        """
+        values: Dict[str, object] = {}
+        errors: Dict[str, List[str]] = {}
+        for field in self.fields:
+            if field.name not in data:
+                if not field.null and not field.has_default():
+                    errors[field.name] = [self.REQUIRED]
+                continue
+            value: object = data[field.name]
+            if field.is_relation and value is not None:
+                if (
+                    isinstance(value, bool)
+                    or not str(value).isdigit()
+                ):
+                    errors[field.name] = [
+                        self.INCORRECT.format(type(value).__name__)
+                    ]
+                else:
+                    values[field.attname] = int(value)
+                continue
+            try:
+                values[field.attname] = field.clean(value, None)
+            except ValidationError as error:
+                errors[field.name] = error.messages
+        return values, errors
+
+    def check(
+        self, rows: List[object]
+    ) -> Tuple[List[Tuple[int, Dict]], Dict[int, Dict]]:
+        """
+        Returns the rows with valid fields with their index, and the
+        errors of the invalid rows by index, without any query.
+        """
+        valid: List[Tuple[int, Dict[str, object]]] = []
+        errors: Dict[int, Dict[str, List[str]]] = {}
+        for index, data in enumerate(rows):
+            if not isinstance(data, dict):
+                errors[index] = {
+                    "non_field_errors": [
+                        "Invalid data. Expected a dictionary."
+                    ]
+                }
+                continue
+            values, row_errors = self.clean(data)
+            if row_errors:
+                errors[index] = row_errors
+            else:
+                valid.append((index, values))
+        return valid, errors
+
+    def validate(
+        self, rows: List[object]
+    ) -> Tuple[List[Tuple[int, Dict]], Dict[int, Dict]]:
+        """
+        Returns the valid rows with their index, and the errors of the
+        invalid rows by index.
+        """
+        valid, errors = self.check(rows)
+        for field in self.fields:
+            if not field.is_relation:
+                continue
+            ids: Set[int] = {
+                values[field.attname]
+                for _, values in valid
+                if values.get(field.attname) is not None
+            }
+            existing: Set[int] = set(
+                field.related_model._default_manager.filter(
+                    pk__in=ids
+                ).values_list("pk", flat=True)
+            )
+            for index, values in valid:
+                pk: int = values.get(field.attname)
+                if pk is not None and pk not in existing:
+                    errors.setdefault(index, {})[field.name] = [
+                        self.INVALID.format(pk)
+                    ]
+        valid: List[Tuple[int, Dict[str, object]]] = [
+            (index, values)
+            for index, values in valid
+            if index not in errors
+        ]
+        return valid, errors
+
+    @contextmanager
+    def keep(self, instances: List[Model]) -> Iterator[None]:
+        """
+        Keeps the values of the auto_now_add fields of some instances
+        while they are inserted. The fields are shared by every thread,
+        so other instances still get the time of their insert.
+        """
+        kept: Set[int] = {id(instance) for instance in instances}
+        stamped: List[Field] = [
+            field
+            for field in self.fields
+            if getattr(field, "auto_now_add", False)
+        ]
+
+        def pre_save(
+            field: Field, instance: Model, add: bool
+        ) -> object:
+            value: object = getattr(instance, field.attname)
+            if id(instance) in kept and value is not None:
+                return value
+            return type(field).pre_save(field, instance, add)
+
+        with self.LOCK:
+            for field in stamped:
+                field.pre_save = partial(pre_save, field)
+            try:
+                yield
+            finally:
+                for field in stamped:
+                    del field.pre_save
+
+    def create(
+        self, rows: List[object]
+    ) -> Tuple[List[Model], Dict[int, Dict]]:
+        """
+        Inserts the valid rows in batches inside one transaction, and
+        returns the inserted instances and the errors of the invalid
+        rows by index.
+        """
+        valid, errors = self.validate(rows)
+        instances: List[Model] = [
+            self.model(**values) for _, values in valid
+        ]
+        if instances:
+            with transaction.atomic():
+                with self.keep(instances):
+                    self.model.objects.bulk_create(
+                        instances, batch_size=settings.BULK_BATCH_SIZE
+                    )
+                ingested.send(sender=self.model, instances=instances)
+        logger.debug(
+            "Created: %s %s %s", self, len(instances), len(errors)
+        )
+        return instances, errors
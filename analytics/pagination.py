@@ -0,0 +1,142 @@
+import logging
+from base64 import b64decode, b64encode
+from binascii import Error
+from datetime import datetime
+from typing import Dict, List, Tuple, Union
+
+from django.db.models import Model, Q
+from django.db.models.query import QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination on creation time and primary key.
+
+    Each page is read with a range query that starts after the last
+    row of the previous page, so next cursors stay stable under
+    concurrent inserts and no page reads the rows before it.
+    """
+
+    cursor_query_param: str = "cursor"
+    page_size_query_param: str = "page_size"
+    page_size: int = api_settings.PAGE_SIZE
+    max_page_size: int = 1000
+    invalid_cursor_message: str = "Invalid cursor"
+
+    def get_page_size(self, request: Request) -> int:
+        """
+        Returns the requested page size, up to the maximum.
+        """
+        size: str = request.query_params.get(
+            self.page_size_query_param, ""
+        )
+        if size.isdigit() and int(size):
+            return min(int(size), self.max_page_size)
+        return self.page_size
+
+    def encode_cursor(self, row: Union[Model, Dict]) -> str:
+        """
+        Encodes the position of a row, or of a row of values, as an
+        opaque cursor.
+        """
+        created_at, pk = (
+            (row["created_at"], row["id"])
+            if isinstance(row, dict)
+            else (row.created_at, row.pk)
+        )
+        return b64encode(
+            f"{created_at.isoformat()}|{pk}".encode()
+        ).decode()
+
+    def decode_cursor(self, request: Request) -> Tuple[datetime, int]:
+        """
+        Decodes the position of the requested cursor, if any.
+        """
+        cursor: str = request.query_params.get(
+            self.cursor_query_param, ""
+        )
+        if not cursor:
+            return None
+        try:
+            created_at, pk = (
+                b64decode(cursor.encode(), validate=True)
+                .decode()
+                .split("|")
+            )
+            return datetime.fromisoformat(created_at), int(pk)
+        except (Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view: APIView = None,
+    ) -> List[Union[Model, Dict]]:
+        """
+        Returns the rows of the requested page, ordered by creation
+        time and primary key.
+        """
+        self.request: Request = request
+        size: int = self.get_page_size(request)
+        position: Tuple[datetime, int] = self.decode_cursor(request)
+        queryset: QuerySet = queryset.order_by("created_at", "pk")
+        if position:
+            created_at, pk = position
+            queryset: QuerySet = queryset.filter(
+                Q(created_at__gt=created_at)
+                | Q(created_at=created_at, pk__gt=pk)
+            )
+        rows: List[Union[Model, Dict]] = list(queryset[: size + 1])
+        self.next: str = (
+            self.encode_cursor(rows[size - 1])
+            if len(rows) > size
+            else None
+        )
+        logger.debug("Page: %s %s %s", self, position, size)
+        return rows[:size]
+
+    def get_next_link(self) -> str:
+        """
+        Returns the URL of the next page, if any.
+        """
+        if self.next is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next,
+        )
+
+    def get_paginated_response(self, data: List[Dict]) -> Response:
+        """
+        Returns a page of serialized rows with the next page URL.
+        """
+        return Response(
+            {"next": self.get_next_link(), "results": data}
+        )
+
+    def get_paginated_response_schema(self, schema: Dict) -> Dict:
+        """
+        Returns the schema of a paginated response.
+        """
+        return {
+            "type": "object",
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
@@ -0,0 +1,36 @@
+import json
+from typing import Dict, List
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline delimited JSON into a list of rows.
+    """
+
+    media_type: str = "application/x-ndjson"
+
+    def parse(
+        self,
+        stream: object,
+        media_type: str = None,
+        parser_context: Dict = None,
+    ) -> List[object]:
+        """
+        Parses one JSON value per non-empty line.
+        """
+        rows: List[object] = []
+        if stream is None:
+            return rows
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as error:
+                raise ParseError(
+                    f"NDJSON parse error - line {number}: {error}"
+                )
+        return rows
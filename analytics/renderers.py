@@ -0,0 +1,143 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class Echo:
+    """
+    File-like object that returns what is written to it, so rows can
+    be formatted one at a time.
+    """
+
+    def write(self, value: str) -> str:
+        """
+        Returns the written value.
+        """
+        return value
+
+
+class RowRenderer(BaseRenderer, ABC):
+    """
+    Renders rows of values one at a time, so large exports can be
+    streamed.
+    """
+
+    charset: str = "utf-8"
+
+    @classmethod
+    def get_value(cls, value: object) -> object:
+        """
+        Formats dates as ISO 8601 and decimals as strings, like the
+        JSON API does.
+        """
+        if isinstance(value, datetime):
+            text: str = value.isoformat()
+            return (
+                text[:-6] + "Z" if text.endswith("+00:00") else text
+            )
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    @abstractmethod
+    def stream(
+        self, rows: Iterable[Dict], fields: List[str]
+    ) -> Iterator[str]:
+        """
+        Serializes rows one line at a time.
+        """
+
+    def render(
+        self,
+        data: object,
+        accepted_media_type: str = None,
+        renderer_context: Dict = None,
+    ) -> bytes:
+        """
+        Renders a row or a list of rows.
+        """
+        rows: List[Dict] = data if isinstance(data, list) else [data]
+        fields: List[str] = list(rows[0]) if rows else []
+        return "".join(self.stream(rows, fields)).encode(self.charset)
+
+
+class NDJSONRenderer(RowRenderer):
+    """
+    Renders rows as newline delimited JSON.
+    """
+
+    media_type: str = "application/x-ndjson"
+    format: str = "ndjson"
+
+    def stream(
+        self, rows: Iterable[Dict], fields: List[str]
+    ) -> Iterator[str]:
+        """
+        Serializes rows one line at a time.
+        """
+        for row in rows:
+            yield json.dumps(row, default=self.get_value) + "\n"
+
+
+class CSVRenderer(RowRenderer):
+    """
+    Renders rows as CSV, with a header row.
+    """
+
+    media_type: str = "text/csv"
+    format: str = "csv"
+
+    def stream(
+        self, rows: Iterable[Dict], fields: List[str]
+    ) -> Iterator[str]:
+        """
+        Serializes a header and then rows one line at a time.
+        """
+        writer: csv.DictWriter = csv.DictWriter(
+            Echo(), fieldnames=fields, extrasaction="ignore"
+        )
+        yield writer.writeheader()
+        for row in rows:
+            yield writer.writerow(
+                {
+                    key: self.get_value(value)
+                    for key, value in row.items()
+                }
+            )
+
+
+class FlatJSONEncoder(JSONEncoder):
+    """
+    JSON encoder that keeps decimals as strings, like the serializers
+    do.
+    """
+
+    def default(self, value: object) -> object:
+        """
+        Formats decimals as strings.
+        """
+        if isinstance(value, Decimal):
+            return str(value)
+        return super().default(value)
+
+
+class FlatJSONRenderer(JSONRenderer):
+    """
+    Renders lists of plain values, with related rows as primary keys
+    instead of hyperlinks.
+
+    Selected with ?format=flat or
+    Accept: application/vnd.analytics.flat+json.
+    """
+
+    media_type: str = "application/vnd.analytics.flat+json"
+    format: str = "flat"
+    encoder_class: type = FlatJSONEncoder
@@ -16,7 +16,9 @@ from typing import Any, Dict, List
 
 BASE_DIR: str = Path(__file__).resolve().parent.parent
 
-SECRET_KEY: str = "django-insecure-26bol5n4brr!k79%qu*)3v*s*ld^3aw^nogtu4mzdxdoo8o5^g"
+SECRET_KEY: str = (
+    "django-insecure-26bol5n4brr!k79%qu*)3v*s*ld^3aw^nogtu4mzdxdoo8o5^g"
+)
 
 DEBUG: bool = True
 
@@ -32,12 +34,10 @@ INSTALLED_APPS: List[str] = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-
     # Django third-party libraries.
     "rest_framework",
     "wrapwith",
     "mathfilters",
-
     # Application blueprints.
     "clients",
     "audiences",
@@ -52,6 +52,11 @@ INSTALLED_APPS: List[str] = [
     "subscriptions",
     "products",
     "reports",
+    "rollups",
+    "snapshots",
+    "cubes",
+    "searches",
+    "sketches",
 ]
 
 MIDDLEWARE: List[str] = [
@@ -128,15 +133,18 @@ STATICFILES_DIRS: List[str] = [
 DEFAULT_AUTO_FIELD: str = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK: Dict[str, Any] = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "analytics.pagination.KeysetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
-    'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
-    ]
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.BasicAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "reports": "600/minute",
+    },
 }
 
 LOGGING: Dict[str, Any] = {
@@ -170,5 +178,43 @@ LOGGING: Dict[str, Any] = {
     },
 }
 
-LOGIN_REDIRECT_URL: str = 'dashboard'
-LOGIN_URL: str = 'rest_framework:login'
+# Report cache versions are bumped by web workers and by management
+# commands, so they live in the database, shared by every process and
+# host. The table is created by the createcachetable command. Versions
+# hold one key per written day and must never be culled.
+CACHES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(os.sep, "tmp", "analytics-cache"),
+        "OPTIONS": {
+            "MAX_ENTRIES": 10000,
+        },
+    },
+    "versions": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "analytics_versions",
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": 1000000,
+        },
+    },
+}
+
+REPORT_LOGIC: str = "reports.logic.ReportLogic"
+REPORT_CACHE_TIMEOUT: int = 3600
+REPORT_WORKERS: int = 16
+REPORT_TIMEOUT: float = 10.0
+
+SNAPSHOT_INTERVAL: float = 1.0
+SNAPSHOT_TIMEOUT: int = 3600
+
+BULK_MAX_ROWS: int = 10000
+BULK_BATCH_SIZE: int = 1000
+
+EVENT_BUFFER_SIZE: int = 100000
+EVENT_BUFFER_BATCH: int = 5000
+EVENT_BUFFER_INTERVAL: float = 1.0
+EVENT_BUFFER_SPOOL: str = None
+
+LOGIN_REDIRECT_URL: str = "dashboard"
+LOGIN_URL: str = "rest_framework:login"
@@ -0,0 +1,13 @@
+"""
+Bulk write signals.
+"""
+
+from django.dispatch import Signal
+
+# Sent with the instances of a bulk insert, since bulk_create does not
+# send post_save.
+ingested: Signal = Signal()
+
+# Sent with start and end days after rows derived from the events or
+# subscriptions of a date range are rebuilt outside their save signals.
+refreshed: Signal = Signal()
@@ -9,6 +9,7 @@ import campaigns.urls as campaigns
 import cities.urls as cities
 import clients.urls as clients
 import countries.urls as countries
+import cubes.urls as cubes
 import events.urls as events
 import metadata.urls as metadata
 import metrics.urls as metrics
@@ -43,5 +44,6 @@ urlpatterns: List[URLResolver] = static(
     path("api/auth/", include("rest_framework.urls")),
     path("api/", include(api.urls)),
     path("admin/", admin.site.urls),
+    path("", include(cubes.urlpatterns)),
     path("", include(reports.urlpatterns))
 ]
@@ -0,0 +1,166 @@
+import logging
+from typing import Iterator, List
+
+from django.conf import settings
+from django.db.models import Model
+from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.viewsets import ModelViewSet
+
+from analytics.logic import BulkLogic
+from analytics.parsers import NDJSONParser
+from analytics.renderers import (
+    CSVRenderer,
+    FlatJSONRenderer,
+    NDJSONRenderer,
+)
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class SearchViewSet(ModelViewSet):
+    """
+    Model API View with searched and paginated lists, flat lists and
+    streamed exports.
+    """
+
+    EXPORT_CHUNK_SIZE: int = 2000
+
+    def get_renderers(self) -> List[BaseRenderer]:
+        """
+        Adds the flat renderer to lists.
+        """
+        renderers: List[BaseRenderer] = super().get_renderers()
+        if self.action == "list":
+            renderers.append(FlatJSONRenderer())
+        return renderers
+
+    def search_queryset(self, request: Request) -> QuerySet:
+        """
+        Returns the rows matching the search, start and end filters.
+        """
+        rows: QuerySet = self.get_queryset()
+        if any(
+            [
+                request.query_params.get("search"),
+                request.query_params.get("start"),
+                request.query_params.get("end"),
+            ]
+        ):
+            rows: QuerySet = self.queryset.model.active.search(
+                search=request.query_params.get("search"),
+                start=request.query_params.get("start"),
+                end=request.query_params.get("end"),
+            )
+        return rows
+
+    def list(self, request: Request) -> Response:
+        """
+        GET /:model
+        GET /:model?format=flat
+        """
+        rows: QuerySet = self.search_queryset(request)
+        if (
+            request.accepted_renderer.format
+            == FlatJSONRenderer.format
+        ):
+            values: List[dict] = self.paginate_queryset(
+                rows.values(*self.serializer_class.Meta.fields)
+            )
+            logger.debug("Flat list: %s", rows)
+            return self.get_paginated_response(values)
+        page: List[Model] = self.paginate_queryset(rows)
+        serializer: BaseSerializer = self.serializer_class(
+            page, many=True, context={"request": request}
+        )
+        logger.debug("List: %s", rows)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """
+        GET /:model/export?format=ndjson|csv
+        """
+        renderer: BaseRenderer = request.accepted_renderer
+        fields: List[str] = list(self.serializer_class.Meta.fields)
+        rows: Iterator[dict] = (
+            self.search_queryset(request)
+            .order_by("created_at", "pk")
+            .values(*fields)
+            .iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
+        )
+        response: StreamingHttpResponse = StreamingHttpResponse(
+            renderer.stream(rows, fields),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            "attachment; "
+            f'filename="{self.basename}.{renderer.format}"'
+        )
+        logger.debug("Export: %s %s", self, renderer.format)
+        return response
+
+
+class BulkViewSet(SearchViewSet):
+    """
+    Model API View that also inserts rows in bulk, with plain ids
+    instead of hyperlinks.
+    """
+
+    bulk_fields: List[str] = []
+
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def bulk(self, request: Request) -> Response:
+        """
+        POST /:model/bulk
+        """
+        rows: List[object] = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {"rows": ["Expected a list of rows."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > settings.BULK_MAX_ROWS:
+            return Response(
+                {
+                    "rows": [
+                        f"Expected at most {settings.BULK_MAX_ROWS} rows."
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        logic: BulkLogic = BulkLogic(
+            self.queryset.model, self.bulk_fields
+        )
+        instances, errors = logic.create(rows)
+        logger.debug("Bulk: %s %s", logic, len(instances))
+        return Response(
+            {
+                "created": len(instances),
+                "ids": [instance.pk for instance in instances],
+                "errors": [
+                    {"row": index, **row_errors}
+                    for index, row_errors in sorted(errors.items())
+                ],
+            },
+            status=(
+                status.HTTP_201_CREATED
+                if instances or not rows
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
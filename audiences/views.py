@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from audiences.models import Audience
 from audiences.serializers import AudienceSerializer
@@ -14,7 +14,7 @@ from audiences.serializers import AudienceSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class AudienceViewSet(ModelViewSet):
+class AudienceViewSet(SearchViewSet):
     """
     Audience Model API View.
     """
@@ -23,29 +23,6 @@ class AudienceViewSet(ModelViewSet):
     queryset: QuerySet = Audience.objects.all()
     serializer_class: type = AudienceSerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /audiences
-        """
-        audiences: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            audiences: QuerySet = Audience.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: AudienceSerializer = self.serializer_class(
-            audiences, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", audiences)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /audiences
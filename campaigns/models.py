@@ -1,8 +1,8 @@
 from audiences.models import Audience
 from cities.models import City
 from django.db import models
-from django.db.models import Q
 from django.db.models.query import QuerySet
+from searches.models import SearchDocument
 
 
 class ActiveManager(models.Manager):
@@ -29,12 +29,10 @@ class ActiveManager(models.Manager):
                 created_at__lte=end,
             )
         if search:
-            queryset: Queryset = queryset.filter(
-                Q(title__icontains=search)
-                | Q(audience__title__icontains=search)
-                | Q(city__title__icontains=search)
-                | Q(city__state__title__icontains=search)
-                | Q(city__state__country__title__icontains=search)
+            queryset: QuerySet = queryset.filter(
+                pk__in=SearchDocument.objects.match(
+                    self.model, search
+                )
             )
         return queryset
 
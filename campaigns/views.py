@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from campaigns.models import Campaign
 from campaigns.serializers import CampaignSerializer
@@ -14,7 +14,7 @@ from campaigns.serializers import CampaignSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class CampaignViewSet(ModelViewSet):
+class CampaignViewSet(SearchViewSet):
     """
     Campaign Model API View.
     """
@@ -23,29 +23,6 @@ class CampaignViewSet(ModelViewSet):
     queryset: QuerySet = Campaign.objects.all()
     serializer_class: type = CampaignSerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /campaigns
-        """
-        campaigns: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            campaigns: QuerySet = Campaign.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: CampaignSerializer = self.serializer_class(
-            campaigns, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", campaigns)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /campaigns
@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from cities.models import City
 from cities.serializers import CitySerializer
@@ -14,7 +14,7 @@ from cities.serializers import CitySerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class CityViewSet(ModelViewSet):
+class CityViewSet(SearchViewSet):
     """
     City Model API View.
     """
@@ -23,29 +23,6 @@ class CityViewSet(ModelViewSet):
     queryset: QuerySet = City.objects.all()
     serializer_class: type = CitySerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /cities
-        """
-        cities: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            cities: QuerySet = City.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: CitySerializer = self.serializer_class(
-            cities, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", cities)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /cities
@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from clients.models import Client
 from clients.serializers import ClientSerializer
@@ -14,7 +14,7 @@ from clients.serializers import ClientSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class ClientViewSet(ModelViewSet):
+class ClientViewSet(SearchViewSet):
     """
     Client Model API View.
     """
@@ -23,29 +23,6 @@ class ClientViewSet(ModelViewSet):
     queryset: QuerySet = Client.objects.all()
     serializer_class: type = ClientSerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /clients
-        """
-        clients: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            clients: QuerySet = Client.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: ClientSerializer = self.serializer_class(
-            clients, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", clients)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /clients
@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from countries.models import Country
 from countries.serializers import CountrySerializer
@@ -14,7 +14,7 @@ from countries.serializers import CountrySerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class CountryViewSet(ModelViewSet):
+class CountryViewSet(SearchViewSet):
     """
     Country Model API View.
     """
@@ -23,29 +23,6 @@ class CountryViewSet(ModelViewSet):
     queryset: QuerySet = Country.objects.all()
     serializer_class: type = CountrySerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /countries
-        """
-        countries: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            countries: QuerySet = Country.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: CountrySerializer = self.serializer_class(
-            countries, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", countries)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /countries
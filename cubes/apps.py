@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class CubesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "cubes"
+
+    def ready(self) -> None:
+        """
+        Connects the cube refresh signals.
+        """
+        import cubes.signals  # noqa: F401
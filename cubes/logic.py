@@ -0,0 +1,234 @@
+import logging
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, Min, Sum
+from django.db.models.expressions import Combinable
+from django.db.models.functions import TruncMonth, TruncYear
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from rollups.logic import SubscriptionRollupLogic
+from rollups.models import Rollup
+
+from cubes.models import Cube
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class CubeLogic:
+    """
+    Business logic related to Cubes.
+
+    The cube stores measures by day, campaign, product and city.
+    Coarser levels, such as month, audience or country, are rolled
+    up at query time through their hierarchies.
+    """
+
+    BATCH_SIZE: int = 1000
+    LEVELS: Dict[str, str] = {
+        "year": "year",
+        "month": "month",
+        "day": "day",
+        "audience": "campaign__audience",
+        "campaign": "campaign",
+        "product": "product",
+        "country": "city__state__country",
+        "state": "city__state",
+        "city": "city",
+    }
+    HIERARCHIES: Tuple[Tuple[str]] = (
+        ("year", "month", "day"),
+        ("audience", "campaign"),
+        ("product",),
+        ("country", "state", "city"),
+    )
+    TRUNCATIONS: Dict[str, type] = {
+        "year": TruncYear,
+        "month": TruncMonth,
+    }
+    MEASURES: Tuple[str] = (
+        "events",
+        "subscriptions",
+        "revenue",
+        "cost",
+        "margin",
+        "life",
+        "ltv",
+    )
+
+    def __init__(self, cube: Cube) -> None:
+        """
+        Cube Logic constructor.
+        """
+        self.cube: Cube = cube
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.cube}>"
+
+    @classmethod
+    def get_rows(cls, start: date, end: date) -> Iterator[Cube]:
+        """
+        Rolls up the hourly rollups of a date range by day, campaign,
+        product and city.
+        """
+        rows: QuerySet = (
+            Rollup.objects.filter(day__gte=start, day__lte=end)
+            .values("day", "campaign", "product", "city")
+            .annotate(
+                total_events=Sum("events"),
+                total_subscriptions=Sum("subscriptions"),
+                total_revenue=Sum("revenue"),
+                total_cost=Sum("cost"),
+                total_life=Sum("life"),
+                total_ltv=Sum("ltv"),
+                total_open_subscriptions=Sum("open_subscriptions"),
+                total_open_margin=Sum("open_margin"),
+            )
+            .order_by()
+        )
+        for row in rows.iterator():
+            yield Cube(
+                day=row["day"],
+                campaign_id=row["campaign"],
+                product_id=row["product"],
+                city_id=row["city"],
+                events=row["total_events"],
+                subscriptions=row["total_subscriptions"],
+                revenue=row["total_revenue"],
+                cost=row["total_cost"],
+                life=row["total_life"],
+                ltv=row["total_ltv"],
+                open_subscriptions=row["total_open_subscriptions"],
+                open_margin=row["total_open_margin"],
+            )
+
+    @classmethod
+    def rebuild(cls, start: date = None, end: date = None) -> int:
+        """
+        Rebuilds the cube of a date range, or of all rolled up days.
+        """
+        if start is None or end is None:
+            bounds: Dict[str, date] = Rollup.objects.aggregate(
+                start=Min("day"), end=Max("day")
+            )
+            start: date = start or bounds["start"]
+            end: date = end or bounds["end"]
+        if start is None:
+            return 0
+        refreshed_at: datetime = timezone.now()
+        total: int = 0
+        with transaction.atomic():
+            Cube.objects.filter(day__gte=start, day__lte=end).delete()
+            rows: Iterator[Cube] = cls.get_rows(start, end)
+            while True:
+                batch: List[Cube] = list(islice(rows, cls.BATCH_SIZE))
+                if not batch:
+                    break
+                for cube in batch:
+                    cube.refreshed_at = refreshed_at
+                Cube.objects.bulk_create(batch)
+                total += len(batch)
+        logger.debug("Rebuilt: %s %s %s %s", cls, start, end, total)
+        return total
+
+    @classmethod
+    def get_measures(cls) -> Dict[str, Combinable]:
+        """
+        Returns the cube measures, as database aggregates.
+        """
+        age: Combinable = SubscriptionRollupLogic.get_age()
+        decimal: DecimalField = DecimalField(
+            max_digits=20, decimal_places=4
+        )
+        return {
+            "events": Sum("events"),
+            "subscriptions": Sum("subscriptions"),
+            "revenue": Sum("revenue"),
+            "cost": Sum("cost"),
+            "margin": Sum(
+                F("revenue") - F("cost"), output_field=decimal
+            ),
+            "life": Sum(F("life") + F("open_subscriptions") * age),
+            "ltv": Sum(
+                F("ltv") + F("open_margin") * age,
+                output_field=decimal,
+            ),
+        }
+
+    @classmethod
+    def drill_down(cls, level: str) -> str:
+        """
+        Returns the next finer level of a hierarchy, if any.
+        """
+        for hierarchy in cls.HIERARCHIES:
+            if level in hierarchy[:-1]:
+                return hierarchy[hierarchy.index(level) + 1]
+        return None
+
+    @classmethod
+    def roll_up(cls, level: str) -> str:
+        """
+        Returns the next coarser level of a hierarchy, if any.
+        """
+        for hierarchy in cls.HIERARCHIES:
+            if level in hierarchy[1:]:
+                return hierarchy[hierarchy.index(level) - 1]
+        return None
+
+    @classmethod
+    def query(
+        cls,
+        start: date,
+        end: date,
+        group_by: List[str],
+        measures: List[str],
+        filters: Dict[str, List[int]] = None,
+    ) -> List[Dict[str, object]]:
+        """
+        Aggregates measures by date range, grouped by any levels and
+        filtered by member ids of any levels.
+        """
+        aggregates: Dict[str, Combinable] = cls.get_measures()
+        fields: List[str] = [cls.LEVELS[level] for level in group_by]
+        cubes: QuerySet = Cube.objects.filter(
+            day__gte=start, day__lte=end
+        ).annotate(
+            **{
+                level: truncation("day")
+                for level, truncation in cls.TRUNCATIONS.items()
+                if level in group_by
+            }
+        )
+        for level, ids in (filters or {}).items():
+            cubes: QuerySet = cubes.filter(
+                **{f"{cls.LEVELS[level]}__in": ids}
+            )
+        rows: List[Dict[str, object]] = [
+            {
+                **{
+                    level: row[field]
+                    for level, field in zip(group_by, fields)
+                },
+                **{
+                    measure: row[f"total_{measure}"]
+                    for measure in measures
+                },
+            }
+            for row in cubes.values(*fields)
+            .annotate(
+                **{
+                    f"total_{measure}": aggregates[measure]
+                    for measure in measures
+                }
+            )
+            .order_by(*fields)
+        ]
+        logger.debug(
+            "Query: %s %s %s %s", cls, group_by, measures, len(rows)
+        )
+        return rows
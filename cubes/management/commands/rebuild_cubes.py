@@ -0,0 +1,48 @@
+from datetime import date
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from cubes.logic import CubeLogic
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the Subscription and Event cubes from the rollups.
+    """
+
+    help: str = (
+        "Rebuilds the cube of a date range, or of all rolled up days. "
+        "Rollup refreshes keep the cube up to date afterwards."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Command line arguments.
+        """
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to rebuild, as YYYY-MM-DD.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to rebuild, as YYYY-MM-DD.",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        """
+        Command entrypoint.
+        """
+        start: date = options["start"]
+        end: date = options["end"]
+        if bool(start) != bool(end):
+            raise CommandError("Both --start and --end are required.")
+        if start and start > end:
+            raise CommandError("--start must not be after --end.")
+        total: int = CubeLogic.rebuild(start, end)
+        self.stdout.write(f"Cubes rebuilt: {total}")
@@ -0,0 +1,93 @@
+# Generated by Django 4.0.3 on 2026-10-18 14:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("campaigns", "0004_remove_campaign_price_campaign_spend"),
+        ("cities", "0002_city_deleted_at"),
+        ("products", "0003_product_deleted_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Cube",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("events", models.PositiveIntegerField(default=0)),
+                (
+                    "subscriptions",
+                    models.PositiveIntegerField(default=0),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=4, default=0, max_digits=20
+                    ),
+                ),
+                (
+                    "cost",
+                    models.DecimalField(
+                        decimal_places=4, default=0, max_digits=20
+                    ),
+                ),
+                ("life", models.IntegerField(default=0)),
+                (
+                    "ltv",
+                    models.DecimalField(
+                        decimal_places=4, default=0, max_digits=20
+                    ),
+                ),
+                ("renewals", models.PositiveIntegerField(default=0)),
+                (
+                    "renewal_margin",
+                    models.DecimalField(
+                        decimal_places=4, default=0, max_digits=20
+                    ),
+                ),
+                ("refreshed_at", models.DateTimeField()),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="campaigns.campaign",
+                    ),
+                ),
+                (
+                    "city",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="cities.city",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.product",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="cube",
+            index=models.Index(
+                fields=["day"], name="cubes_cube_day_c303da_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+from campaigns.models import Campaign
+from cities.models import City
+from django.db import models
+from products.models import Product
+
+
+class Cube(models.Model):
+    """
+    Daily Cube Model of Subscriptions and Events, by campaign,
+    product and city.
+    """
+
+    day: models.DateField = models.DateField(null=False)
+    campaign: models.ForeignKey = models.ForeignKey(
+        Campaign,
+        on_delete=models.CASCADE,
+        null=False,
+    )
+    product: models.ForeignKey = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        null=True,
+    )
+    city: models.ForeignKey = models.ForeignKey(
+        City,
+        on_delete=models.CASCADE,
+        null=False,
+    )
+    events: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0
+    )
+    subscriptions: models.PositiveIntegerField = (
+        models.PositiveIntegerField(default=0)
+    )
+    revenue: models.DecimalField = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        null=False,
+        default=0,
+    )
+    cost: models.DecimalField = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        null=False,
+        default=0,
+    )
+    life: models.IntegerField = models.IntegerField(default=0)
+    ltv: models.DecimalField = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        null=False,
+        default=0,
+    )
+    open_subscriptions: models.PositiveIntegerField = (
+        models.PositiveIntegerField(default=0)
+    )
+    open_margin: models.DecimalField = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        null=False,
+        default=0,
+    )
+    refreshed_at: models.DateTimeField = models.DateTimeField(
+        null=False
+    )
+
+    objects: models.Manager = models.Manager()
+
+    class Meta:
+        indexes: list = [
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.day}, {self.campaign_id}, {self.product_id}, {self.city_id}>"
@@ -0,0 +1,20 @@
+"""
+Cube refresh after rollup rebuilds.
+"""
+
+from datetime import date
+
+from django.dispatch import receiver
+from rollups.signals import rebuilt
+
+from cubes.logic import CubeLogic
+
+
+@receiver(rebuilt)
+def rebuild(
+    sender: type, start: date, end: date, **kwargs: dict
+) -> None:
+    """
+    Rebuilds the cube days of a rebuilt rollup range.
+    """
+    CubeLogic.rebuild(start, end)
@@ -0,0 +1,9 @@
+from typing import List
+
+from django.urls import URLResolver, path
+
+from cubes.views import CubeView
+
+urlpatterns: List[URLResolver] = [
+    path("api/cube", CubeView.as_view(), name="cube"),
+]
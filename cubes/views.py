@@ -0,0 +1,98 @@
+import logging
+from datetime import date, timedelta
+from typing import Dict, List
+
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from cubes.logic import CubeLogic
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class CubeView(APIView):
+    """
+    Cube Query API View.
+    """
+
+    def get_list(self, request: Request, name: str) -> List[str]:
+        """
+        Returns a comma separated query parameter as a list.
+        """
+        return [
+            value
+            for value in request.query_params.get(name, "").split(",")
+            if value
+        ]
+
+    def get(self, request: Request) -> Response:
+        """
+        GET /api/cube?group_by=country,month&measures=subscriptions
+        """
+        group_by: List[str] = self.get_list(request, "group_by")
+        measures: List[str] = self.get_list(
+            request, "measures"
+        ) or list(CubeLogic.MEASURES)
+        filters: Dict[str, List[str]] = {
+            level: self.get_list(request, level)
+            for level in CubeLogic.LEVELS
+            if level not in CubeLogic.TRUNCATIONS
+            and level != "day"
+            and request.query_params.get(level)
+        }
+        errors: Dict[str, List[str]] = {
+            "group_by": sorted(set(group_by) - set(CubeLogic.LEVELS)),
+            "measures": sorted(
+                set(measures) - set(CubeLogic.MEASURES)
+            ),
+            **{
+                level: [pk for pk in ids if not pk.isdigit()]
+                for level, ids in filters.items()
+            },
+        }
+        try:
+            end: date = date.fromisoformat(
+                request.query_params.get("end", str(date.today()))
+            )
+            start: date = date.fromisoformat(
+                request.query_params.get(
+                    "start", str(end - timedelta(days=30))
+                )
+            )
+        except ValueError as error:
+            errors["dates"] = [str(error)]
+        errors: Dict[str, List[str]] = {
+            key: value for key, value in errors.items() if value
+        }
+        if errors:
+            return Response(
+                errors, status=status.HTTP_400_BAD_REQUEST
+            )
+        rows: List[Dict[str, object]] = CubeLogic.query(
+            start=start,
+            end=end,
+            group_by=group_by,
+            measures=measures,
+            filters=filters,
+        )
+        return Response(
+            {
+                "start": start,
+                "end": end,
+                "group_by": group_by,
+                "measures": measures,
+                "filters": filters,
+                "drill_down": {
+                    level: CubeLogic.drill_down(level)
+                    for level in group_by
+                },
+                "roll_up": {
+                    level: CubeLogic.roll_up(level)
+                    for level in group_by
+                },
+                "rows": rows,
+            },
+            status=status.HTTP_200_OK,
+        )
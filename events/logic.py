@@ -1,8 +1,20 @@
+import atexit
+import json
 import logging
+import os
+import time
 from datetime import datetime
-from typing import Dict, List
+from threading import Condition, Thread
+from typing import Dict, List, TextIO, Tuple
 
+from analytics.logic import BulkLogic
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
 from django.db.models.query import QuerySet
+from django.utils import timezone
+from metrics.models import Type
 
 from events.models import Event
 
@@ -14,6 +26,11 @@ class EventLogic:
     Business logic related to Event.
     """
 
+    DIMENSIONS: Dict[str, str] = {
+        "campaign": "metric__campaign",
+        "page": "metric__page",
+    }
+
     def __init__(self, event: Event) -> None:
         """
         Event Logic constructor.
@@ -37,3 +54,430 @@ class EventLogic:
         )
         logger.debug("Events: %s %s", cls, events)
         return events
+
+    @classmethod
+    def get_frequencies(
+        cls,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, int]:
+        """
+        Counts events by date range, grouped by a dimension. With a
+        limit, only the largest groups are returned, ordered and
+        limited by the database, and the rest is summed into a None
+        group if other is set.
+        """
+        field: str = cls.DIMENSIONS[dimension]
+        rows: QuerySet = cls.get_events(start=start, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        groups: QuerySet = rows.values_list(field).annotate(
+            total=Count("pk")
+        )
+        if limit is None:
+            frequencies: Dict[int, int] = dict(groups.order_by())
+        else:
+            frequencies: Dict[int, int] = dict(
+                groups.order_by("-total", field)[:limit]
+            )
+        if limit is not None and other:
+            rest: int = rows.count() - sum(frequencies.values())
+            if rest:
+                frequencies[None] = rest
+        logger.debug(
+            "Frequencies: %s %s %s", cls, dimension, frequencies
+        )
+        return frequencies
+
+    @classmethod
+    def get_comparison(
+        cls,
+        start: datetime,
+        end: datetime,
+        previous: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Counts events by date range and by the previous period, from
+        previous to start, grouped by a dimension in a single scan. With
+        a limit, only the largest current groups are returned, and the
+        rest is summed into a None group if other is set.
+        """
+        field: str = cls.DIMENSIONS[dimension]
+        current: Q = Q(created_at__gte=start)
+        rows: QuerySet = cls.get_events(start=previous, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        totals: Dict[str, Count] = {
+            "current": Count("pk", filter=current),
+            "previous": Count("pk", filter=~current),
+        }
+        groups: QuerySet = (
+            rows.values_list(field)
+            .annotate(**totals)
+            .order_by("-current", "-previous", field)
+        )
+        if limit is not None:
+            groups: QuerySet = groups[:limit]
+        comparison: Dict[int, Tuple[int, int]] = {
+            pk: (now, before) for pk, now, before in groups
+        }
+        if limit is not None and other:
+            aggregate: Dict[str, int] = rows.aggregate(**totals)
+            rest: Tuple[int, int] = (
+                aggregate["current"]
+                - sum(now for now, _ in comparison.values()),
+                aggregate["previous"]
+                - sum(before for _, before in comparison.values()),
+            )
+            if any(rest):
+                comparison[None] = rest
+        logger.debug(
+            "Comparison: %s %s %s", cls, dimension, comparison
+        )
+        return comparison
+
+    @classmethod
+    def get_histogram(
+        cls, start: datetime, end: datetime
+    ) -> QuerySet:
+        """
+        Returns event counts by date of creation.
+        """
+        histogram: QuerySet = (
+            cls.get_events(start=start, end=end)
+            .annotate(
+                date=TruncDate(
+                    "created_at",
+                    tzinfo=timezone.get_default_timezone(),
+                )
+            )
+            .values("date")
+            .annotate(total=Count("pk"))
+            .order_by("date")
+        )
+        logger.debug("Histogram: %s %s", cls, histogram)
+        return histogram
+
+    @classmethod
+    def get_funnel(
+        cls,
+        start: datetime,
+        end: datetime,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, Dict[str, int]]:
+        """
+        Counts views, clicks, events and subscriptions by date range,
+        grouped by campaign in a single query. With a limit, only the
+        campaigns with the most events are returned, and the rest is
+        summed into a None group if other is set.
+        """
+        field: str = cls.DIMENSIONS["campaign"]
+        rows: QuerySet = cls.get_events(start=start, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        stages: Dict[str, Count] = {
+            "views": Count(
+                "pk",
+                filter=Q(metric__metric_type=Type.VIEW),
+                distinct=True,
+            ),
+            "clicks": Count(
+                "pk",
+                filter=Q(metric__metric_type=Type.CLICK),
+                distinct=True,
+            ),
+            "events": Count("pk", distinct=True),
+            "subscriptions": Count(
+                "subscription",
+                filter=Q(subscription__deleted_at=None),
+                distinct=True,
+            ),
+        }
+        groups: QuerySet = rows.values(field).annotate(**stages)
+        if limit is None:
+            groups: QuerySet = groups.order_by()
+        else:
+            groups: QuerySet = groups.order_by("-events", field)[
+                :limit
+            ]
+        funnel: Dict[int, Dict[str, int]] = {
+            row.pop(field): row for row in groups
+        }
+        if limit is not None and other:
+            totals: Dict[str, int] = rows.aggregate(**stages)
+            rest: Dict[str, int] = {
+                stage: total
+                - sum(row[stage] for row in funnel.values())
+                for stage, total in totals.items()
+            }
+            if rest["events"]:
+                funnel[None] = rest
+        logger.debug("Funnel: %s %s", cls, funnel)
+        return funnel
+
+
+class EventBufferLogic:
+    """
+    Business logic related to the write-behind Event buffer.
+
+    Accepted events are queued in memory, up to a bound, and a
+    background thread inserts them in bulk when the queue reaches a
+    batch size or every interval. Events keep the time they were
+    accepted as their creation time. With a spool directory, accepted
+    events are also appended to a segment file, removed once they are
+    inserted, so events buffered by a crashed process are replayed.
+    """
+
+    FIELDS: List[str] = ["client", "metric", "value"]
+    PREFIX: str = "events"
+
+    QUEUE: List[Dict] = []
+    SEGMENTS: List[str] = []
+    SPOOL: TextIO = None
+    CONDITION: Condition = Condition()
+    THREAD: Thread = None
+    STOPPING: bool = False
+    REGISTERED: bool = False
+    FLUSHED: int = 0
+
+    def __init__(self, rows: List[Dict]) -> None:
+        """
+        Event Buffer Logic constructor.
+        """
+        self.rows: List[Dict] = rows
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {len(self.rows)}>"
+
+    @classmethod
+    def put(cls, rows: List[Dict]) -> bool:
+        """
+        Queues rows stamped with the time they were accepted, or
+        returns False when the buffer is full.
+        """
+        accepted_at: str = timezone.now().isoformat()
+        rows: List[Dict] = [
+            {**row, "created_at": accepted_at} for row in rows
+        ]
+        with cls.CONDITION:
+            if (
+                cls.STOPPING
+                or len(cls.QUEUE) + len(rows)
+                > settings.EVENT_BUFFER_SIZE
+            ):
+                return False
+            cls.start()
+            if cls.SPOOL is not None:
+                cls.SPOOL.write(
+                    "".join(json.dumps(row) + "\n" for row in rows)
+                )
+                cls.SPOOL.flush()
+            cls.QUEUE.extend(rows)
+            if len(cls.QUEUE) >= settings.EVENT_BUFFER_BATCH:
+                cls.CONDITION.notify()
+        return True
+
+    @classmethod
+    def get_pid(cls, name: str) -> int:
+        """
+        Returns the process that wrote a spool segment.
+        """
+        return int(name.split("-")[1])
+
+    @classmethod
+    def is_alive(cls, pid: int) -> bool:
+        """
+        Returns whether a process is running.
+        """
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @classmethod
+    def load(cls, path: str) -> List[Dict]:
+        """
+        Returns the events of a spool segment, skipping a line cut
+        short by a crash. Events spooled without their acceptance time
+        get the time the segment was last written.
+        """
+        written_at: str = datetime.fromtimestamp(
+            os.path.getmtime(path), timezone.utc
+        ).isoformat()
+        rows: List[Dict] = []
+        with open(path) as segment:
+            for line in segment:
+                if not line.strip():
+                    continue
+                try:
+                    row: Dict = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipped: %s %s", cls, path)
+                    continue
+                if isinstance(row, dict):
+                    row.setdefault("created_at", written_at)
+                rows.append(row)
+        return rows
+
+    @classmethod
+    def recover(cls) -> int:
+        """
+        Queues the events of the spool segments left by processes
+        that are no longer running, ahead of new events. Each segment
+        is first claimed by renaming it after this process, so only
+        one process replays it.
+        """
+        directory: str = settings.EVENT_BUFFER_SPOOL
+        os.makedirs(directory, exist_ok=True)
+        rows: List[Dict] = []
+        for name in sorted(os.listdir(directory)):
+            if not name.startswith(f"{cls.PREFIX}-") or (
+                cls.is_alive(cls.get_pid(name))
+            ):
+                continue
+            path: str = os.path.join(
+                directory,
+                f"{cls.PREFIX}-{os.getpid()}-"
+                + name[len(cls.PREFIX) + 1 :],
+            )
+            try:
+                os.rename(os.path.join(directory, name), path)
+            except FileNotFoundError:
+                continue
+            rows.extend(cls.load(path))
+            cls.SEGMENTS.append(path)
+        cls.QUEUE[:0] = rows
+        logger.debug("Recovered: %s %s", cls, len(rows))
+        return len(rows)
+
+    @classmethod
+    def rotate(cls) -> List[str]:
+        """
+        Closes the current spool segment and opens a new one, and
+        returns the closed segments.
+        """
+        segments: List[str] = cls.SEGMENTS
+        cls.SEGMENTS: List[str] = []
+        if cls.SPOOL is not None:
+            cls.SPOOL.close()
+            segments.append(cls.SPOOL.name)
+            cls.SPOOL: TextIO = None
+        if settings.EVENT_BUFFER_SPOOL and not cls.STOPPING:
+            cls.SPOOL: TextIO = open(
+                os.path.join(
+                    settings.EVENT_BUFFER_SPOOL,
+                    f"{cls.PREFIX}-{os.getpid()}-{time.time_ns()}.ndjson",
+                ),
+                "a",
+            )
+        return segments
+
+    @classmethod
+    def start(cls) -> None:
+        """
+        Starts the flush thread, recovering the spool first.
+        """
+        with cls.CONDITION:
+            if cls.THREAD is not None and cls.THREAD.is_alive():
+                return
+            cls.STOPPING: bool = False
+            if settings.EVENT_BUFFER_SPOOL:
+                cls.recover()
+                cls.SEGMENTS: List[str] = cls.rotate()
+            cls.THREAD: Thread = Thread(
+                target=cls.run, name="event-buffer", daemon=True
+            )
+            cls.THREAD.start()
+            if not cls.REGISTERED:
+                atexit.register(cls.stop)
+                cls.REGISTERED: bool = True
+
+    @classmethod
+    def stop(cls) -> None:
+        """
+        Flushes the queued events and stops the flush thread.
+        """
+        with cls.CONDITION:
+            if cls.THREAD is None:
+                return
+            cls.STOPPING: bool = True
+            cls.CONDITION.notify_all()
+        cls.THREAD.join()
+        with cls.CONDITION:
+            cls.THREAD: Thread = None
+        logger.debug("Stopped: %s", cls)
+
+    @classmethod
+    def run(cls) -> None:
+        """
+        Flushes the queue when it reaches a batch, or every interval,
+        until stopped.
+        """
+        stopping: bool = False
+        while not stopping:
+            with cls.CONDITION:
+                cls.CONDITION.wait_for(
+                    lambda: cls.STOPPING
+                    or len(cls.QUEUE) >= settings.EVENT_BUFFER_BATCH,
+                    timeout=settings.EVENT_BUFFER_INTERVAL,
+                )
+                stopping: bool = cls.STOPPING
+            cls.flush()
+        connections.close_all()
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Inserts the queued events in batches inside one transaction,
+        and removes their spool segments once it is committed. Events
+        are queued back if a batch fails, so none of them is replayed
+        twice.
+        """
+        with cls.CONDITION:
+            if not cls.QUEUE and not cls.STOPPING:
+                return 0
+            rows: List[Dict] = cls.QUEUE
+            cls.QUEUE: List[Dict] = []
+            segments: List[str] = cls.rotate()
+        total: int = 0
+        size: int = settings.EVENT_BUFFER_BATCH
+        try:
+            with transaction.atomic():
+                for i in range(0, len(rows), size):
+                    instances, errors = BulkLogic(
+                        Event, [*cls.FIELDS, "created_at"]
+                    ).create(rows[i : i + size])
+                    if errors:
+                        logger.warning("Rejected: %s %s", cls, errors)
+                    total += len(instances)
+        except Exception:
+            logger.exception("Flush failed: %s", cls)
+            with cls.CONDITION:
+                cls.QUEUE[:0] = rows
+                cls.SEGMENTS[:0] = segments
+            return 0
+        with cls.CONDITION:
+            cls.FLUSHED += total
+        for path in segments:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        logger.debug("Flushed: %s %s", cls, total)
+        return total
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from events.logic import EventBufferLogic
+
+
+class Command(BaseCommand):
+    """
+    Inserts the events left in the spool by stopped processes.
+    """
+
+    help: str = (
+        "Replays the event buffer spool segments of processes that "
+        "are no longer running, and inserts their events."
+    )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        """
+        Command entrypoint.
+        """
+        if not settings.EVENT_BUFFER_SPOOL:
+            raise CommandError("EVENT_BUFFER_SPOOL is not set.")
+        EventBufferLogic.start()
+        EventBufferLogic.stop()
+        self.stdout.write(
+            f"Events flushed: {EventBufferLogic.FLUSHED}"
+        )
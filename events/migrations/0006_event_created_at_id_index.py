@@ -0,0 +1,20 @@
+# Generated by Django 4.0.3 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_event_deleted_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["created_at", "id"],
+                name="events_even_created_cdb609_idx",
+            ),
+        ),
+    ]
@@ -1,8 +1,8 @@
 from clients.models import Client
 from django.db import models
-from django.db.models import Q
 from django.db.models.query import QuerySet
 from metrics.models import Metric
+from searches.models import SearchDocument
 
 
 class ActiveManager(models.Manager):
@@ -29,30 +29,9 @@ class ActiveManager(models.Manager):
                 created_at__lte=end,
             )
         if search:
-            queryset: Queryset = queryset.filter(
-                Q(client__name__icontains=search)
-                | Q(client__email__icontains=search)
-                | Q(metric__campaign__title__icontains=search)
-                | Q(
-                    metric__campaign__audience__title__icontains=search
-                )
-                | Q(metric__campaign__city__title__icontains=search)
-                | Q(
-                    metric__campaign__city__state__title__icontains=search
-                )
-                | Q(
-                    metric__campaign__city__state__country__title__icontains=search
-                )
-                | Q(metric__page__title__icontains=search)
-                | Q(metric__page__url__icontains=search)
-                | Q(metric__page__metadata__title__icontains=search)
-                | Q(metric__page__metadata__site__icontains=search)
-                | Q(metric__page__metadata__author__icontains=search)
-                | Q(
-                    metric__page__metadata__keywords__icontains=search
-                )
-                | Q(
-                    metric__page__metadata__description__icontains=search
+            queryset: QuerySet = queryset.filter(
+                pk__in=SearchDocument.objects.match(
+                    self.model, search
                 )
             )
         return queryset
@@ -91,6 +70,11 @@ class Event(models.Model):
     objects: models.Manager = models.Manager()
     active: ActiveManager = ActiveManager()
 
+    class Meta:
+        indexes: list = [
+            models.Index(fields=["created_at", "id"]),
+        ]
+
     def __str__(self) -> str:
         """
         String serializer.
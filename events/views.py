@@ -1,20 +1,27 @@
 import logging
 from datetime import datetime
-from typing import List
+from math import ceil
+from typing import Dict, List
 
+from analytics.logic import BulkLogic
+from analytics.parsers import NDJSONParser
+from analytics.viewsets import BulkViewSet
+from django.conf import settings
 from django.db.models.query import QuerySet
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
+from events.logic import EventBufferLogic
 from events.models import Event
 from events.serializers import EventSerializer
 
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class EventViewSet(ModelViewSet):
+class EventViewSet(BulkViewSet):
     """
     Event Model API View.
     """
@@ -22,29 +29,7 @@ class EventViewSet(ModelViewSet):
     http_method_names: List[str] = ["get", "post", "put", "delete"]
     queryset: QuerySet = Event.objects.all()
     serializer_class: type = EventSerializer
-
-    def list(self, request: Request) -> Response:
-        """
-        GET /events
-        """
-        events: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            events: QuerySet = Event.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: EventSerializer = self.serializer_class(
-            events, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", events)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    bulk_fields: List[str] = EventBufferLogic.FIELDS
 
     def create(self, request: Request) -> Response:
         """
@@ -104,3 +89,42 @@ class EventViewSet(ModelViewSet):
         )
         logger.debug("Deleted: %s", event)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def buffer(self, request: Request) -> Response:
+        """
+        POST /events/buffer
+        """
+        rows: List[object] = request.data
+        if not isinstance(rows, list):
+            rows: List[object] = [rows]
+        valid, errors = BulkLogic(Event, self.bulk_fields).check(rows)
+        accepted: List[Dict] = [rows[i] for i, _ in valid]
+        if accepted and not EventBufferLogic.put(accepted):
+            return Response(
+                {"detail": "Event buffer is full."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={
+                    "Retry-After": str(
+                        ceil(settings.EVENT_BUFFER_INTERVAL)
+                    )
+                },
+            )
+        return Response(
+            {
+                "accepted": len(accepted),
+                "errors": [
+                    {"row": index, **row_errors}
+                    for index, row_errors in sorted(errors.items())
+                ],
+            },
+            status=(
+                status.HTTP_202_ACCEPTED
+                if accepted or not rows
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
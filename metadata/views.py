@@ -1,11 +1,11 @@
 import logging
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from metadata.models import Metadata
 from metadata.serializers import MetadataSerializer
@@ -13,7 +13,7 @@ from metadata.serializers import MetadataSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class MetadataViewSet(ModelViewSet):
+class MetadataViewSet(SearchViewSet):
     """
     Metadata Model API View.
     """
@@ -24,29 +24,6 @@ class MetadataViewSet(ModelViewSet):
     queryset: QuerySet = Metadata.objects.all()
     serializer_class: type = MetadataSerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /metadata
-        """
-        metadata: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            metadata: QuerySet = Metadata.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: MetadataSerializer = self.serializer_class(
-            metadata, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", metadata)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /metadata
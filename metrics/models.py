@@ -1,8 +1,8 @@
 from campaigns.models import Campaign
 from django.db import models
-from django.db.models import Q
 from django.db.models.query import QuerySet
 from pages.models import Page
+from searches.models import SearchDocument
 
 
 class ActiveManager(models.Manager):
@@ -29,21 +29,10 @@ class ActiveManager(models.Manager):
                 created_at__lte=end,
             )
         if search:
-            queryset: Queryset = queryset.filter(
-                Q(campaign__title__icontains=search)
-                | Q(campaign__audience__title__icontains=search)
-                | Q(campaign__city__title__icontains=search)
-                | Q(campaign__city__state__title__icontains=search)
-                | Q(
-                    campaign__city__state__country__title__icontains=search
+            queryset: QuerySet = queryset.filter(
+                pk__in=SearchDocument.objects.match(
+                    self.model, search
                 )
-                | Q(page__title__icontains=search)
-                | Q(page__url__icontains=search)
-                | Q(page__metadata__title__icontains=search)
-                | Q(page__metadata__site__icontains=search)
-                | Q(page__metadata__author__icontains=search)
-                | Q(page__metadata__keywords__icontains=search)
-                | Q(page__metadata__description__icontains=search)
             )
         return queryset
 
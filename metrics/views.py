@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from metrics.models import Metric
 from metrics.serializers import MetricSerializer
@@ -14,7 +14,7 @@ from metrics.serializers import MetricSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class MetricViewSet(ModelViewSet):
+class MetricViewSet(SearchViewSet):
     """
     Metric Model API View.
     """
@@ -23,29 +23,6 @@ class MetricViewSet(ModelViewSet):
     queryset: QuerySet = Metric.objects.all()
     serializer_class: type = MetricSerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /metrics
-        """
-        metrics: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            metrics: QuerySet = Metric.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: MetricSerializer = self.serializer_class(
-            metrics, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", metrics)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /metrics
@@ -1,6 +1,6 @@
 from django.db import models
-from django.db.models import Q
 from django.db.models.query import QuerySet
+from searches.models import SearchDocument
 
 
 class ActiveManager(models.Manager):
@@ -27,14 +27,10 @@ class ActiveManager(models.Manager):
                 created_at__lte=end,
             )
         if search:
-            queryset: Queryset = queryset.filter(
-                Q(title__icontains=search)
-                | Q(url__icontains=search)
-                | Q(metadata__title__icontains=search)
-                | Q(metadata__site__icontains=search)
-                | Q(metadata__author__icontains=search)
-                | Q(metadata__keywords__icontains=search)
-                | Q(metadata__description__icontains=search)
+            queryset: QuerySet = queryset.filter(
+                pk__in=SearchDocument.objects.match(
+                    self.model, search
+                )
             )
         return queryset
 
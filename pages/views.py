@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from pages.logic import PageLogic
 from pages.models import Page
@@ -15,7 +15,7 @@ from pages.serializers import PageSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class PageViewSet(ModelViewSet):
+class PageViewSet(SearchViewSet):
     """
     Page Model API View.
     """
@@ -23,29 +23,6 @@ class PageViewSet(ModelViewSet):
     queryset: QuerySet = Page.objects.all()
     serializer_class: type = PageSerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /pages
-        """
-        pages: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            pages: QuerySet = Page.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: PageSerializer = self.serializer_class(
-            pages, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", pages)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /pages
@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from products.models import Product
 from products.serializers import ProductSerializer
@@ -14,7 +14,7 @@ from products.serializers import ProductSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class ProductViewSet(ModelViewSet):
+class ProductViewSet(SearchViewSet):
     """
     Product Model API View.
     """
@@ -23,29 +23,6 @@ class ProductViewSet(ModelViewSet):
     queryset: QuerySet = Product.objects.all()
     serializer_class: type = ProductSerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /products
-        """
-        products: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            products: QuerySet = Product.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: ProductSerializer = self.serializer_class(
-            products, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", products)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /products
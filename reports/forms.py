@@ -11,3 +11,4 @@ class DashboardForm(forms.Form):
     )
     start: forms.DateField = forms.DateField(required=False)
     end: forms.DateField = forms.DateField(required=False)
+    compare: forms.BooleanField = forms.BooleanField(required=False)
@@ -1,27 +1,32 @@
 import logging
-from datetime import datetime, timedelta
-from typing import Dict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from hashlib import md5
+from itertools import accumulate
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, Set, Tuple
+from uuid import uuid4
 
-from audiences.logic import AudienceLogic
 from audiences.models import Audience
-from campaigns.logic import CampaignLogic
 from campaigns.models import Campaign
-from cities.logic import CityLogic
 from cities.models import City
-from countries.logic import CountryLogic
 from countries.models import Country
-from django.db.models.query import QuerySet
+from django.conf import settings
+from django.core.cache import BaseCache, cache, caches
+from django.db import OperationalError, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Model, QuerySet
+from django.utils import timezone
 from events.logic import EventLogic
 from events.models import Event
 from metadata.logic import MetadataLogic
 from metadata.models import Metadata
 from metrics.logic import MetricLogic
 from metrics.models import Metric
-from pages.logic import PageLogic
 from pages.models import Page
-from products.logic import ProductLogic
 from products.models import Product
-from states.logic import StateLogic
+from sketches.logic import QuantileSketchLogic, SketchLogic
 from states.models import State
 from subscriptions.logic import SubscriptionLogic
 from subscriptions.models import Subscription
@@ -29,23 +34,171 @@ from subscriptions.models import Subscription
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
+class ReportResult(dict):
+    """
+    Rows of a report section, with their grand total and per-row
+    shares computed once. Nested rows are results of their own.
+    Compared rows also carry their previous values and deltas.
+    Sections whose values cannot be added, like averages, rates or
+    percentiles, have no total and no shares.
+    """
+
+    def __init__(
+        self, rows: Dict, previous: Dict = None, additive: bool = True
+    ) -> None:
+        """
+        Report Result constructor.
+        """
+        super().__init__(
+            (
+                key,
+                (
+                    ReportResult(value, additive=additive)
+                    if isinstance(value, dict)
+                    else value
+                ),
+            )
+            for key, value in rows.items()
+        )
+        totals: Dict[object, float] = (
+            {
+                key: (
+                    value.total
+                    if isinstance(value, ReportResult)
+                    else value
+                )
+                for key, value in self.items()
+            }
+            if additive
+            else {}
+        )
+        self.additive: bool = additive
+        self.total: float = sum(totals.values()) if additive else None
+        self.shares: Dict[object, float] = {
+            key: (
+                float(total) / float(self.total) * 100
+                if self.total
+                else 0.0
+            )
+            for key, total in totals.items()
+        }
+        self.previous: Dict[object, float] = previous
+        self.deltas: Dict[object, float] = (
+            {
+                key: value - previous.get(key, 0)
+                for key, value in self.items()
+            }
+            if previous is not None
+            else None
+        )
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return (
+            f"<{self.__class__.__name__}: {len(self)} ({self.total})>"
+        )
+
+
 class ReportLogic:
     """
     Business logic related to Reports.
     """
 
+    SUBSCRIPTIONS: type = SubscriptionLogic
+    EVENTS: type = EventLogic
+    SKETCHES: type = SketchLogic
+    QUANTILES: type = QuantileSketchLogic
+    OTHER: str = "Other"
     DATE_FORMAT: str = "%b %d %Y"
     MONTH_FORMAT: str = "%b %Y"
+    DAYS: Tuple[str] = (
+        "Mon",
+        "Tue",
+        "Wed",
+        "Thu",
+        "Fri",
+        "Sat",
+        "Sun",
+    )
+    MONTHS: Tuple[str] = (
+        "Jan",
+        "Feb",
+        "Mar",
+        "Apr",
+        "May",
+        "Jun",
+        "Jul",
+        "Aug",
+        "Sep",
+        "Oct",
+        "Nov",
+        "Dec",
+    )
+    SECTIONS: Dict[str, str] = {
+        "retention.by_campaign": "get_retention_by_campaign",
+        "retention.by_product": "get_retention_by_product",
+        "retention.by_cohort": "get_retention_by_cohort",
+        "funnel.by_campaign": "get_funnel_by_campaign",
+        "clients.by_campaign": "get_clients_by_campaign",
+        "clients.by_page": "get_clients_by_page",
+        "ltv.percentiles_by_campaign": "get_ltv_percentiles_by_campaign",
+        "ltv.percentiles_by_product": "get_ltv_percentiles_by_product",
+        "price.percentiles_by_campaign": "get_price_percentiles_by_campaign",
+        "price.percentiles_by_product": "get_price_percentiles_by_product",
+        "ltv.by_campaign": "get_ltv_by_campaign",
+        "margin.by_month": "get_margin_by_month",
+        "margin.by_campaign": "get_margin_by_campaign",
+        "events.by_date": "get_events_by_date",
+        "events.by_page": "get_events_by_page",
+        "subscriptions.by_date": "get_subscriptions_by_date",
+        "subscriptions.by_campaign": "get_subscriptions_by_campaign",
+        "subscriptions.by_audience": "get_subscriptions_by_audience",
+        "subscriptions.by_product": "get_subscriptions_by_product",
+        "subscriptions.by_city": "get_subscriptions_by_city",
+        "subscriptions.by_state": "get_subscriptions_by_state",
+        "subscriptions.by_country": "get_subscriptions_by_country",
+        "subscriptions.by_dow_and_hod": "get_subscriptions_by_dow_and_hod",
+        "subscriptions.by_dom": "get_subscriptions_by_dom",
+        "subscriptions.by_moy": "get_subscriptions_by_moy",
+    }
+    # Sections read from monthly sketches, which change with any day
+    # of the months of the report window.
+    MONTHLY: Set[str] = {
+        "ltv.percentiles_by_campaign",
+        "ltv.percentiles_by_product",
+        "price.percentiles_by_campaign",
+        "price.percentiles_by_product",
+    }
+
+    GEOGRAPHY: Dict[int, Tuple[int, int]] = {}
+    GEOGRAPHY_LOCK: Lock = Lock()
 
     def __init__(
-        self, start: datetime, end: datetime, search: str
+        self,
+        start: datetime,
+        end: datetime,
+        search: str,
+        compare: bool = False,
     ) -> None:
         """
-        Report Logic constructor.
+        Report Logic constructor. Comparing also counts breakdowns
+        over the previous period of the same length.
         """
         self.search: str = search.lower()
         self.start: datetime = start
         self.end: datetime = end
+        self.compare: bool = compare
+        self.previous: datetime = (
+            start - (end - start) if compare else None
+        )
+        self.histograms: Dict[str, Dict] = {}
+        self.lock: Lock = Lock()
+        self.ids: Dict[type, QuerySet] = {}
+        self.ids_lock: Lock = Lock()
+        self.cities: Dict[int, object] = None
+        self.cities_lock: Lock = Lock()
 
     def __str__(self) -> str:
         """
@@ -53,358 +206,1121 @@ class ReportLogic:
         """
         return f"<{self.__class__.__name__}: {self.search} ({self.start} - {self.end})>"
 
-    def get_subscriptions_by_campaign(self) -> Dict[Campaign, int]:
+    def get_section(
+        self, section: str, limit: int = None, other: bool = False
+    ) -> ReportResult:
         """
-        Searches subscriptions by Campaign.
+        Computes a report section by name. Ranked sections keep their
+        largest rows up to a limit, and sum the rest into an Other row
+        if requested. Histograms keep their last buckets.
         """
-        frequencies: Dict[Campaign, int] = {
-            campaign: CampaignLogic(campaign)
-            .get_subscriptions(start=self.start, end=self.end)
-            .count()
-            for campaign in Campaign.active.search(self.search)
-        }
-        logger.debug("Subscriptions by Campaign: %s", frequencies)
-        frequencies: Dict[Campaign, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
+        rows: Dict = getattr(self, self.SECTIONS[section])(
+            limit=limit, other=other
         )
-        return dict(
+        if isinstance(rows, ReportResult):
+            return rows
+        return ReportResult(rows)
+
+    def get_ids(self, model: type) -> QuerySet:
+        """
+        Returns the ids of the active rows of a dimension matching
+        the search as a subquery, or None without a search, so the
+        breakdowns are not filtered by id.
+        """
+        if not self.search:
+            return None
+        with self.ids_lock:
+            if model not in self.ids:
+                self.ids[model] = model.active.search(
+                    self.search
+                ).values_list("pk", flat=True)
+        return self.ids[model]
+
+    def rank_frequencies(
+        self,
+        model: type,
+        frequencies: Dict[int, float],
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[Model, float]:
+        """
+        Maps frequencies by primary key to rows, sorted by frequency.
+        Only the rows within the limit are loaded, and the frequencies
+        beyond it, or under a None key, are summed into an Other row.
+        """
+        ranked: List[Tuple[int, float]] = sorted(
+            (
+                (pk, frequency)
+                for pk, frequency in sorted(
+                    (pk, frequency)
+                    for pk, frequency in frequencies.items()
+                    if pk is not None
+                )
+                if frequency
+            ),
+            key=lambda x: x[1],
+            reverse=True,
+        )
+        rest: float = frequencies.get(None, 0)
+        if limit is not None:
+            rest += sum(frequency for _, frequency in ranked[limit:])
+            ranked: List[Tuple[int, float]] = ranked[:limit]
+        rows: Dict[int, Model] = model.active.in_bulk(
+            [pk for pk, _ in ranked]
+        )
+        frequencies: Dict[Model, float] = {
+            rows[pk]: frequency
+            for pk, frequency in ranked
+            if pk in rows
+        }
+        if other and rest:
+            frequencies[self.OTHER] = rest
+        return frequencies
+
+    def rank_comparison(
+        self,
+        model: type,
+        comparison: Dict[int, Tuple[float, float]],
+        limit: int = None,
+        other: bool = False,
+    ) -> ReportResult:
+        """
+        Maps current and previous frequencies by primary key to rows,
+        sorted by current and then previous frequency. Only the rows
+        within the limit are loaded, and the frequencies beyond it, or
+        under a None key, are summed into an Other row.
+        """
+        ranked: List[Tuple[int, Tuple[float, float]]] = sorted(
             sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
+                (pk, frequencies)
+                for pk, frequencies in comparison.items()
+                if pk is not None and any(frequencies)
+            ),
+            key=lambda x: x[1],
+            reverse=True,
+        )
+        rest: Tuple[float, float] = comparison.get(None, (0, 0))
+        if limit is not None:
+            rest: Tuple[float, float] = tuple(
+                map(sum, zip(rest, *(f for _, f in ranked[limit:])))
             )
+            ranked: List[Tuple[int, Tuple[float, float]]] = ranked[
+                :limit
+            ]
+        rows: Dict[int, Model] = model.active.in_bulk(
+            [pk for pk, _ in ranked]
         )
+        current: Dict[Model, float] = {
+            rows[pk]: now for pk, (now, _) in ranked if pk in rows
+        }
+        previous: Dict[Model, float] = {
+            rows[pk]: before
+            for pk, (_, before) in ranked
+            if pk in rows
+        }
+        if other and any(rest):
+            current[self.OTHER], previous[self.OTHER] = rest
+        return ReportResult(current, previous=previous)
 
-    def get_subscriptions_by_audience(self) -> Dict[Audience, int]:
+    def rank(
+        self,
+        model: type,
+        frequencies: Dict[int, object],
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[Model, float]:
         """
-        Searches subscriptions by Audience.
+        Ranks frequencies by primary key, or current and previous
+        frequencies when comparing.
         """
-        frequencies: Dict[Audience, int] = {
-            audience: AudienceLogic(audience)
-            .get_subscriptions(start=self.start, end=self.end)
-            .count()
-            for audience in Audience.active.search(self.search)
-        }
-        logger.debug("Subscriptions by Audience: %s", frequencies)
-        frequencies: Dict[Audience, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
+        if self.compare:
+            return self.rank_comparison(
+                model, frequencies, limit=limit, other=other
+            )
+        return self.rank_frequencies(
+            model, frequencies, limit=limit, other=other
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
+
+    def get_frequencies(
+        self,
+        model: type,
+        logic: type,
+        dimension: str,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[Model, float]:
+        """
+        Counts and ranks the searched rows of a dimension. Comparing
+        counts both periods in a single scan of their union.
+        """
+        if self.compare:
+            return self.rank_comparison(
+                model,
+                logic.get_comparison(
+                    start=self.start,
+                    end=self.end,
+                    previous=self.previous,
+                    dimension=dimension,
+                    ids=self.get_ids(model),
+                    limit=limit,
+                    other=other,
+                ),
+                limit=limit,
+                other=other,
             )
+        return self.rank_frequencies(
+            model,
+            logic.get_frequencies(
+                start=self.start,
+                end=self.end,
+                dimension=dimension,
+                ids=self.get_ids(model),
+                limit=limit,
+                other=other,
+            ),
+            limit=limit,
+            other=other,
         )
 
-    def get_subscriptions_by_product(self) -> Dict[Product, int]:
+    def limit_buckets(
+        self,
+        histogram: Dict[str, float],
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[str, float]:
         """
-        Searches subscriptions by Product.
+        Keeps the last buckets of a histogram, up to a limit, and sums
+        the earlier ones into an Other bucket if other is set.
         """
-        frequencies: Dict[Product, int] = {
-            product: ProductLogic(product)
-            .get_subscriptions(start=self.start, end=self.end)
-            .count()
-            for product in Product.active.search(self.search)
-        }
-        logger.debug("Subscriptions by Product: %s", frequencies)
-        frequencies: Dict[Product, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
+        if limit is None:
+            return histogram
+        buckets: List[Tuple[str, float]] = list(histogram.items())
+        limited: Dict[str, float] = dict(buckets[-limit:])
+        rest: float = (
+            sum(value for _, value in buckets[:-limit])
+            if other
+            else 0
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
-            )
+        if rest:
+            limited: Dict[str, float] = {self.OTHER: rest, **limited}
+        return limited
+
+    def get_subscriptions_by_campaign(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[Campaign, int]:
+        """
+        Searches subscriptions by Campaign.
+        """
+        frequencies: Dict[Campaign, int] = self.get_frequencies(
+            Campaign,
+            self.SUBSCRIPTIONS,
+            "campaign",
+            limit=limit,
+            other=other,
         )
+        logger.debug("Subscriptions by Campaign: %s", frequencies)
+        return frequencies
 
-    def get_subscriptions_by_city(self) -> Dict[City, int]:
+    def get_subscriptions_by_audience(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[Audience, int]:
         """
-        Searches subscriptions by City.
+        Searches subscriptions by Audience.
         """
-        frequencies: Dict[City, int] = {
-            city: CityLogic(city)
-            .get_subscriptions(start=self.start, end=self.end)
-            .count()
-            for city in City.active.search(self.search)
-        }
-        logger.debug("Subscriptions by City: %s", frequencies)
-        frequencies: Dict[City, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
+        frequencies: Dict[Audience, int] = self.get_frequencies(
+            Audience,
+            self.SUBSCRIPTIONS,
+            "audience",
+            limit=limit,
+            other=other,
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
-            )
+        logger.debug("Subscriptions by Audience: %s", frequencies)
+        return frequencies
+
+    def get_subscriptions_by_product(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[Product, int]:
+        """
+        Searches subscriptions by Product.
+        """
+        frequencies: Dict[Product, int] = self.get_frequencies(
+            Product,
+            self.SUBSCRIPTIONS,
+            "product",
+            limit=limit,
+            other=other,
         )
+        logger.debug("Subscriptions by Product: %s", frequencies)
+        return frequencies
 
-    def get_subscriptions_by_state(self) -> Dict[State, int]:
+    @classmethod
+    def get_geography(cls) -> Dict[int, Tuple[int, int]]:
         """
-        Searches subscriptions by State.
+        Returns the state and country of every city, loading them
+        once per process.
         """
-        frequencies: Dict[State, int] = {
-            state: StateLogic(state)
-            .get_subscriptions(start=self.start, end=self.end)
-            .count()
-            for state in State.active.search(self.search)
-        }
-        logger.debug("Subscriptions by State: %s", frequencies)
-        frequencies: Dict[State, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
+        with cls.GEOGRAPHY_LOCK:
+            if not cls.GEOGRAPHY:
+                cls.GEOGRAPHY: Dict[int, Tuple[int, int]] = {
+                    city: (state, country)
+                    for city, state, country in City.objects.values_list(
+                        "pk", "state", "state__country"
+                    )
+                }
+            return cls.GEOGRAPHY
+
+    @classmethod
+    def invalidate_geography(cls) -> None:
+        """
+        Reloads the city, state and country map on its next use.
+        """
+        with cls.GEOGRAPHY_LOCK:
+            cls.GEOGRAPHY: Dict[int, Tuple[int, int]] = {}
+
+    def get_cities(self) -> Dict[int, object]:
+        """
+        Counts subscriptions by every city once, to be rolled up to
+        states and countries. Comparing counts both periods.
+        """
+        with self.cities_lock:
+            if self.cities is None and self.compare:
+                self.cities: Dict[int, object] = (
+                    self.SUBSCRIPTIONS.get_comparison(
+                        start=self.start,
+                        end=self.end,
+                        previous=self.previous,
+                        dimension="city",
+                    )
+                )
+            elif self.cities is None:
+                self.cities: Dict[int, object] = (
+                    self.SUBSCRIPTIONS.get_frequencies(
+                        start=self.start,
+                        end=self.end,
+                        dimension="city",
+                    )
+                )
+        return self.cities
+
+    def roll_up_cities(
+        self, model: type, level: int
+    ) -> Dict[int, object]:
+        """
+        Rolls up subscriptions by city to the searched rows of a
+        geographic level, 0 for states and 1 for countries.
+        """
+        geography: Dict[int, Tuple[int, int]] = self.get_geography()
+        ids: QuerySet = self.get_ids(model)
+        if ids is not None:
+            ids: Set[int] = set(ids)
+        frequencies: Dict[int, object] = {}
+        for city, total in self.get_cities().items():
+            pk: int = geography.get(city, (None, None))[level]
+            if pk is None or ids is not None and pk not in ids:
+                continue
+            if self.compare:
+                now, before = frequencies.get(pk, (0, 0))
+                frequencies[pk] = (now + total[0], before + total[1])
+            else:
+                frequencies[pk] = frequencies.get(pk, 0) + total
+        return frequencies
+
+    def get_subscriptions_by_city(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[City, int]:
+        """
+        Searches subscriptions by City.
+        """
+        ids: QuerySet = self.get_ids(City)
+        if ids is not None:
+            ids: Set[int] = set(ids)
+        frequencies: Dict[City, int] = self.rank(
+            City,
+            {
+                pk: total
+                for pk, total in self.get_cities().items()
+                if ids is None or pk in ids
+            },
+            limit=limit,
+            other=other,
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
-            )
+        logger.debug("Subscriptions by City: %s", frequencies)
+        return frequencies
+
+    def get_subscriptions_by_state(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[State, int]:
+        """
+        Searches subscriptions by State.
+        """
+        frequencies: Dict[State, int] = self.rank(
+            State,
+            self.roll_up_cities(State, 0),
+            limit=limit,
+            other=other,
         )
+        logger.debug("Subscriptions by State: %s", frequencies)
+        return frequencies
 
-    def get_subscriptions_by_country(self) -> Dict[Country, int]:
+    def get_subscriptions_by_country(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[Country, int]:
         """
         Searches subscriptions by Country.
         """
-        frequencies: Dict[Country, int] = {
-            country: CountryLogic(country)
-            .get_subscriptions(start=self.start, end=self.end)
-            .count()
-            for country in Country.active.search(self.search)
-        }
-        logger.debug("Subscriptions by Country: %s", frequencies)
-        frequencies: Dict[Country, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
-        )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
-            )
+        frequencies: Dict[Country, int] = self.rank(
+            Country,
+            self.roll_up_cities(Country, 1),
+            limit=limit,
+            other=other,
         )
+        logger.debug("Subscriptions by Country: %s", frequencies)
+        return frequencies
 
-    def get_events_by_page(self) -> Dict[Page, int]:
+    def get_events_by_page(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[Page, int]:
         """
         Searches events by Page.
         """
-        frequencies: Dict[Page, int] = {
-            page: PageLogic(page)
-            .get_events(start=self.start, end=self.end)
-            .count()
-            for page in Page.active.search(self.search)
-        }
+        frequencies: Dict[Page, int] = self.get_frequencies(
+            Page, self.EVENTS, "page", limit=limit, other=other
+        )
         logger.debug("Events by Page: %s", frequencies)
-        frequencies: Dict[Page, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
+        return frequencies
+
+    def get_clients_by_campaign(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[Campaign, int]:
+        """
+        Estimates distinct clients by Campaign.
+        """
+        frequencies: Dict[Campaign, int] = self.rank_frequencies(
+            Campaign,
+            {
+                pk: round(total)
+                for pk, total in self.SKETCHES.get_clients(
+                    start=self.start,
+                    end=self.end,
+                    dimension="campaign",
+                    ids=self.get_ids(Campaign),
+                    limit=limit,
+                    other=other,
+                ).items()
+            },
+            limit=limit,
+            other=other,
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
-            )
+        logger.debug("Clients by Campaign: %s", frequencies)
+        return frequencies
+
+    def get_clients_by_page(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[Page, int]:
+        """
+        Estimates distinct clients by Page.
+        """
+        frequencies: Dict[Page, int] = self.rank_frequencies(
+            Page,
+            {
+                pk: round(total)
+                for pk, total in self.SKETCHES.get_clients(
+                    start=self.start,
+                    end=self.end,
+                    dimension="page",
+                    ids=self.get_ids(Page),
+                    limit=limit,
+                    other=other,
+                ).items()
+            },
+            limit=limit,
+            other=other,
         )
+        logger.debug("Clients by Page: %s", frequencies)
+        return frequencies
 
-    def get_subscriptions_by_dow_and_hod(
+    def get_percentiles(
         self,
-    ) -> Dict[str, Dict[str, int]]:
+        model: type,
+        measure: str,
+        dimension: str,
+        limit: int = None,
+        other: bool = False,
+    ) -> ReportResult:
         """
-        Searches subscriptions by day of the week and hour of the day.
+        Maps the percentiles of a measure by primary key to rows,
+        sorted by subscriptions. Percentiles cannot be added, so they
+        have no total.
+        """
+        percentiles: Dict[int, Dict[str, float]] = (
+            self.QUANTILES.get_percentiles(
+                start=self.start,
+                end=self.end,
+                measure=measure,
+                dimension=dimension,
+                ids=self.get_ids(model),
+                limit=limit,
+                other=other,
+            )
+        )
+        rows: Dict[int, Model] = model.active.in_bulk(
+            [pk for pk in percentiles if pk is not None]
+        )
+        return ReportResult(
+            {
+                rows[pk] if pk is not None else self.OTHER: values
+                for pk, values in percentiles.items()
+                if pk is None or pk in rows
+            },
+            additive=False,
+        )
+
+    def get_ltv_percentiles_by_campaign(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
+        """
+        Searches LTV percentiles by Campaign.
+        """
+        percentiles: ReportResult = self.get_percentiles(
+            Campaign, "ltv", "campaign", limit=limit, other=other
+        )
+        logger.debug("LTV Percentiles by Campaign: %s", percentiles)
+        return percentiles
+
+    def get_ltv_percentiles_by_product(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
+        """
+        Searches LTV percentiles by Product.
+        """
+        percentiles: ReportResult = self.get_percentiles(
+            Product, "ltv", "product", limit=limit, other=other
+        )
+        logger.debug("LTV Percentiles by Product: %s", percentiles)
+        return percentiles
+
+    def get_price_percentiles_by_campaign(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
+        """
+        Searches price percentiles by Campaign.
+        """
+        percentiles: ReportResult = self.get_percentiles(
+            Campaign,
+            "price",
+            "campaign",
+            limit=limit,
+            other=other,
+        )
+        logger.debug("Price Percentiles by Campaign: %s", percentiles)
+        return percentiles
+
+    def get_price_percentiles_by_product(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
+        """
+        Searches price percentiles by Product.
         """
-        frequencies: Dict[str, Dict[str, int]] = {
-            "Mon": {hour: 0 for hour in range(0, 24)},
-            "Tue": {hour: 0 for hour in range(0, 24)},
-            "Wed": {hour: 0 for hour in range(0, 24)},
-            "Thu": {hour: 0 for hour in range(0, 24)},
-            "Fri": {hour: 0 for hour in range(0, 24)},
-            "Sat": {hour: 0 for hour in range(0, 24)},
-            "Sun": {hour: 0 for hour in range(0, 24)},
+        percentiles: ReportResult = self.get_percentiles(
+            Product, "price", "product", limit=limit, other=other
+        )
+        logger.debug("Price Percentiles by Product: %s", percentiles)
+        return percentiles
+
+    def get_buckets(self, date_format: str) -> Dict[str, float]:
+        """
+        Returns an empty histogram with one bucket per date label.
+        """
+        histogram: Dict[str, float] = {}
+        current: datetime = self.start
+        while current <= self.end:
+            histogram[current.strftime(date_format)] = 0
+            current += timedelta(days=1)
+        return histogram
+
+    def get_histograms(self) -> Dict[str, Dict]:
+        """
+        Returns all subscription histograms, building them once.
+        """
+        with self.lock:
+            if not self.histograms:
+                self.histograms: Dict[str, Dict] = (
+                    self.build_histograms()
+                )
+        return self.histograms
+
+    def build_histograms(self) -> Dict[str, Dict]:
+        """
+        Builds all subscription histograms from hourly buckets.
+        """
+        histograms: Dict[str, Dict] = {
+            "by_dow_and_hod": {
+                day: {hour: 0 for hour in range(0, 24)}
+                for day in self.DAYS
+            },
+            "by_dom": {i: 0 for i in range(0, 32)},
+            "by_moy": {month: 0 for month in self.MONTHS},
+            "by_date": self.get_buckets(self.DATE_FORMAT),
+            "margin_by_month": self.get_buckets(self.MONTH_FORMAT),
         }
-        for subscription in SubscriptionLogic.get_subscriptions(
+        for bucket in self.SUBSCRIPTIONS.get_histogram(
             start=self.start, end=self.end
         ):
-            frequencies[subscription.dow][subscription.hod] += 1
+            hour: datetime = bucket["hour"]
+            total: int = bucket["total"]
+            by_date: str = hour.strftime(self.DATE_FORMAT)
+            by_month: str = hour.strftime(self.MONTH_FORMAT)
+            histograms["by_dow_and_hod"][self.DAYS[hour.weekday()]][
+                hour.hour
+            ] += total
+            histograms["by_dom"][hour.day] += total
+            histograms["by_moy"][self.MONTHS[hour.month - 1]] += total
+            histograms["by_date"][by_date] = (
+                histograms["by_date"].get(by_date, 0) + total
+            )
+            histograms["margin_by_month"][by_month] = (
+                histograms["margin_by_month"].get(by_month, 0)
+                + bucket["margin"]
+            )
+        logger.debug("Histograms: %s", histograms)
+        return histograms
+
+    def get_subscriptions_by_dow_and_hod(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Searches subscriptions by day of the week and hour of the day.
+        """
+        frequencies: Dict[str, Dict[str, int]] = self.limit_buckets(
+            self.get_histograms()["by_dow_and_hod"], limit
+        )
         logger.debug("Subscriptions by DoW and HoD: %s", frequencies)
         return frequencies
 
-    def get_subscriptions_by_dom(self) -> Dict[int, int]:
+    def get_subscriptions_by_dom(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[int, int]:
         """
         Searches subscriptions by day of the month.
         """
-        frequencies: Dict[int, int] = {i: 0 for i in range(0, 32)}
-        for subscription in SubscriptionLogic.get_subscriptions(
-            start=self.start, end=self.end
-        ):
-            frequencies[subscription.day] += 1
+        frequencies: Dict[int, int] = self.limit_buckets(
+            self.get_histograms()["by_dom"], limit, other
+        )
         logger.debug("Subscriptions by DoM: %s", frequencies)
         return frequencies
 
-    def get_subscriptions_by_moy(self) -> Dict[str, int]:
+    def get_subscriptions_by_moy(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[str, int]:
         """
         Searches subscriptions by month of the year.
         """
-        frequencies: Dict[str, int] = {
-            "Jan": 0,
-            "Feb": 0,
-            "Mar": 0,
-            "Apr": 0,
-            "May": 0,
-            "Jun": 0,
-            "Jul": 0,
-            "Aug": 0,
-            "Sep": 0,
-            "Oct": 0,
-            "Nov": 0,
-            "Dec": 0,
-        }
-        for subscription in SubscriptionLogic.get_subscriptions(
-            start=self.start, end=self.end
-        ):
-            frequencies[subscription.month] += 1
+        frequencies: Dict[str, int] = self.limit_buckets(
+            self.get_histograms()["by_moy"], limit, other
+        )
         logger.debug("Subscriptions by MoY: %s", frequencies)
         return frequencies
 
-    def get_subscriptions_by_date(self) -> Dict[str, int]:
+    def get_subscriptions_by_date(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[str, int]:
         """
         Searches all subscriptions.
         """
-        histogram: Dict[str, int] = {}
-        current: datetime = self.start
-        while current <= self.end:
-            histogram[current.strftime(self.DATE_FORMAT)] = 0
-            current += timedelta(days=1)
-        subscriptions: QuerySet = SubscriptionLogic.get_subscriptions(
-            start=self.start, end=self.end
+        histogram: Dict[str, int] = self.limit_buckets(
+            self.get_histograms()["by_date"], limit, other
         )
-        for subscription in subscriptions:
-            date: str = subscription.created_at.strftime(
-                self.DATE_FORMAT
-            )
-            histogram[date] += 1
         logger.debug("Subscriptions by Date: %s", histogram)
         return histogram
 
-    def get_margin_by_month(self) -> Dict[str, float]:
+    def get_margin_by_month(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[str, float]:
         """
         Searches all Subscription margins.
         """
-        histogram: Dict[str, int] = {}
-        current: datetime = self.start
-        while current <= self.end:
-            histogram[current.strftime(self.MONTH_FORMAT)] = 0
-            current += timedelta(days=1)
-        subscriptions: QuerySet = SubscriptionLogic.get_subscriptions(
-            start=self.start, end=self.end
+        histogram: Dict[str, float] = self.limit_buckets(
+            self.get_histograms()["margin_by_month"], limit, other
         )
-        for subscription in subscriptions:
-            date: str = subscription.created_at.strftime(
-                self.MONTH_FORMAT
-            )
-            histogram[date] += subscription.margin
         logger.debug("Margin by Month: %s", histogram)
         return histogram
 
-    def get_ltv_by_campaign(self) -> Dict[Campaign, float]:
+    def get_ltv_by_campaign(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
         """
         Searches all LTVs by Campaign.
         """
-        frequencies: Dict[Campaign, int] = {}
-        for campaign in Campaign.active.search(self.search):
-            logic: CampaignLogic = CampaignLogic(campaign)
-            subscriptions: QuerySet = logic.get_subscriptions(
-                start=self.start, end=self.end
-            )
-            total_ltv: int = sum(
-                subscription.ltv for subscription in subscriptions
+        aggregates: Dict[int, Dict[str, float]] = (
+            self.SUBSCRIPTIONS.get_aggregates(
+                start=self.start,
+                end=self.end,
+                dimension="campaign",
+                ids=self.get_ids(Campaign),
             )
-            total_subscriptions: int = subscriptions.count() or 0.0001
-            frequencies[campaign] = total_ltv / total_subscriptions
-        logger.debug("Average LTV by Campaign: %s", frequencies)
-        frequencies: Dict[Campaign, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
-            )
+        frequencies: Dict[Campaign, float] = self.rank_frequencies(
+            Campaign,
+            {
+                pk: aggregate["average_ltv"]
+                for pk, aggregate in aggregates.items()
+            },
+            limit=limit,
         )
+        logger.debug("Average LTV by Campaign: %s", frequencies)
+        return ReportResult(frequencies, additive=False)
 
-    def get_margin_by_campaign(self) -> Dict[Campaign, float]:
+    def get_margin_by_campaign(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[Campaign, float]:
         """
         Searches subscription average durations by Campaign.
         """
-        frequencies: Dict[Campaign, int] = {}
-        for campaign in Campaign.active.search(self.search):
-            logic: CampaignLogic = CampaignLogic(campaign)
-            subscriptions: QuerySet = logic.get_subscriptions(
-                start=self.start, end=self.end
-            )
-            total_ltv: float = sum(
-                subscription.ltv for subscription in subscriptions
-            )
-            frequencies[campaign] = total_ltv - campaign.spend
-        logger.debug("Margin by Campaign: %s", frequencies)
-        frequencies: Dict[Campaign, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
+        campaigns: QuerySet = self.get_ids(Campaign)
+        rows: QuerySet = (
+            Campaign.active.all()
+            if campaigns is None
+            else Campaign.objects.filter(pk__in=campaigns)
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
+        aggregates: Dict[int, Dict[str, float]] = (
+            self.SUBSCRIPTIONS.get_aggregates(
+                start=self.start,
+                end=self.end,
+                dimension="campaign",
+                ids=campaigns,
             )
         )
+        frequencies: Dict[Campaign, float] = self.rank_frequencies(
+            Campaign,
+            {
+                pk: float(aggregates.get(pk, {}).get("ltv", 0))
+                - float(spend)
+                for pk, spend in rows.values_list("pk", "spend")
+            },
+            limit=limit,
+            other=other,
+        )
+        logger.debug("Margin by Campaign: %s", frequencies)
+        return frequencies
 
-    def get_retention_by_campaign(self) -> Dict[Campaign, float]:
+    def get_retention_by_campaign(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
         """
         Searches subscription average durations by Campaign.
         """
-        frequencies: Dict[Campaign, int] = {}
-        for campaign in Campaign.active.search(self.search):
-            logic: CampaignLogic = CampaignLogic(campaign)
-            subscriptions: QuerySet = logic.get_subscriptions(
-                start=self.start, end=self.end
-            )
-            total_life: int = sum(
-                subscription.life for subscription in subscriptions
+        aggregates: Dict[int, Dict[str, float]] = (
+            self.SUBSCRIPTIONS.get_aggregates(
+                start=self.start,
+                end=self.end,
+                dimension="campaign",
+                ids=self.get_ids(Campaign),
             )
-            total_subscriptions: int = subscriptions.count() or 0.0001
-            frequencies[campaign] = total_life / total_subscriptions
-        logger.debug("Average Life by Campaign: %s", frequencies)
-        frequencies: Dict[Campaign, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
-            )
+        frequencies: Dict[Campaign, float] = self.rank_frequencies(
+            Campaign,
+            {
+                pk: aggregate["average_life"]
+                for pk, aggregate in aggregates.items()
+            },
+            limit=limit,
         )
+        logger.debug("Average Life by Campaign: %s", frequencies)
+        return ReportResult(frequencies, additive=False)
 
-    def get_retention_by_product(self) -> Dict[Product, float]:
+    def get_retention_by_product(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
         """
         Searches subscription average durations by Product.
         """
-        frequencies: Dict[Product, int] = {}
-        for product in Product.active.search(self.search):
-            logic: ProductLogic = ProductLogic(product)
-            subscriptions: QuerySet = logic.get_subscriptions(
-                start=self.start, end=self.end
+        aggregates: Dict[int, Dict[str, float]] = (
+            self.SUBSCRIPTIONS.get_aggregates(
+                start=self.start,
+                end=self.end,
+                dimension="product",
+                ids=self.get_ids(Product),
             )
-            total_life: int = sum(
-                subscription.life for subscription in subscriptions
-            )
-            total_subscriptions: int = subscriptions.count() or 0.0001
-            frequencies[product] = total_life / total_subscriptions
-        logger.debug("Average Life by Product: %s", frequencies)
-        frequencies: Dict[Product, int] = dict(
-            filter(lambda x: x[1], frequencies.items())
         )
-        return dict(
-            sorted(
-                frequencies.items(), key=lambda x: x[1], reverse=True
+        frequencies: Dict[Product, float] = self.rank_frequencies(
+            Product,
+            {
+                pk: aggregate["average_life"]
+                for pk, aggregate in aggregates.items()
+            },
+            limit=limit,
+        )
+        logger.debug("Average Life by Product: %s", frequencies)
+        return ReportResult(frequencies, additive=False)
+
+    def get_retention_by_cohort(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
+        """
+        Searches subscription survivors by signup month and months
+        since signup, keeping the latest cohorts up to a limit.
+        """
+        now: datetime = timezone.now()
+        cohorts: Dict[str, Dict[int, int]] = {}
+        for cohort, lives in self.SUBSCRIPTIONS.get_cohorts(
+            start=self.start,
+            end=self.end,
+            ids=self.get_ids(Campaign),
+        ).items():
+            age: int = (now.year - cohort.year) * 12 + (
+                now.month - cohort.month
+            )
+            survivors: List[int] = list(
+                accumulate(
+                    lives.get(offset, 0)
+                    for offset in range(max(age, *lives), -1, -1)
+                )
+            )[::-1]
+            cohorts[cohort.strftime(self.MONTH_FORMAT)] = dict(
+                enumerate(survivors)
             )
+        cohorts: Dict[str, Dict[int, int]] = self.limit_buckets(
+            cohorts, limit
         )
+        logger.debug("Retention by Cohort: %s", cohorts)
+        return ReportResult(cohorts, additive=False)
 
-    def get_events_by_date(self) -> Dict[str, int]:
+    def get_funnel_by_campaign(
+        self, limit: int = None, other: bool = False
+    ) -> ReportResult:
+        """
+        Searches views, clicks, events and subscriptions by Campaign,
+        with their click and conversion rates. Counts and rates share
+        each row, so the funnel has no total.
+        """
+        stages: Dict[int, Dict[str, int]] = self.EVENTS.get_funnel(
+            start=self.start,
+            end=self.end,
+            ids=self.get_ids(Campaign),
+            limit=limit,
+            other=other,
+        )
+        rows: Dict[int, Model] = Campaign.active.in_bulk(
+            [pk for pk in stages if pk is not None]
+        )
+        funnel: Dict[Campaign, Dict[str, float]] = {}
+        for pk, stage in sorted(
+            stages.items(),
+            key=lambda x: (x[0] is None, -x[1]["events"], x[0] or 0),
+        ):
+            if pk is not None and pk not in rows:
+                continue
+            funnel[rows[pk] if pk is not None else self.OTHER] = {
+                **stage,
+                "click_rate": (
+                    stage["clicks"] / stage["views"] * 100
+                    if stage["views"]
+                    else 0.0
+                ),
+                "conversion_rate": (
+                    stage["subscriptions"] / stage["events"] * 100
+                    if stage["events"]
+                    else 0.0
+                ),
+            }
+        logger.debug("Funnel by Campaign: %s", funnel)
+        return ReportResult(funnel, additive=False)
+
+    def get_events_by_date(
+        self, limit: int = None, other: bool = False
+    ) -> Dict[str, int]:
         """
         Searches all events.
         """
-        histogram: Dict[str, int] = {}
-        current: datetime = self.start
-        while current <= self.end:
-            histogram[current.strftime(self.DATE_FORMAT)] = 0
-            current += timedelta(days=1)
-        events: QuerySet = EventLogic.get_events(
+        histogram: Dict[str, int] = self.get_buckets(self.DATE_FORMAT)
+        for bucket in self.EVENTS.get_histogram(
             start=self.start, end=self.end
+        ):
+            date: str = bucket["date"].strftime(self.DATE_FORMAT)
+            histogram[date] = histogram.get(date, 0) + bucket["total"]
+        histogram: Dict[str, int] = self.limit_buckets(
+            histogram, limit, other
         )
-        for event in events:
-            date: str = event.created_at.strftime(self.DATE_FORMAT)
-            histogram[date] += 1
         logger.debug("Events by Date: %s", histogram)
         return histogram
+
+
+class ReportCacheLogic:
+    """
+    Business logic related to caching Reports.
+
+    Cache keys include a global version and one version per day of
+    the report window, or of its whole months for sections read from
+    monthly sketches, so writes only invalidate the windows that
+    contain the written day. Versions live in their own cache, so
+    culling report entries never drops them, and days are only
+    versioned once written, so cold windows cost no writes.
+    """
+
+    PREFIX: str = "reports"
+    VERSIONS: str = "versions"
+
+    def __init__(self, logic: ReportLogic) -> None:
+        """
+        Report Cache Logic constructor.
+        """
+        self.logic: ReportLogic = logic
+        self.versions: Dict[Tuple[date, date], str] = {}
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.logic}>"
+
+    @classmethod
+    def get_day(cls, value: datetime) -> date:
+        """
+        Returns the local day of a date or datetime.
+        """
+        if not isinstance(value, datetime):
+            return value
+        if timezone.is_naive(value):
+            value: datetime = timezone.make_aware(value)
+        return timezone.localtime(
+            value, timezone.get_default_timezone()
+        ).date()
+
+    @classmethod
+    def get_versions(cls) -> BaseCache:
+        """
+        Returns the cache holding the versions.
+        """
+        return caches[cls.VERSIONS]
+
+    @classmethod
+    def get_version_keys(cls, start: date, end: date) -> List[str]:
+        """
+        Returns the version keys of a date range.
+        """
+        keys: List[str] = [f"{cls.PREFIX}:version"]
+        current: date = start
+        while current <= end:
+            keys.append(f"{cls.PREFIX}:version:{current.isoformat()}")
+            current += timedelta(days=1)
+        return keys
+
+    @classmethod
+    def invalidate(cls, start: date = None, end: date = None) -> None:
+        """
+        Invalidates cached reports overlapping a date range,
+        or all of them when no range is given.
+        """
+        if start is None:
+            keys: List[str] = [f"{cls.PREFIX}:version"]
+        else:
+            keys: List[str] = cls.get_version_keys(start, end)[1:]
+        cls.get_versions().set_many(
+            {key: uuid4().hex for key in keys}, None
+        )
+        logger.debug("Cache Invalidated: %s %s %s", cls, start, end)
+
+    def get_range(self, section: str = None) -> Tuple[date, date]:
+        """
+        Returns the days a report section depends on.
+        """
+        start: date = self.get_day(
+            self.logic.previous or self.logic.start
+        )
+        end: date = self.get_day(self.logic.end)
+        if section in self.logic.MONTHLY:
+            start: date = start.replace(day=1)
+            end: date = self.logic.QUANTILES.get_next_month(
+                end.replace(day=1)
+            ) - timedelta(days=1)
+        return start, end
+
+    def get_version(self, section: str = None) -> str:
+        """
+        Returns the current version of the days a report section
+        depends on. Days never invalidated have no version of their
+        own, and the global version is created on first use, so
+        losing the versions invalidates every report.
+        """
+        days: Tuple[date, date] = self.get_range(section)
+        if days in self.versions:
+            return self.versions[days]
+        keys: List[str] = self.get_version_keys(*days)
+        versions: BaseCache = self.get_versions()
+        values: Dict[str, str] = versions.get_many(keys)
+        if keys[0] not in values:
+            versions.add(keys[0], uuid4().hex, None)
+            values[keys[0]] = versions.get(keys[0])
+        self.versions[days] = md5(
+            "|".join(
+                str(values.get(key, "")) for key in keys
+            ).encode()
+        ).hexdigest()
+        return self.versions[days]
+
+    def get_key(
+        self, section: str, limit: int = None, other: bool = False
+    ) -> str:
+        """
+        Returns the cache key of a report section.
+        """
+        filters: List[str] = [
+            f"{self.logic.__class__.__module__}.{self.logic.__class__.__name__}",
+            section,
+            self.logic.search.strip(),
+            str(limit),
+            str(other),
+            str(self.logic.compare),
+        ]
+        for value in (self.logic.start, self.logic.end):
+            if isinstance(value, datetime):
+                value: datetime = value.replace(
+                    second=0, microsecond=0
+                )
+            filters.append(value.isoformat())
+        digest: str = md5("|".join(filters).encode()).hexdigest()
+        return (
+            f"{self.PREFIX}:{section}:{digest}:"
+            + self.get_version(section)
+        )
+
+    def get_section(
+        self, section: str, limit: int = None, other: bool = False
+    ) -> ReportResult:
+        """
+        Returns a report section from the cache, computing it on a miss.
+        """
+        key: str = self.get_key(section, limit=limit, other=other)
+        data: ReportResult = cache.get(key)
+        if data is None:
+            logger.debug("Cache Miss: %s %s", self, section)
+            data: ReportResult = self.logic.get_section(
+                section, limit=limit, other=other
+            )
+            cache.set(key, data, settings.REPORT_CACHE_TIMEOUT)
+        return data
+
+
+class ReportRunnerLogic:
+    """
+    Business logic related to computing Report sections concurrently.
+
+    Workers are shared by all requests of the process. Futures cannot
+    be stopped once started, so the queries of each section are
+    interrupted by the database when the report times out, and
+    sections still queued by then are skipped.
+    """
+
+    EXECUTOR: ThreadPoolExecutor = None
+    LOCK: Lock = Lock()
+
+    def __init__(self, cache: ReportCacheLogic) -> None:
+        """
+        Report Runner Logic constructor.
+        """
+        self.cache: ReportCacheLogic = cache
+        self.partial: List[str] = []
+        self.deadline: float = None
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.cache.logic}>"
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool shared by the process.
+        """
+        with cls.LOCK:
+            if cls.EXECUTOR is None:
+                cls.EXECUTOR = ThreadPoolExecutor(
+                    max_workers=settings.REPORT_WORKERS,
+                    thread_name_prefix="reports",
+                )
+        return cls.EXECUTOR
+
+    def set_deadline(self, connection: BaseDatabaseWrapper) -> None:
+        """
+        Makes the database interrupt the queries of the worker
+        connection once the report times out.
+        """
+        remaining: float = self.deadline - monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Report timed out before the section")
+        connection.ensure_connection()
+        if connection.vendor == "sqlite":
+            connection.connection.set_progress_handler(
+                lambda: monotonic() > self.deadline, 10000
+            )
+        elif connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SET statement_timeout = %s",
+                    [max(int(remaining * 1000), 1)],
+                )
+
+    def get_section(
+        self, section: str, limit: int = None, other: bool = False
+    ) -> ReportResult:
+        """
+        Computes a report section on a worker thread, until the
+        report times out.
+        """
+        try:
+            self.set_deadline(connections["default"])
+            return self.cache.get_section(
+                section, limit=limit, other=other
+            )
+        except OperationalError as error:
+            if monotonic() > self.deadline:
+                raise TimeoutError("Section interrupted") from error
+            raise
+        finally:
+            connections.close_all()
+
+    def run(
+        self,
+        sections: List[str],
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[str, ReportResult]:
+        """
+        Computes report sections in parallel. Sections that fail or
+        time out are reported empty and listed in `partial`.
+        """
+        executor: ThreadPoolExecutor = self.get_executor()
+        self.deadline: float = monotonic() + settings.REPORT_TIMEOUT
+        for section in sections:
+            self.cache.get_version(section)
+        futures: Dict[str, Future] = {
+            section: executor.submit(
+                self.get_section, section, limit, other
+            )
+            for section in sections
+        }
+        wait(futures.values(), timeout=settings.REPORT_TIMEOUT)
+        results: Dict[str, ReportResult] = {}
+        for section, future in futures.items():
+            if not future.done() or isinstance(
+                future.exception(), TimeoutError
+            ):
+                future.cancel()
+                logger.warning(
+                    "Section Timeout: %s %s", self, section
+                )
+                self.partial.append(section)
+                results[section] = ReportResult({})
+            elif future.exception():
+                logger.error(
+                    "Section Error: %s %s",
+                    self,
+                    section,
+                    exc_info=future.exception(),
+                )
+                self.partial.append(section)
+                results[section] = ReportResult({})
+            else:
+                results[section] = future.result()
+        return results
@@ -0,0 +1,39 @@
+from typing import Dict, List
+
+from django.db.models import Model
+from rest_framework.serializers import BaseSerializer
+
+from reports.logic import ReportResult
+
+
+class ReportSerializer(BaseSerializer):
+    """
+    Report Section Serializer.
+    """
+
+    def to_representation(self, data: ReportResult) -> List[Dict]:
+        """
+        Serializes a report section as a list of rows, with the share
+        of each row in the section total, if it has one. Compared rows
+        also have their previous value and delta.
+        """
+        rows: List[Dict] = [
+            {
+                "id": key.pk if isinstance(key, Model) else None,
+                "title": key.title if isinstance(key, Model) else key,
+                "value": (
+                    self.to_representation(value)
+                    if isinstance(value, ReportResult)
+                    else value
+                ),
+            }
+            for key, value in data.items()
+        ]
+        if data.additive:
+            for row, key in zip(rows, data):
+                row["share"] = data.shares[key]
+        if data.previous is not None:
+            for row, key in zip(rows, data):
+                row["previous"] = data.previous.get(key, 0)
+                row["delta"] = data.deltas[key]
+        return rows
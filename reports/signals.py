@@ -0,0 +1,90 @@
+"""
+Report cache invalidation on writes.
+"""
+
+from datetime import date
+from typing import List
+
+from analytics.signals import ingested, refreshed
+from campaigns.models import Campaign
+from cities.models import City
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from events.models import Event
+from products.models import Product
+from rollups.signals import rebuilt
+from states.models import State
+from subscriptions.models import Subscription
+
+from reports.logic import ReportCacheLogic, ReportLogic
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_day(
+    sender: type, instance: Model, **kwargs: dict
+) -> None:
+    """
+    Invalidates the cached reports containing the day of a row.
+    """
+    day: date = ReportCacheLogic.get_day(instance.created_at)
+    ReportCacheLogic.invalidate(day, day)
+
+
+@receiver(ingested, sender=Event)
+@receiver(ingested, sender=Subscription)
+def invalidate_days(
+    sender: type, instances: List[Model], **kwargs: dict
+) -> None:
+    """
+    Invalidates the cached reports containing the days of bulk
+    inserted rows.
+    """
+    days: List[date] = [
+        ReportCacheLogic.get_day(instance.created_at)
+        for instance in instances
+    ]
+    ReportCacheLogic.invalidate(min(days), max(days))
+
+
+@receiver(rebuilt)
+@receiver(refreshed)
+def invalidate_range(
+    sender: type, start: date, end: date, **kwargs: dict
+) -> None:
+    """
+    Invalidates the cached reports containing the days of a rebuilt
+    rollup or sketch range.
+    """
+    ReportCacheLogic.invalidate(start, end)
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_all(
+    sender: type, instance: Model, **kwargs: dict
+) -> None:
+    """
+    Invalidates all cached reports.
+    """
+    ReportCacheLogic.invalidate()
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+def invalidate_geography(
+    sender: type, instance: Model, **kwargs: dict
+) -> None:
+    """
+    Invalidates the city, state and country map and all cached
+    reports.
+    """
+    ReportLogic.invalidate_geography()
+    ReportCacheLogic.invalidate()
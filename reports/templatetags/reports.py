@@ -2,16 +2,23 @@
 Custom report filters for Django templates.
 """
 
-from typing import Dict
+from typing import Dict, Union
 
 from django import template
 
+from reports.logic import ReportResult
+
 register: template.Library = template.Library()
 
 
 @register.filter(name="total_frequency")
-def total_frequency(frequencies: Dict[str, int]) -> int:
+def total_frequency(
+    frequencies: Union[ReportResult, Dict[str, int]],
+) -> Union[float, int]:
     """
-    Returns the total of a frequency table.
+    Returns the total of a frequency table, or the grand total of a
+    report section.
     """
+    if isinstance(frequencies, ReportResult):
+        return frequencies.total
     return sum(frequencies.values())
@@ -0,0 +1,18 @@
+from rest_framework.request import Request
+from rest_framework.throttling import UserRateThrottle
+from rest_framework.views import APIView
+
+
+class ReportThrottle(UserRateThrottle):
+    """
+    Rate limit of each Report section, per user.
+    """
+
+    scope: str = "reports"
+
+    def get_cache_key(self, request: Request, view: APIView) -> str:
+        """
+        Throttles each report section separately.
+        """
+        key: str = super().get_cache_key(request, view)
+        return f"{key}_{view.kwargs.get('section', '')}"
@@ -2,8 +2,14 @@ from typing import List
 
 from django.urls import URLResolver, path
 
-from reports.views import DashboardView
+from reports.views import DashboardView, ReportsView, ReportView
 
 urlpatterns: List[URLResolver] = [
     path("", DashboardView.as_view(), name="dashboard"),
+    path("api/reports", ReportsView.as_view(), name="reports"),
+    path(
+        "api/reports/<str:section>",
+        ReportView.as_view(),
+        name="report",
+    ),
 ]
@@ -1,19 +1,78 @@
 import logging
 from datetime import datetime, timedelta
+from typing import Dict, List
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, QueryDict
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
+from django.utils.module_loading import import_string
 from django.views import View
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from reports.forms import DashboardForm
-from reports.logic import ReportLogic
+from reports.logic import (
+    ReportCacheLogic,
+    ReportLogic,
+    ReportResult,
+    ReportRunnerLogic,
+)
+from reports.serializers import ReportSerializer
+from reports.throttles import ReportThrottle
 
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class DashboardView(View):
+class ReportMixin:
+    """
+    Report filters shared by the Dashboard and the Report API.
+    """
+
+    def get_filters(self, params: QueryDict) -> Dict[str, object]:
+        """
+        Returns the report filters, defaulting to the last 30 days.
+        """
+        filters: Dict[str, object] = {
+            "start": datetime.now() - timedelta(days=30),
+            "end": datetime.now(),
+            "search": "",
+        }
+        form: DashboardForm = DashboardForm(params)
+        if params and form.is_valid():
+            for key, value in form.cleaned_data.items():
+                if value:
+                    filters[key] = value
+        return filters
+
+    def get_logic(self, params: QueryDict) -> ReportLogic:
+        """
+        Returns the configured Report Logic for the filters.
+        """
+        logic: ReportLogic = import_string(settings.REPORT_LOGIC)(
+            **self.get_filters(params)
+        )
+        logger.debug("Report: %s", logic)
+        return logic
+
+    def get_limits(self, params: QueryDict) -> Dict[str, object]:
+        """
+        Returns the row limit and Other row options, or None when
+        the limit is not a positive integer.
+        """
+        limit: str = params.get("limit", "")
+        if limit and (not limit.isdigit() or not int(limit)):
+            return None
+        return {
+            "limit": int(limit) if limit else None,
+            "other": params.get("other") in ("1", "true"),
+        }
+
+
+class DashboardView(ReportMixin, View):
     """
     Reports View
     """
@@ -23,56 +82,102 @@ class DashboardView(View):
         """
         GET /dashboard
         """
-        start: datetime = datetime.now() - timedelta(days=30)
-        end: datetime = datetime.now()
-        search: str = ""
-        form: DashboardForm = DashboardForm(request.GET)
-        if request.GET and form.is_valid():
-            search: str = form.cleaned_data["search"]
-            start: datetime = form.cleaned_data["start"]
-            end: datetime = form.cleaned_data["end"]
-        logic: ReportLogic = ReportLogic(
-            start=start,
-            end=end,
-            search=search,
-        )
-        logger.debug("Dashboard: %s", logic)
         return render(
             request,
             "dashboard.html",
             {
-                "form": form,
-                "filters": {
-                    "start": start,
-                    "end": end,
-                    "search": search,
-                },
-                "retention": {
-                    "by_campaign": logic.get_retention_by_campaign(),
-                    "by_product": logic.get_retention_by_product(),
-                },
-                "ltv": {
-                    "by_campaign": logic.get_ltv_by_campaign(),
-                },
-                "margin": {
-                    "by_month": logic.get_margin_by_month(),
-                    "by_campaign": logic.get_margin_by_campaign(),
+                "form": DashboardForm(request.GET),
+                "filters": self.get_filters(request.GET),
+            },
+        )
+
+
+class ReportsView(ReportMixin, APIView):
+    """
+    Report Sections API View.
+    """
+
+    def get(self, request: Request) -> Response:
+        """
+        GET /api/reports
+        """
+        logic: ReportLogic = self.get_logic(request.query_params)
+        sections: List[str] = list(logic.SECTIONS)
+        if request.query_params.get("sections"):
+            sections: List[str] = request.query_params[
+                "sections"
+            ].split(",")
+        if set(sections) - set(logic.SECTIONS):
+            return Response(
+                {
+                    "sections": sorted(
+                        set(sections) - set(logic.SECTIONS)
+                    )
                 },
-                "events": {
-                    "by_date": logic.get_events_by_date(),
-                    "by_page": logic.get_events_by_page(),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limits: Dict[str, object] = self.get_limits(
+            request.query_params
+        )
+        if limits is None:
+            return Response(
+                {"limit": request.query_params["limit"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        runner: ReportRunnerLogic = ReportRunnerLogic(
+            ReportCacheLogic(logic)
+        )
+        data: Dict[str, ReportResult] = runner.run(sections, **limits)
+        return Response(
+            {
+                "sections": {
+                    section: ReportSerializer(data[section]).data
+                    for section in sections
                 },
-                "subscriptions": {
-                    "by_date": logic.get_subscriptions_by_date(),
-                    "by_campaign": logic.get_subscriptions_by_campaign(),
-                    "by_audience": logic.get_subscriptions_by_audience(),
-                    "by_product": logic.get_subscriptions_by_product(),
-                    "by_city": logic.get_subscriptions_by_city(),
-                    "by_state": logic.get_subscriptions_by_state(),
-                    "by_country": logic.get_subscriptions_by_country(),
-                    "by_dow_and_hod": logic.get_subscriptions_by_dow_and_hod(),
-                    "by_dom": logic.get_subscriptions_by_dom(),
-                    "by_moy": logic.get_subscriptions_by_moy(),
+                "totals": {
+                    section: data[section].total
+                    for section in sections
                 },
+                "partial": runner.partial,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ReportView(ReportMixin, APIView):
+    """
+    Report Section API View.
+    """
+
+    throttle_classes: List[type] = [ReportThrottle]
+
+    def get(self, request: Request, section: str) -> Response:
+        """
+        GET /api/reports/:section
+        """
+        logic: ReportLogic = self.get_logic(request.query_params)
+        if section not in logic.SECTIONS:
+            return Response(
+                {"section": section}, status=status.HTTP_404_NOT_FOUND
+            )
+        limits: Dict[str, object] = self.get_limits(
+            request.query_params
+        )
+        if limits is None:
+            return Response(
+                {"limit": request.query_params["limit"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        runner: ReportRunnerLogic = ReportRunnerLogic(
+            ReportCacheLogic(logic)
+        )
+        data: ReportResult = runner.run([section], **limits)[section]
+        return Response(
+            {
+                "section": section,
+                "rows": ReportSerializer(data).data,
+                "total": data.total,
+                "partial": section in runner.partial,
             },
+            status=status.HTTP_200_OK,
         )
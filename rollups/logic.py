@@ -0,0 +1,551 @@
+import logging
+from datetime import date, datetime, time, timedelta, tzinfo
+from itertools import islice
+from typing import Dict, Iterator, List, Set, Tuple
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    Max,
+    Min,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.expressions import Combinable
+from django.db.models.functions import (
+    Coalesce,
+    ExtractHour,
+    ExtractMonth,
+    ExtractYear,
+    TruncDate,
+)
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from events.logic import EventLogic
+from events.models import Event
+from reports.logic import ReportLogic
+from subscriptions.logic import SubscriptionLogic
+from subscriptions.models import Subscription
+
+from rollups.models import Rollup
+from rollups.signals import rebuilt
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class RollupLogic:
+    """
+    Business logic related to Rollups.
+    """
+
+    BATCH_SIZE: int = 1000
+    MEASURE: str = "subscriptions"
+    DIMENSIONS: Dict[str, str] = {
+        "campaign": "campaign",
+        "audience": "campaign__audience",
+        "product": "product",
+        "city": "city",
+        "state": "city__state",
+        "country": "city__state__country",
+        "page": "page",
+    }
+
+    def __init__(self, rollup: Rollup) -> None:
+        """
+        Rollup Logic constructor.
+        """
+        self.rollup: Rollup = rollup
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.rollup}>"
+
+    @classmethod
+    def get_hour(cls, value: datetime) -> Tuple[date, int]:
+        """
+        Returns the local day and hour of a date or datetime.
+        """
+        if not isinstance(value, datetime):
+            value: datetime = datetime.combine(value, time.min)
+        if timezone.is_naive(value):
+            value: datetime = timezone.make_aware(value)
+        value: datetime = timezone.localtime(
+            value, timezone.get_default_timezone()
+        )
+        return value.date(), value.hour
+
+    @classmethod
+    def get_rollups(cls, start: datetime, end: datetime) -> QuerySet:
+        """
+        Returns rollups by date range, at hour resolution. Both ends
+        are truncated to their hour, and the end hour is excluded, so
+        a date-only end stops at the start of that day.
+        """
+        start_day, start_hour = cls.get_hour(start)
+        end_day, end_hour = cls.get_hour(end)
+        rollups: QuerySet = Rollup.objects.filter(
+            Q(day__gt=start_day)
+            | Q(day=start_day, hour__gte=start_hour),
+            Q(day__lt=end_day) | Q(day=end_day, hour__lt=end_hour),
+            **{f"{cls.MEASURE}__gt": 0},
+        )
+        logger.debug("Rollups: %s %s", cls, rollups)
+        return rollups
+
+    @classmethod
+    def get_frequencies(
+        cls,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, int]:
+        """
+        Counts rolled up rows by date range, grouped by a dimension. With a
+        limit, only the largest groups are returned, ordered and
+        limited by the database, and the rest is summed into a None
+        group if other is set.
+        """
+        field: str = cls.DIMENSIONS[dimension]
+        rows: QuerySet = cls.get_rollups(start=start, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        groups: QuerySet = rows.values_list(field).annotate(
+            total=Sum(cls.MEASURE)
+        )
+        if limit is None:
+            frequencies: Dict[int, int] = dict(groups.order_by())
+        else:
+            frequencies: Dict[int, int] = dict(
+                groups.order_by("-total", field)[:limit]
+            )
+        if limit is not None and other:
+            rest: int = (
+                rows.aggregate(total=Sum(cls.MEASURE))["total"] or 0
+            ) - sum(frequencies.values())
+            if rest:
+                frequencies[None] = rest
+        logger.debug(
+            "Frequencies: %s %s %s", cls, dimension, frequencies
+        )
+        return frequencies
+
+    @classmethod
+    def get_comparison(
+        cls,
+        start: datetime,
+        end: datetime,
+        previous: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Counts rolled up rows by date range and by the previous period,
+        from previous to start, grouped by a dimension in a single
+        scan. With a limit, only the largest current groups are
+        returned, and the rest is summed into a None group if other
+        is set.
+        """
+        field: str = cls.DIMENSIONS[dimension]
+        start_day, start_hour = cls.get_hour(start)
+        current: Q = Q(day__gt=start_day) | Q(
+            day=start_day, hour__gte=start_hour
+        )
+        rows: QuerySet = cls.get_rollups(start=previous, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        totals: Dict[str, Sum] = {
+            "current": Coalesce(
+                Sum(cls.MEASURE, filter=current), Value(0)
+            ),
+            "previous": Coalesce(
+                Sum(cls.MEASURE, filter=~current), Value(0)
+            ),
+        }
+        groups: QuerySet = (
+            rows.values_list(field)
+            .annotate(**totals)
+            .order_by("-current", "-previous", field)
+        )
+        if limit is not None:
+            groups: QuerySet = groups[:limit]
+        comparison: Dict[int, Tuple[int, int]] = {
+            pk: (now, before) for pk, now, before in groups
+        }
+        if limit is not None and other:
+            aggregate: Dict[str, int] = rows.aggregate(**totals)
+            rest: Tuple[int, int] = (
+                aggregate["current"]
+                - sum(now for now, _ in comparison.values()),
+                aggregate["previous"]
+                - sum(before for _, before in comparison.values()),
+            )
+            if any(rest):
+                comparison[None] = rest
+        logger.debug(
+            "Comparison: %s %s %s", cls, dimension, comparison
+        )
+        return comparison
+
+    @classmethod
+    def get_subscription_rows(
+        cls, start: datetime, end: datetime
+    ) -> Iterator[Rollup]:
+        """
+        Rolls up active subscriptions by hour and dimensions.
+        """
+        tz: tzinfo = timezone.get_default_timezone()
+        decimal: DecimalField = DecimalField(
+            max_digits=20, decimal_places=4
+        )
+        canceled: Q = Q(canceled_at__isnull=False)
+        rows: QuerySet = (
+            Subscription.active.filter(
+                created_at__gte=start, created_at__lt=end
+            )
+            .annotate(
+                day=TruncDate("created_at", tzinfo=tz),
+                hour=ExtractHour("created_at", tzinfo=tz),
+            )
+            .values(
+                "day",
+                "hour",
+                "product",
+                campaign=F("event__metric__campaign"),
+                city=F("event__metric__campaign__city"),
+                page=F("event__metric__page"),
+            )
+            .annotate(
+                subscriptions=Count("pk"),
+                revenue=Sum("price"),
+                cost=Sum("product__cost"),
+                life=Sum(
+                    SubscriptionLogic.get_life(), filter=canceled
+                ),
+                ltv=Sum(
+                    SubscriptionLogic.get_ltv(),
+                    filter=canceled,
+                    output_field=decimal,
+                ),
+                open_subscriptions=Count("pk", filter=~canceled),
+                open_margin=Sum(
+                    SubscriptionLogic.get_margin(),
+                    filter=~canceled,
+                    output_field=decimal,
+                ),
+            )
+            .order_by()
+        )
+        for row in rows.iterator():
+            yield Rollup(
+                day=row["day"],
+                hour=row["hour"],
+                campaign_id=row["campaign"],
+                product_id=row["product"],
+                city_id=row["city"],
+                page_id=row["page"],
+                subscriptions=row["subscriptions"],
+                revenue=row["revenue"],
+                cost=row["cost"],
+                life=row["life"] or 0,
+                ltv=row["ltv"] or 0,
+                open_subscriptions=row["open_subscriptions"],
+                open_margin=row["open_margin"] or 0,
+            )
+
+    @classmethod
+    def get_event_rows(
+        cls, start: datetime, end: datetime
+    ) -> Iterator[Rollup]:
+        """
+        Rolls up active events by hour and dimensions.
+        """
+        tz: tzinfo = timezone.get_default_timezone()
+        rows: QuerySet = (
+            Event.active.filter(
+                created_at__gte=start, created_at__lt=end
+            )
+            .annotate(
+                day=TruncDate("created_at", tzinfo=tz),
+                hour=ExtractHour("created_at", tzinfo=tz),
+            )
+            .values(
+                "day",
+                "hour",
+                campaign=F("metric__campaign"),
+                city=F("metric__campaign__city"),
+                page=F("metric__page"),
+            )
+            .annotate(events=Count("pk"))
+            .order_by()
+        )
+        for row in rows.iterator():
+            yield Rollup(
+                day=row["day"],
+                hour=row["hour"],
+                campaign_id=row["campaign"],
+                city_id=row["city"],
+                page_id=row["page"],
+                events=row["events"],
+            )
+
+    @classmethod
+    def rebuild(
+        cls, start: date, end: date, refreshed_at: datetime = None
+    ) -> int:
+        """
+        Rebuilds the rollups of a date range.
+        """
+        refreshed_at: datetime = refreshed_at or timezone.now()
+        tz: tzinfo = timezone.get_default_timezone()
+        since: datetime = timezone.make_aware(
+            datetime.combine(start, time.min), tz
+        )
+        until: datetime = timezone.make_aware(
+            datetime.combine(end + timedelta(days=1), time.min), tz
+        )
+        total: int = 0
+        with transaction.atomic():
+            Rollup.objects.filter(
+                day__gte=start, day__lte=end
+            ).delete()
+            for rows in (
+                cls.get_subscription_rows(since, until),
+                cls.get_event_rows(since, until),
+            ):
+                while True:
+                    batch: List[Rollup] = list(
+                        islice(rows, cls.BATCH_SIZE)
+                    )
+                    if not batch:
+                        break
+                    for rollup in batch:
+                        rollup.refreshed_at = refreshed_at
+                    Rollup.objects.bulk_create(batch)
+                    total += len(batch)
+        rebuilt.send(sender=cls, start=start, end=end)
+        logger.debug("Rebuilt: %s %s %s %s", cls, start, end, total)
+        return total
+
+    @classmethod
+    def get_ranges(cls, days: Set[date]) -> List[Tuple[date, date]]:
+        """
+        Merges days into contiguous date ranges.
+        """
+        ranges: List[Tuple[date, date]] = []
+        for day in sorted(days):
+            if ranges and ranges[-1][1] + timedelta(days=1) == day:
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+        return ranges
+
+    @classmethod
+    def refresh(cls) -> int:
+        """
+        Rebuilds the days touched since the last refresh.
+        """
+        refreshed_at: datetime = timezone.now()
+        tz: tzinfo = timezone.get_default_timezone()
+        since: datetime = Rollup.objects.aggregate(
+            since=Max("refreshed_at")
+        )["since"]
+        days: Set[date] = set()
+        for model in (Subscription, Event):
+            if since is None:
+                bounds: Dict[str, datetime] = model.objects.aggregate(
+                    start=Min("created_at"), end=Max("created_at")
+                )
+                if bounds["start"]:
+                    days |= {
+                        timezone.localtime(
+                            bounds["start"], tz
+                        ).date(),
+                        timezone.localtime(bounds["end"], tz).date(),
+                    }
+            else:
+                days |= set(
+                    model.objects.filter(updated_at__gte=since)
+                    .annotate(day=TruncDate("created_at", tzinfo=tz))
+                    .values_list("day", flat=True)
+                    .distinct()
+                )
+        if since is None and days:
+            ranges: List[Tuple[date, date]] = [(min(days), max(days))]
+        else:
+            ranges: List[Tuple[date, date]] = cls.get_ranges(days)
+        total: int = sum(
+            cls.rebuild(start, end, refreshed_at=refreshed_at)
+            for start, end in ranges
+        )
+        logger.debug("Refreshed: %s %s %s", cls, since, total)
+        return total
+
+
+class SubscriptionRollupLogic(RollupLogic):
+    """
+    Business logic related to Subscriptions, answered from Rollups.
+    """
+
+    MEASURE: str = "subscriptions"
+
+    @classmethod
+    def get_histogram(
+        cls, start: datetime, end: datetime
+    ) -> List[Dict[str, float]]:
+        """
+        Returns subscription counts and margins by hour of creation.
+        """
+        tz: tzinfo = timezone.get_default_timezone()
+        histogram: List[Dict[str, float]] = [
+            {
+                "hour": timezone.make_aware(
+                    datetime.combine(row["day"], time(row["hour"])),
+                    tz,
+                ),
+                "total": row["total"],
+                "margin": row["margin"],
+            }
+            for row in cls.get_rollups(start=start, end=end)
+            .values("day", "hour")
+            .annotate(
+                total=Sum("subscriptions"),
+                margin=Sum(F("revenue") - F("cost")),
+            )
+            .order_by("day", "hour")
+        ]
+        logger.debug("Histogram: %s %s", cls, histogram)
+        return histogram
+
+    @classmethod
+    def get_age(cls) -> Combinable:
+        """
+        Returns the months elapsed since the rolled up day,
+        as a database expression.
+        """
+        now: datetime = timezone.now()
+        return Value(now.year * 12 + now.month) - (
+            ExtractYear("day") * 12 + ExtractMonth("day")
+        )
+
+    @classmethod
+    def get_aggregates(
+        cls,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        ids: List[int] = None,
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Aggregates subscription life, margin and LTV by date range,
+        grouped by a dimension.
+        """
+        field: str = cls.DIMENSIONS[dimension]
+        decimal: DecimalField = DecimalField(
+            max_digits=20, decimal_places=4
+        )
+        rows: QuerySet = cls.get_rollups(start=start, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        aggregates: Dict[int, Dict[str, float]] = {}
+        for row in (
+            rows.values(field)
+            .annotate(
+                total=Sum("subscriptions"),
+                life=Sum(
+                    F("life")
+                    + F("open_subscriptions") * cls.get_age()
+                ),
+                margin=Sum(
+                    F("revenue") - F("cost"), output_field=decimal
+                ),
+                ltv=Sum(
+                    F("ltv") + F("open_margin") * cls.get_age(),
+                    output_field=decimal,
+                ),
+            )
+            .order_by()
+        ):
+            aggregates[row.pop(field)] = {
+                **row,
+                "average_life": row["life"] / row["total"],
+                "average_margin": row["margin"] / row["total"],
+                "average_ltv": row["ltv"] / row["total"],
+            }
+        logger.debug(
+            "Aggregates: %s %s %s", cls, dimension, aggregates
+        )
+        return aggregates
+
+    @classmethod
+    def get_cohorts(
+        cls, start: datetime, end: datetime, ids: List[int] = None
+    ) -> Dict[datetime, Dict[int, int]]:
+        """
+        Counts subscriptions by signup month and months live. Rollups
+        only keep the total life of each hour, so cohorts are counted
+        from the subscriptions themselves.
+        """
+        return SubscriptionLogic.get_cohorts(
+            start=start, end=end, ids=ids
+        )
+
+
+class EventRollupLogic(RollupLogic):
+    """
+    Business logic related to Events, answered from Rollups.
+    """
+
+    MEASURE: str = "events"
+
+    @classmethod
+    def get_histogram(
+        cls, start: datetime, end: datetime
+    ) -> QuerySet:
+        """
+        Returns event counts by date of creation.
+        """
+        histogram: QuerySet = (
+            cls.get_rollups(start=start, end=end)
+            .values(date=F("day"))
+            .annotate(total=Sum("events"))
+            .order_by("date")
+        )
+        logger.debug("Histogram: %s %s", cls, histogram)
+        return histogram
+
+    @classmethod
+    def get_funnel(
+        cls,
+        start: datetime,
+        end: datetime,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, Dict[str, int]]:
+        """
+        Counts views, clicks, events and subscriptions by campaign.
+        Rollups do not keep the metric type, so the funnel is counted
+        from the events themselves.
+        """
+        return EventLogic.get_funnel(
+            start=start, end=end, ids=ids, limit=limit, other=other
+        )
+
+
+class RollupReportLogic(ReportLogic):
+    """
+    Business logic related to Reports, answered from Rollups.
+    """
+
+    SUBSCRIPTIONS: type = SubscriptionRollupLogic
+    EVENTS: type = EventRollupLogic
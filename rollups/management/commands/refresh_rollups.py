@@ -0,0 +1,51 @@
+from datetime import date
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from rollups.logic import RollupLogic
+
+
+class Command(BaseCommand):
+    """
+    Refreshes the Subscription and Event rollups.
+    """
+
+    help: str = (
+        "Refreshes rollups incrementally, or rebuilds a date range "
+        "after backfills and soft deletes."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Command line arguments.
+        """
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to rebuild, as YYYY-MM-DD.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to rebuild, as YYYY-MM-DD.",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        """
+        Command entrypoint.
+        """
+        start: date = options["start"]
+        end: date = options["end"]
+        if bool(start) != bool(end):
+            raise CommandError("Both --start and --end are required.")
+        if start and start > end:
+            raise CommandError("--start must not be after --end.")
+        if start:
+            total: int = RollupLogic.rebuild(start, end)
+        else:
+            total: int = RollupLogic.refresh()
+        self.stdout.write(f"Rollups refreshed: {total}")
@@ -0,0 +1,110 @@
+# Generated by Django 4.0.3 on 2026-10-18 14:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("campaigns", "0004_remove_campaign_price_campaign_spend"),
+        ("cities", "0002_city_deleted_at"),
+        ("products", "0003_product_deleted_at"),
+        ("pages", "0005_alter_page_url"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Rollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("hour", models.PositiveSmallIntegerField()),
+                ("events", models.PositiveIntegerField(default=0)),
+                (
+                    "subscriptions",
+                    models.PositiveIntegerField(default=0),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=4, default=0, max_digits=20
+                    ),
+                ),
+                (
+                    "cost",
+                    models.DecimalField(
+                        decimal_places=4, default=0, max_digits=20
+                    ),
+                ),
+                ("life", models.IntegerField(default=0)),
+                (
+                    "ltv",
+                    models.DecimalField(
+                        decimal_places=4, default=0, max_digits=20
+                    ),
+                ),
+                ("renewals", models.PositiveIntegerField(default=0)),
+                (
+                    "renewal_margin",
+                    models.DecimalField(
+                        decimal_places=4, default=0, max_digits=20
+                    ),
+                ),
+                ("refreshed_at", models.DateTimeField()),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="campaigns.campaign",
+                    ),
+                ),
+                (
+                    "city",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="cities.city",
+                    ),
+                ),
+                (
+                    "page",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="pages.page",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.product",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="rollup",
+            index=models.Index(
+                fields=["day", "hour"],
+                name="rollups_rol_day_4dd698_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rollup",
+            index=models.Index(
+                fields=["refreshed_at"],
+                name="rollups_rol_refresh_30b91e_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.3 on 2026-10-18 14:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rollups", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="rollup",
+            old_name="renewal_margin",
+            new_name="open_margin",
+        ),
+        migrations.RenameField(
+            model_name="rollup",
+            old_name="renewals",
+            new_name="open_subscriptions",
+        ),
+    ]
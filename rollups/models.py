@@ -0,0 +1,89 @@
+from campaigns.models import Campaign
+from cities.models import City
+from django.db import models
+from pages.models import Page
+from products.models import Product
+
+
+class Rollup(models.Model):
+    """
+    Hourly Rollup Model of Subscriptions and Events.
+    """
+
+    day: models.DateField = models.DateField(null=False)
+    hour: models.PositiveSmallIntegerField = (
+        models.PositiveSmallIntegerField(null=False)
+    )
+    campaign: models.ForeignKey = models.ForeignKey(
+        Campaign,
+        on_delete=models.CASCADE,
+        null=False,
+    )
+    product: models.ForeignKey = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        null=True,
+    )
+    city: models.ForeignKey = models.ForeignKey(
+        City,
+        on_delete=models.CASCADE,
+        null=False,
+    )
+    page: models.ForeignKey = models.ForeignKey(
+        Page,
+        on_delete=models.CASCADE,
+        null=False,
+    )
+    events: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0
+    )
+    subscriptions: models.PositiveIntegerField = (
+        models.PositiveIntegerField(default=0)
+    )
+    revenue: models.DecimalField = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        null=False,
+        default=0,
+    )
+    cost: models.DecimalField = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        null=False,
+        default=0,
+    )
+    # Life and LTV of canceled subscriptions. Open subscriptions keep
+    # growing, so only their count and margin are stored.
+    life: models.IntegerField = models.IntegerField(default=0)
+    ltv: models.DecimalField = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        null=False,
+        default=0,
+    )
+    open_subscriptions: models.PositiveIntegerField = (
+        models.PositiveIntegerField(default=0)
+    )
+    open_margin: models.DecimalField = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        null=False,
+        default=0,
+    )
+    refreshed_at: models.DateTimeField = models.DateTimeField(
+        null=False
+    )
+
+    objects: models.Manager = models.Manager()
+
+    class Meta:
+        indexes: list = [
+            models.Index(fields=["day", "hour"]),
+            models.Index(fields=["refreshed_at"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.day} {self.hour}h, {self.campaign_id}, {self.page_id}>"
@@ -0,0 +1,8 @@
+"""
+Rollup signals.
+"""
+
+from django.dispatch import Signal
+
+# Sent with start and end days after a rollup range is rebuilt.
+rebuilt: Signal = Signal()
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class SearchesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "searches"
+
+    def ready(self) -> None:
+        """
+        Connects the search document signals.
+        """
+        import searches.signals  # noqa: F401
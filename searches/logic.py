@@ -0,0 +1,318 @@
+import logging
+from functools import partial
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import Field, Model
+from django.db.models.query import QuerySet
+
+from searches.models import SearchDocument
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class SearchLogic:
+    """
+    Business logic related to Search Documents.
+
+    Each searchable model has one document per row, concatenating
+    the text of its own and its related fields. Changing any of those
+    fields re-indexes the documents that depend on the row, selected
+    by their lookups rather than by loading their ids. Documents are
+    written with an upsert, so concurrent writers do not conflict.
+    """
+
+    BATCH_SIZE: int = 1000
+    SEPARATOR: str = "\n"
+    FIELDS: Dict[str, Tuple[str]] = {
+        "campaigns.campaign": (
+            "title",
+            "audience__title",
+            "city__title",
+            "city__state__title",
+            "city__state__country__title",
+        ),
+        "pages.page": (
+            "title",
+            "url",
+            "metadata__title",
+            "metadata__site",
+            "metadata__author",
+            "metadata__keywords",
+            "metadata__description",
+        ),
+        "metrics.metric": (
+            "campaign__title",
+            "campaign__audience__title",
+            "campaign__city__title",
+            "campaign__city__state__title",
+            "campaign__city__state__country__title",
+            "page__title",
+            "page__url",
+            "page__metadata__title",
+            "page__metadata__site",
+            "page__metadata__author",
+            "page__metadata__keywords",
+            "page__metadata__description",
+        ),
+        "events.event": (
+            "client__name",
+            "client__email",
+            "metric__campaign__title",
+            "metric__campaign__audience__title",
+            "metric__campaign__city__title",
+            "metric__campaign__city__state__title",
+            "metric__campaign__city__state__country__title",
+            "metric__page__title",
+            "metric__page__url",
+            "metric__page__metadata__title",
+            "metric__page__metadata__site",
+            "metric__page__metadata__author",
+            "metric__page__metadata__keywords",
+            "metric__page__metadata__description",
+        ),
+        "subscriptions.subscription": (
+            "product__title",
+            "event__client__name",
+            "event__client__email",
+            "event__metric__campaign__title",
+            "event__metric__campaign__audience__title",
+            "event__metric__campaign__city__title",
+            "event__metric__campaign__city__state__title",
+            "event__metric__campaign__city__state__country__title",
+        ),
+    }
+
+    def __init__(self, document: SearchDocument) -> None:
+        """
+        Search Logic constructor.
+        """
+        self.document: SearchDocument = document
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.document}>"
+
+    @classmethod
+    def get_models(cls) -> List[type]:
+        """
+        Returns every model whose rows feed a search document.
+        """
+        models: Dict[str, type] = {}
+        for kind in cls.FIELDS:
+            models[kind] = apps.get_model(kind)
+            for related, _ in cls.get_related(kind):
+                models[related._meta.label_lower] = related
+        return list(models.values())
+
+    @classmethod
+    def get_related(cls, kind: str) -> List[Tuple[type, str]]:
+        """
+        Returns the related models of a document kind, with their
+        lookups from the document.
+        """
+        related: Dict[str, Tuple[type, str]] = {}
+        for field in cls.FIELDS[kind]:
+            current: type = apps.get_model(kind)
+            names: List[str] = field.split("__")[:-1]
+            for i, name in enumerate(names):
+                current: type = current._meta.get_field(
+                    name
+                ).related_model
+                related.setdefault(
+                    current._meta.label_lower,
+                    (current, "__".join(names[: i + 1])),
+                )
+        return list(related.values())
+
+    @classmethod
+    def get_tracked(cls, model: type) -> Dict[str, type]:
+        """
+        Returns the fields of a model that documents depend on, by
+        attribute name. Relations reached in reverse from a document,
+        like the page of a metadata, map to the model holding it, so
+        the former row is re-indexed too.
+        """
+        tracked: Dict[str, type] = {}
+        for kind, fields in cls.FIELDS.items():
+            for lookup in fields:
+                current: type = apps.get_model(kind)
+                for name in lookup.split("__"):
+                    field: Field = current._meta.get_field(name)
+                    if field.concrete and current is model:
+                        tracked.setdefault(field.attname, None)
+                    elif not field.concrete and (
+                        field.related_model is model
+                    ):
+                        tracked[field.remote_field.attname] = current
+                    current: type = field.related_model
+        return tracked
+
+    @classmethod
+    def get_former(
+        cls, instance: Model, fields: Iterable[str] = None
+    ) -> Dict[str, object]:
+        """
+        Returns the stored values of the tracked fields that a save of
+        a row changes, among the saved fields if given.
+        """
+        tracked: Dict[str, type] = cls.get_tracked(type(instance))
+        if fields is not None:
+            saved: List[str] = [
+                instance._meta.get_field(name).attname
+                for name in fields
+            ]
+            tracked: Dict[str, type] = {
+                name: model
+                for name, model in tracked.items()
+                if name in saved
+            }
+        if not tracked or instance._state.adding:
+            return {}
+        stored: Dict[str, object] = (
+            type(instance)
+            .objects.filter(pk=instance.pk)
+            .values(*tracked)
+            .first()
+        ) or {}
+        return {
+            name: value
+            for name, value in stored.items()
+            if value != getattr(instance, name)
+        }
+
+    @classmethod
+    def get_text(cls, values: Iterable[object]) -> str:
+        """
+        Concatenates the non-empty values of a row.
+        """
+        return cls.SEPARATOR.join(
+            str(value) for value in values if value
+        )
+
+    @classmethod
+    def upsert(cls, kind: str, rows: Iterator[Tuple]) -> int:
+        """
+        Writes the documents of rows of primary keys and field values,
+        inserting or updating each in a single statement, and skipping
+        unchanged texts.
+        """
+        table: str = connection.ops.quote_name(
+            SearchDocument._meta.db_table
+        )
+        text: str = connection.ops.quote_name("text")
+        sql: str = (
+            f"INSERT INTO {table} (kind, object_id, {text}) "
+            "VALUES (%s, %s, %s) "
+            f"ON CONFLICT (kind, object_id) DO UPDATE "
+            f"SET {text} = excluded.{text} "
+            f"WHERE {table}.{text} <> excluded.{text}"
+        )
+        total: int = 0
+        with connection.cursor() as cursor:
+            while True:
+                batch: List[Tuple] = list(
+                    islice(rows, cls.BATCH_SIZE)
+                )
+                if not batch:
+                    break
+                cursor.executemany(
+                    sql,
+                    [
+                        (kind, pk, cls.get_text(values))
+                        for pk, *values in batch
+                    ],
+                )
+                total += len(batch)
+        return total
+
+    @classmethod
+    def index(cls, kind: str, rows: QuerySet) -> int:
+        """
+        Re-indexes the documents of some rows.
+        """
+        total: int = cls.upsert(
+            kind,
+            rows.values_list("pk", *cls.FIELDS[kind])
+            .order_by()
+            .iterator(chunk_size=cls.BATCH_SIZE),
+        )
+        logger.debug("Indexed: %s %s %s", cls, kind, total)
+        return total
+
+    @classmethod
+    def reindex(cls, model: type, pk: int) -> int:
+        """
+        Re-indexes the documents that depend on a row, including its
+        own.
+        """
+        total: int = 0
+        for kind in cls.FIELDS:
+            documents: type = apps.get_model(kind)
+            if model is documents:
+                total += cls.index(
+                    kind, documents.objects.filter(pk=pk)
+                )
+            for related, lookup in cls.get_related(kind):
+                if related is model:
+                    total += cls.index(
+                        kind, documents.objects.filter(**{lookup: pk})
+                    )
+        return total
+
+    @classmethod
+    def move(
+        cls, model: type, pk: int, former: Dict[str, object]
+    ) -> int:
+        """
+        Re-indexes the documents that depend on a saved row whose
+        tracked fields changed, and those of the rows it held before,
+        like the former page of a metadata.
+        """
+        tracked: Dict[str, type] = cls.get_tracked(model)
+        total: int = cls.reindex(model, pk)
+        for name, value in former.items():
+            if tracked[name] is not None and value is not None:
+                total += cls.reindex(tracked[name], value)
+        return total
+
+    @classmethod
+    def drop(cls, instance: Model) -> None:
+        """
+        Drops the document of a deleted row, and re-indexes the rows it
+        held, like the page of a metadata, once the delete is
+        committed. Dependent rows are deleted by cascade, dropping
+        their own documents.
+        """
+        SearchDocument.objects.filter(
+            kind=instance._meta.label_lower, object_id=instance.pk
+        ).delete()
+        for name, model in cls.get_tracked(type(instance)).items():
+            if (
+                model is not None
+                and getattr(instance, name) is not None
+            ):
+                transaction.on_commit(
+                    partial(
+                        cls.reindex, model, getattr(instance, name)
+                    )
+                )
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Re-indexes every searchable row.
+        """
+        total: int = 0
+        for kind in cls.FIELDS:
+            model: type = apps.get_model(kind)
+            SearchDocument.objects.filter(kind=kind).exclude(
+                object_id__in=model.objects.values("pk")
+            ).delete()
+            total += cls.index(kind, model.objects.all())
+        logger.debug("Rebuilt: %s %s", cls, total)
+        return total
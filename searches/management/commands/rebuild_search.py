@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from searches.logic import SearchLogic
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the search documents.
+    """
+
+    help: str = (
+        "Re-indexes every searchable row, after writes that bypass "
+        "model signals, such as bulk updates."
+    )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        """
+        Command entrypoint.
+        """
+        total: int = SearchLogic.rebuild()
+        self.stdout.write(f"Search documents rebuilt: {total}")
@@ -0,0 +1,218 @@
+from django.apps.registry import Apps
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.models.query import QuerySet
+
+SQLITE: list = [
+    """
+    CREATE VIRTUAL TABLE searches_searchdocument_fts USING fts5(
+        text,
+        content='searches_searchdocument',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER searches_searchdocument_ai
+    AFTER INSERT ON searches_searchdocument BEGIN
+        INSERT INTO searches_searchdocument_fts(rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER searches_searchdocument_ad
+    AFTER DELETE ON searches_searchdocument BEGIN
+        INSERT INTO searches_searchdocument_fts(
+            searches_searchdocument_fts, rowid, text
+        )
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER searches_searchdocument_au
+    AFTER UPDATE ON searches_searchdocument BEGIN
+        INSERT INTO searches_searchdocument_fts(
+            searches_searchdocument_fts, rowid, text
+        )
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO searches_searchdocument_fts(rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+]
+SQLITE_REVERSE: list = [
+    "DROP TRIGGER IF EXISTS searches_searchdocument_au",
+    "DROP TRIGGER IF EXISTS searches_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS searches_searchdocument_ai",
+    "DROP TABLE IF EXISTS searches_searchdocument_fts",
+]
+POSTGRESQL: list = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX searches_searchdocument_trgm
+    ON searches_searchdocument
+    USING gin (UPPER(text) gin_trgm_ops)
+    """,
+]
+POSTGRESQL_REVERSE: list = [
+    "DROP INDEX IF EXISTS searches_searchdocument_trgm",
+]
+BATCH_SIZE: int = 1000
+SEPARATOR: str = "\n"
+# The document fields as of this migration.
+FIELDS: dict = {
+    "campaigns.campaign": (
+        "title",
+        "audience__title",
+        "city__title",
+        "city__state__title",
+        "city__state__country__title",
+    ),
+    "pages.page": (
+        "title",
+        "url",
+        "metadata__title",
+        "metadata__site",
+        "metadata__author",
+        "metadata__keywords",
+        "metadata__description",
+    ),
+    "metrics.metric": (
+        "campaign__title",
+        "campaign__audience__title",
+        "campaign__city__title",
+        "campaign__city__state__title",
+        "campaign__city__state__country__title",
+        "page__title",
+        "page__url",
+        "page__metadata__title",
+        "page__metadata__site",
+        "page__metadata__author",
+        "page__metadata__keywords",
+        "page__metadata__description",
+    ),
+    "events.event": (
+        "client__name",
+        "client__email",
+        "metric__campaign__title",
+        "metric__campaign__audience__title",
+        "metric__campaign__city__title",
+        "metric__campaign__city__state__title",
+        "metric__campaign__city__state__country__title",
+        "metric__page__title",
+        "metric__page__url",
+        "metric__page__metadata__title",
+        "metric__page__metadata__site",
+        "metric__page__metadata__author",
+        "metric__page__metadata__keywords",
+        "metric__page__metadata__description",
+    ),
+    "subscriptions.subscription": (
+        "product__title",
+        "event__client__name",
+        "event__client__email",
+        "event__metric__campaign__title",
+        "event__metric__campaign__audience__title",
+        "event__metric__campaign__city__title",
+        "event__metric__campaign__city__state__title",
+        "event__metric__campaign__city__state__country__title",
+    ),
+}
+
+
+def create_index(apps: Apps, schema_editor: BaseDatabaseSchemaEditor):
+    """
+    Creates the full-text index of the search documents.
+    """
+    vendor: str = schema_editor.connection.vendor
+    for sql in {"sqlite": SQLITE, "postgresql": POSTGRESQL}.get(
+        vendor, []
+    ):
+        schema_editor.execute(sql)
+
+
+def drop_index(apps: Apps, schema_editor: BaseDatabaseSchemaEditor):
+    """
+    Drops the full-text index of the search documents.
+    """
+    vendor: str = schema_editor.connection.vendor
+    for sql in {
+        "sqlite": SQLITE_REVERSE,
+        "postgresql": POSTGRESQL_REVERSE,
+    }.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+def backfill(apps: Apps, schema_editor: BaseDatabaseSchemaEditor):
+    """
+    Indexes the existing rows with the historical models.
+    """
+    SearchDocument: type = apps.get_model(
+        "searches", "SearchDocument"
+    )
+    alias: str = schema_editor.connection.alias
+    for kind, fields in FIELDS.items():
+        rows: QuerySet = (
+            apps.get_model(kind)
+            .objects.using(alias)
+            .values_list("pk", *fields)
+            .order_by("pk")
+        )
+        documents: list = []
+        for pk, *values in rows.iterator(chunk_size=BATCH_SIZE):
+            documents.append(
+                SearchDocument(
+                    kind=kind,
+                    object_id=pk,
+                    text=SEPARATOR.join(
+                        str(value) for value in values if value
+                    ),
+                )
+            )
+            if len(documents) == BATCH_SIZE:
+                SearchDocument.objects.using(alias).bulk_create(
+                    documents, ignore_conflicts=True
+                )
+                documents: list = []
+        SearchDocument.objects.using(alias).bulk_create(
+            documents, ignore_conflicts=True
+        )
+
+
+def clear(apps: Apps, schema_editor: BaseDatabaseSchemaEditor):
+    """
+    Drops the search documents.
+    """
+    SearchDocument: type = apps.get_model(
+        "searches", "SearchDocument"
+    )
+    SearchDocument.objects.using(
+        schema_editor.connection.alias
+    ).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("searches", "0001_initial"),
+        ("audiences", "0002_audience_deleted_at"),
+        ("campaigns", "0004_remove_campaign_price_campaign_spend"),
+        ("cities", "0002_city_deleted_at"),
+        ("clients", "0003_alter_client_email"),
+        ("countries", "0002_country_deleted_at"),
+        ("events", "0005_event_deleted_at"),
+        (
+            "metadata",
+            "0004_alter_metadata_author_alter_metadata_description_and_more",
+        ),
+        ("metrics", "0004_metric_deleted_at"),
+        ("pages", "0005_alter_page_url"),
+        ("products", "0003_product_deleted_at"),
+        ("states", "0002_state_deleted_at"),
+        ("subscriptions", "0004_subscription_price"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(backfill, clear),
+    ]
@@ -0,0 +1,76 @@
+from typing import Union
+
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from django.db.models.query import QuerySet
+
+
+class SearchManager(models.Manager):
+    """
+    Django Model Manager.
+    """
+
+    TRIGRAM: int = 3
+
+    def match(
+        self, model: type, search: str
+    ) -> Union[QuerySet, RawSQL]:
+        """
+        Returns the ids of the rows of a model whose search document
+        contains a text.
+
+        On SQLite, this is a trigram FTS5 MATCH joined to documents by
+        primary key. On PostgreSQL, the icontains filter is answered
+        by a trigram GIN index. Shorter texts than a trigram scan the
+        documents, but never join the searched model.
+        """
+        kind: str = model._meta.label_lower
+        if (
+            connection.vendor == "sqlite"
+            and len(search) >= self.TRIGRAM
+        ):
+            return RawSQL(
+                f"SELECT document.object_id FROM {SearchDocument.FTS} "
+                f"CROSS JOIN {SearchDocument._meta.db_table} document "
+                f"ON document.id = {SearchDocument.FTS}.rowid "
+                f"WHERE {SearchDocument.FTS} MATCH %s "
+                "AND document.kind = %s",
+                ['"{}"'.format(search.replace('"', '""')), kind],
+            )
+        return (
+            self.get_queryset()
+            .filter(kind=kind, text__icontains=search)
+            .values("object_id")
+        )
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized Search Document Model, one per searchable row.
+    """
+
+    FTS: str = "searches_searchdocument_fts"
+
+    kind: models.CharField = models.CharField(
+        max_length=100, null=False
+    )
+    object_id: models.PositiveBigIntegerField = (
+        models.PositiveBigIntegerField(null=False)
+    )
+    text: models.TextField = models.TextField(null=False, default="")
+
+    objects: SearchManager = SearchManager()
+
+    class Meta:
+        constraints: list = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"],
+                name="searches_searchdocument_kind_object_id",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.kind} {self.object_id}>"
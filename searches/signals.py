@@ -0,0 +1,80 @@
+"""
+Search document synchronization on writes.
+"""
+
+from functools import partial
+from typing import List
+
+from analytics.signals import ingested
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_save,
+)
+
+from searches.logic import SearchLogic
+
+
+def track(
+    sender: type,
+    instance: Model,
+    update_fields: frozenset = None,
+    **kwargs: dict
+) -> None:
+    """
+    Collects the stored values of the tracked fields that a save of
+    an existing row changes.
+    """
+    instance._search_former = SearchLogic.get_former(
+        instance, update_fields
+    )
+
+
+def index(
+    sender: type, instance: Model, created: bool, **kwargs: dict
+) -> None:
+    """
+    Re-indexes the documents that depend on a new row, or on a saved
+    row whose tracked fields changed, once the write is committed.
+    """
+    former: dict = getattr(instance, "_search_former", {})
+    if created:
+        transaction.on_commit(
+            partial(SearchLogic.reindex, sender, instance.pk)
+        )
+    elif former:
+        transaction.on_commit(
+            partial(SearchLogic.move, sender, instance.pk, former)
+        )
+
+
+def drop(sender: type, instance: Model, **kwargs: dict) -> None:
+    """
+    Drops the document of a deleted row.
+    """
+    SearchLogic.drop(instance)
+
+
+def index_instances(
+    sender: type, instances: List[Model], **kwargs: dict
+) -> None:
+    """
+    Indexes the documents of bulk inserted rows.
+    """
+    kind: str = sender._meta.label_lower
+    if kind in SearchLogic.FIELDS:
+        SearchLogic.index(
+            kind,
+            sender.objects.filter(
+                pk__in=[instance.pk for instance in instances]
+            ),
+        )
+
+
+for model in SearchLogic.get_models():
+    pre_save.connect(track, sender=model)
+    post_save.connect(index, sender=model)
+    post_delete.connect(drop, sender=model)
+ingested.connect(index_instances)
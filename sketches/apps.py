@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class SketchesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "sketches"
+
+    def ready(self) -> None:
+        """
+        Connects the sketch update signals.
+        """
+        import sketches.signals  # noqa: F401
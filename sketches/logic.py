@@ -0,0 +1,943 @@
+import logging
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from analytics.signals import refreshed
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    Max,
+    Min,
+    Model,
+    Q,
+)
+from django.db.models.functions import TruncDate, TruncMonth
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from events.models import Event
+from subscriptions.logic import SubscriptionLogic
+from subscriptions.models import Subscription
+
+from sketches.models import QuantileSketch, Sketch, StaleSketch
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class SketchLogic:
+    """
+    Business logic related to Sketches.
+
+    Each sketch holds the HyperLogLog registers of the clients of a
+    campaign or page on one day. Registers merge by their maximum, so
+    the distinct clients of any date range are estimated from its
+    daily sketches, with a standard error of 1.04 / sqrt(registers).
+    New events are added as they are written, but registers cannot
+    forget a client, so changed days are marked stale and rebuilt by
+    the refresh_sketches command.
+    """
+
+    STALE: str = "clients"
+    PRECISION: int = 12
+    REGISTERS: int = 1 << PRECISION
+    DIMENSIONS: Dict[str, str] = {
+        "campaign": "metric__campaign",
+        "page": "metric__page",
+    }
+
+    def __init__(self, sketch: Sketch) -> None:
+        """
+        Sketch Logic constructor.
+        """
+        self.sketch: Sketch = sketch
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.sketch}>"
+
+    @classmethod
+    def get_day(cls, value: datetime) -> date:
+        """
+        Returns the local day of a date or datetime.
+        """
+        if not isinstance(value, datetime):
+            return value
+        if timezone.is_naive(value):
+            value: datetime = timezone.make_aware(value)
+        return timezone.localtime(
+            value, timezone.get_default_timezone()
+        ).date()
+
+    @classmethod
+    def get_former(
+        cls, instance: Model, fields: Iterable[str]
+    ) -> Dict[str, object]:
+        """
+        Returns the stored values of some fields that a save of an
+        existing row changes.
+        """
+        if instance._state.adding:
+            return {}
+        stored: Dict[str, object] = (
+            type(instance)
+            .objects.filter(pk=instance.pk)
+            .values(*fields)
+            .first()
+        ) or {}
+        return {
+            name: value
+            for name, value in stored.items()
+            if value != getattr(instance, name)
+        }
+
+    @classmethod
+    def get_hashes(cls, values: np.ndarray) -> np.ndarray:
+        """
+        Hashes integers to 64 bits with the SplitMix64 finalizer.
+        """
+        hashes: np.ndarray = values.astype(np.uint64) + np.uint64(
+            0x9E3779B97F4A7C15
+        )
+        hashes: np.ndarray = (hashes ^ (hashes >> np.uint64(30))) * (
+            np.uint64(0xBF58476D1CE4E5B9)
+        )
+        hashes: np.ndarray = (hashes ^ (hashes >> np.uint64(27))) * (
+            np.uint64(0x94D049BB133111EB)
+        )
+        return hashes ^ (hashes >> np.uint64(31))
+
+    @classmethod
+    def get_registers(cls, clients: List[int]) -> np.ndarray:
+        """
+        Returns the HyperLogLog registers of some client ids.
+        """
+        hashes: np.ndarray = cls.get_hashes(
+            np.array(clients, dtype=np.int64)
+        )
+        width: int = 64 - cls.PRECISION
+        buckets: np.ndarray = (hashes >> np.uint64(width)).astype(
+            np.intp
+        )
+        rest: np.ndarray = hashes & np.uint64((1 << width) - 1)
+        # Values below 2^53 are exact as floats, so frexp returns
+        # their bit length.
+        ranks: np.ndarray = (
+            width + 1 - np.frexp(rest.astype(np.float64))[1]
+        ).astype(np.uint8)
+        registers: np.ndarray = np.zeros(
+            cls.REGISTERS, dtype=np.uint8
+        )
+        np.maximum.at(registers, buckets, ranks)
+        return registers
+
+    @classmethod
+    def merge(cls, sketches: Iterable[np.ndarray]) -> np.ndarray:
+        """
+        Merges HyperLogLog registers into the registers of their union.
+        """
+        registers: np.ndarray = np.zeros(
+            cls.REGISTERS, dtype=np.uint8
+        )
+        for sketch in sketches:
+            np.maximum(registers, sketch, out=registers)
+        return registers
+
+    @classmethod
+    def estimate(cls, registers: np.ndarray) -> float:
+        """
+        Estimates the distinct count of HyperLogLog registers, with
+        linear counting for small cardinalities.
+        """
+        m: int = cls.REGISTERS
+        alpha: float = 0.7213 / (1 + 1.079 / m)
+        estimate: float = (
+            alpha
+            * m
+            * m
+            / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+        )
+        zeros: int = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate: float = m * np.log(m / zeros)
+        return float(estimate)
+
+    @classmethod
+    def get_rows(cls, events: QuerySet) -> QuerySet:
+        """
+        Returns the day, campaign, page and client of some events.
+        """
+        return events.annotate(
+            day=TruncDate(
+                "created_at",
+                tzinfo=timezone.get_default_timezone(),
+            )
+        ).values_list("day", *cls.DIMENSIONS.values(), "client")
+
+    @classmethod
+    def get_sketches(
+        cls, rows: Iterable[Tuple[date, int, int, int]]
+    ) -> Dict[Tuple[str, int, date], np.ndarray]:
+        """
+        Returns the registers of event rows by dimension, row and day.
+        """
+        clients: Dict[Tuple[str, int, date], List[int]] = {}
+        for day, *pks, client in rows:
+            for dimension, pk in zip(cls.DIMENSIONS, pks):
+                clients.setdefault((dimension, pk, day), []).append(
+                    client
+                )
+        return {
+            key: cls.get_registers(values)
+            for key, values in clients.items()
+        }
+
+    @classmethod
+    def update(
+        cls, rows: Iterable[Tuple[date, int, int, int]]
+    ) -> int:
+        """
+        Adds the clients of new event rows to their daily sketches.
+        """
+        sketches: Dict[Tuple[str, int, date], np.ndarray] = (
+            cls.get_sketches(rows)
+        )
+        if not sketches:
+            return 0
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    cls.save(sketches)
+                break
+            except IntegrityError:
+                # A concurrent update created one of the sketches,
+                # so the retry merges into it.
+                if attempt:
+                    raise
+        logger.debug("Updated: %s %s", cls, len(sketches))
+        return len(sketches)
+
+    @classmethod
+    def save(
+        cls, sketches: Dict[Tuple[str, int, date], np.ndarray]
+    ) -> None:
+        """
+        Merges registers into the stored sketches, creating the
+        missing ones.
+        """
+        existing: Dict[Tuple[str, int, date], Sketch] = {
+            (sketch.dimension, sketch.object_id, sketch.day): sketch
+            for sketch in Sketch.objects.select_for_update().filter(
+                dimension__in={key[0] for key in sketches},
+                object_id__in={key[1] for key in sketches},
+                day__in={key[2] for key in sketches},
+            )
+        }
+        updated: List[Sketch] = []
+        created: List[Sketch] = []
+        for (dimension, pk, day), registers in sketches.items():
+            sketch: Sketch = existing.get((dimension, pk, day))
+            if sketch is None:
+                created.append(
+                    Sketch(
+                        day=day,
+                        dimension=dimension,
+                        object_id=pk,
+                        registers=registers.tobytes(),
+                    )
+                )
+                continue
+            sketch.registers = np.maximum(
+                np.frombuffer(
+                    bytes(sketch.registers), dtype=np.uint8
+                ),
+                registers,
+            ).tobytes()
+            sketch.updated_at = timezone.now()
+            updated.append(sketch)
+        Sketch.objects.bulk_update(
+            updated, ["registers", "updated_at"]
+        )
+        Sketch.objects.bulk_create(created)
+
+    @classmethod
+    def rebuild(cls, start: date = None, end: date = None) -> int:
+        """
+        Rebuilds the sketches of a date range, or of all event days,
+        one day at a time.
+        """
+        if start is None or end is None:
+            bounds: Dict[str, datetime] = Event.objects.aggregate(
+                start=Min("created_at"), end=Max("created_at")
+            )
+            if bounds["start"] is None:
+                return 0
+            start: date = start or cls.get_day(bounds["start"])
+            end: date = end or cls.get_day(bounds["end"])
+        tz: tzinfo = timezone.get_default_timezone()
+        total: int = 0
+        day: date = start
+        while day <= end:
+            sketches: Dict[Tuple[str, int, date], np.ndarray] = (
+                cls.get_sketches(
+                    cls.get_rows(
+                        Event.active.filter(
+                            created_at__gte=timezone.make_aware(
+                                datetime.combine(day, time.min), tz
+                            ),
+                            created_at__lt=timezone.make_aware(
+                                datetime.combine(
+                                    day + timedelta(days=1), time.min
+                                ),
+                                tz,
+                            ),
+                        )
+                    ).iterator()
+                )
+            )
+            with transaction.atomic():
+                Sketch.objects.filter(day=day).delete()
+                Sketch.objects.bulk_create(
+                    Sketch(
+                        day=key[2],
+                        dimension=key[0],
+                        object_id=key[1],
+                        registers=registers.tobytes(),
+                    )
+                    for key, registers in sketches.items()
+                )
+            total += len(sketches)
+            day += timedelta(days=1)
+        refreshed.send(sender=cls, start=start, end=end)
+        logger.debug("Rebuilt: %s %s %s %s", cls, start, end, total)
+        return total
+
+    @classmethod
+    def mark(cls, days: Iterable[date]) -> int:
+        """
+        Marks the sketches of some days stale.
+        """
+        stale: List[StaleSketch] = [
+            StaleSketch(kind=cls.STALE, day=day) for day in set(days)
+        ]
+        StaleSketch.objects.bulk_create(stale, ignore_conflicts=True)
+        logger.debug("Marked: %s %s", cls, len(stale))
+        return len(stale)
+
+    @classmethod
+    def refresh(cls, start: date = None, end: date = None) -> int:
+        """
+        Rebuilds the stale days of a date range, or all of them. Marks
+        are cleared before rebuilding, so days changed meanwhile are
+        marked again, and restored if the rebuild fails.
+        """
+        stale: QuerySet = StaleSketch.objects.filter(kind=cls.STALE)
+        if start is not None:
+            stale: QuerySet = stale.filter(day__gte=start)
+        if end is not None:
+            stale: QuerySet = stale.filter(day__lte=end)
+        days: List[date] = sorted(
+            set(stale.values_list("day", flat=True))
+        )
+        stale.filter(day__in=days).delete()
+        total: int = 0
+        try:
+            for day in days:
+                total += cls.rebuild(day, day)
+        except Exception:
+            cls.mark(days)
+            raise
+        logger.debug("Refreshed: %s %s %s", cls, len(days), total)
+        return total
+
+    @classmethod
+    def get_clients(
+        cls,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, float]:
+        """
+        Estimates distinct clients by the days of a date range, grouped
+        by a dimension. With a limit, only the largest groups are
+        returned, and the union of the rest is estimated into a None
+        group if other is set.
+        """
+        rows: QuerySet = Sketch.objects.filter(
+            dimension=dimension,
+            day__gte=cls.get_day(start),
+            day__lte=cls.get_day(end),
+        )
+        if ids is not None:
+            rows: QuerySet = rows.filter(object_id__in=ids)
+        registers: Dict[int, np.ndarray] = {}
+        for pk, blob in rows.values_list("object_id", "registers"):
+            sketch: np.ndarray = np.frombuffer(
+                bytes(blob), dtype=np.uint8
+            )
+            if pk in registers:
+                np.maximum(registers[pk], sketch, out=registers[pk])
+            else:
+                registers[pk] = sketch.copy()
+        clients: Dict[int, float] = {
+            pk: cls.estimate(sketch)
+            for pk, sketch in registers.items()
+        }
+        if limit is not None:
+            ranked: List[int] = sorted(
+                clients, key=lambda pk: (-clients[pk], pk)
+            )
+            clients: Dict[int, float] = {
+                pk: clients[pk] for pk in ranked[:limit]
+            }
+            if other and ranked[limit:]:
+                clients[None] = cls.estimate(
+                    cls.merge(registers[pk] for pk in ranked[limit:])
+                )
+        logger.debug("Clients: %s %s %s", cls, dimension, clients)
+        return clients
+
+
+class QuantileSketchLogic:
+    """
+    Business logic related to Quantile Sketches.
+
+    Each sketch counts the LTVs or prices of the subscriptions of a
+    campaign or product created on one month, in logarithmic buckets
+    of a fixed relative width (DDSketch). Buckets merge by adding
+    their counts, so the percentiles of any date range come from its
+    monthly sketches, within the relative accuracy of the buckets.
+    New subscriptions are added as they are written, and the months
+    of changed ones are marked stale and rebuilt by the
+    refresh_sketches command.
+    """
+
+    STALE: str = "quantiles"
+    ACCURACY: float = 0.01
+    GAMMA: float = (1 + ACCURACY) / (1 - ACCURACY)
+    MINIMUM: float = 1e-6
+    BIAS: int = 1 << 20
+    QUANTILES: Dict[str, float] = {
+        "p10": 0.10,
+        "p25": 0.25,
+        "p50": 0.50,
+        "p75": 0.75,
+        "p90": 0.90,
+        "p99": 0.99,
+    }
+    DIMENSIONS: Dict[str, str] = {
+        "campaign": "event__metric__campaign",
+        "product": "product",
+    }
+    MEASURES: Tuple[str] = ("ltv", "price")
+
+    def __init__(self, sketch: QuantileSketch) -> None:
+        """
+        Quantile Sketch Logic constructor.
+        """
+        self.sketch: QuantileSketch = sketch
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.sketch}>"
+
+    @classmethod
+    def get_month(cls, value: datetime) -> date:
+        """
+        Returns the first day of the local month of a date or datetime.
+        """
+        return SketchLogic.get_day(value).replace(day=1)
+
+    @classmethod
+    def get_next_month(cls, month: date) -> date:
+        """
+        Returns the first day of the month after a month.
+        """
+        return (month + timedelta(days=32)).replace(day=1)
+
+    @classmethod
+    def get_keys(cls, values: np.ndarray) -> np.ndarray:
+        """
+        Returns the bucket keys of some values. Keys sort like values:
+        negative buckets are negative, zero is zero, and positive
+        buckets are positive.
+        """
+        magnitudes: np.ndarray = np.abs(values)
+        zero: np.ndarray = magnitudes < cls.MINIMUM
+        indexes: np.ndarray = np.ceil(
+            np.log(np.where(zero, 1.0, magnitudes))
+            / np.log(cls.GAMMA)
+        ).astype(np.int64)
+        return np.where(
+            zero, 0, np.sign(values) * (indexes + cls.BIAS)
+        )
+
+    @classmethod
+    def get_value(cls, key: int) -> float:
+        """
+        Returns the representative value of a bucket key.
+        """
+        if not key:
+            return 0.0
+        return float(
+            np.sign(key)
+            * 2
+            * cls.GAMMA ** (abs(key) - cls.BIAS)
+            / (cls.GAMMA + 1)
+        )
+
+    @classmethod
+    def get_buckets(cls, values: List[float]) -> np.ndarray:
+        """
+        Returns the sorted bucket keys and counts of some values.
+        """
+        keys, counts = np.unique(
+            cls.get_keys(np.array(values, dtype=np.float64)),
+            return_counts=True,
+        )
+        return np.vstack((keys, counts)).astype(np.int64)
+
+    @classmethod
+    def merge(cls, sketches: Iterable[np.ndarray]) -> np.ndarray:
+        """
+        Merges bucket keys and counts into the buckets of their union.
+        """
+        buckets: np.ndarray = np.concatenate(
+            [np.zeros((2, 0), dtype=np.int64), *sketches], axis=1
+        )
+        keys, inverse = np.unique(buckets[0], return_inverse=True)
+        counts: np.ndarray = np.bincount(
+            inverse, weights=buckets[1], minlength=len(keys)
+        )
+        return np.vstack((keys, counts)).astype(np.int64)
+
+    @classmethod
+    def get_quantiles(cls, buckets: np.ndarray) -> Dict[str, float]:
+        """
+        Returns the percentiles of some buckets.
+        """
+        ranks: np.ndarray = np.cumsum(buckets[1])
+        if not len(ranks) or not ranks[-1]:
+            return {name: 0.0 for name in cls.QUANTILES}
+        return {
+            name: cls.get_value(
+                int(
+                    buckets[
+                        0,
+                        np.searchsorted(
+                            ranks, quantile * (ranks[-1] - 1), "right"
+                        ),
+                    ]
+                )
+            )
+            for name, quantile in cls.QUANTILES.items()
+        }
+
+    @classmethod
+    def get_rows(cls, subscriptions: QuerySet) -> QuerySet:
+        """
+        Returns the month, campaign, product, LTV, price and
+        cancellation of some subscriptions.
+        """
+        return subscriptions.annotate(
+            month=TruncMonth(
+                "created_at",
+                tzinfo=timezone.get_default_timezone(),
+            ),
+            ltv=ExpressionWrapper(
+                SubscriptionLogic.get_ltv(),
+                output_field=DecimalField(
+                    max_digits=20, decimal_places=4
+                ),
+            ),
+        ).values_list(
+            "month",
+            *cls.DIMENSIONS.values(),
+            "ltv",
+            "price",
+            "canceled_at",
+        )
+
+    @classmethod
+    def get_sketches(
+        cls, rows: Iterable[Tuple], ids: Dict[str, List[int]] = None
+    ) -> Dict[Tuple[str, str, int, date], Dict]:
+        """
+        Returns the buckets, totals and open counts of subscription
+        rows by measure, dimension, row and month, optionally only
+        for some rows of each dimension.
+        """
+        values: Dict[Tuple[str, str, int, date], Dict] = {}
+        for month, *pks, ltv, price, canceled_at in rows:
+            month: date = cls.get_month(month)
+            for dimension, pk in zip(cls.DIMENSIONS, pks):
+                if ids is not None and pk not in ids.get(
+                    dimension, []
+                ):
+                    continue
+                for measure, value in zip(cls.MEASURES, (ltv, price)):
+                    sketch: Dict = values.setdefault(
+                        (measure, dimension, pk, month),
+                        {"values": [], "open": 0},
+                    )
+                    sketch["values"].append(float(value))
+                    sketch["open"] += canceled_at is None
+        return {
+            key: {
+                "buckets": cls.get_buckets(sketch["values"]),
+                "total": len(sketch["values"]),
+                "open": sketch["open"],
+            }
+            for key, sketch in values.items()
+        }
+
+    @classmethod
+    def update(cls, rows: Iterable[Tuple]) -> int:
+        """
+        Adds new subscription rows to their monthly sketches.
+        """
+        sketches: Dict[Tuple[str, str, int, date], Dict] = (
+            cls.get_sketches(rows)
+        )
+        if not sketches:
+            return 0
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    cls.save(sketches)
+                break
+            except IntegrityError:
+                # A concurrent update created one of the sketches,
+                # so the retry merges into it.
+                if attempt:
+                    raise
+        logger.debug("Updated: %s %s", cls, len(sketches))
+        return len(sketches)
+
+    @classmethod
+    def save(
+        cls, sketches: Dict[Tuple[str, str, int, date], Dict]
+    ) -> None:
+        """
+        Merges buckets into the stored sketches, creating the missing
+        ones.
+        """
+        refreshed_at: datetime = timezone.now()
+        existing: Dict[Tuple[str, str, int, date], QuantileSketch] = {
+            (
+                sketch.measure,
+                sketch.dimension,
+                sketch.object_id,
+                sketch.month,
+            ): sketch
+            for sketch in QuantileSketch.objects.select_for_update().filter(
+                dimension__in={key[1] for key in sketches},
+                object_id__in={key[2] for key in sketches},
+                month__in={key[3] for key in sketches},
+            )
+        }
+        updated: List[QuantileSketch] = []
+        created: List[QuantileSketch] = []
+        for key, sketch in sketches.items():
+            current: QuantileSketch = existing.get(key)
+            if current is None:
+                created.append(
+                    QuantileSketch(
+                        measure=key[0],
+                        dimension=key[1],
+                        object_id=key[2],
+                        month=key[3],
+                        total=sketch["total"],
+                        open=sketch["open"],
+                        buckets=sketch["buckets"].tobytes(),
+                        refreshed_at=refreshed_at,
+                    )
+                )
+                continue
+            current.buckets = cls.merge(
+                [cls.load(current.buckets), sketch["buckets"]]
+            ).tobytes()
+            current.total += sketch["total"]
+            current.open += sketch["open"]
+            updated.append(current)
+        QuantileSketch.objects.bulk_update(
+            updated, ["buckets", "total", "open"]
+        )
+        QuantileSketch.objects.bulk_create(created)
+
+    @classmethod
+    def load(cls, blob: bytes) -> np.ndarray:
+        """
+        Returns the bucket keys and counts of a stored sketch.
+        """
+        return np.frombuffer(bytes(blob), dtype=np.int64).reshape(
+            2, -1
+        )
+
+    @classmethod
+    def rebuild(
+        cls,
+        start: date = None,
+        end: date = None,
+        ids: Dict[str, List[int]] = None,
+    ) -> int:
+        """
+        Rebuilds the sketches of the months of a date range, or of all
+        subscription months, one month at a time. With ids, only the
+        sketches of those rows of each dimension are rebuilt.
+        """
+        if start is None or end is None:
+            bounds: Dict[str, datetime] = (
+                Subscription.objects.aggregate(
+                    start=Min("created_at"), end=Max("created_at")
+                )
+            )
+            if bounds["start"] is None:
+                return 0
+            start: date = start or SketchLogic.get_day(
+                bounds["start"]
+            )
+            end: date = end or SketchLogic.get_day(bounds["end"])
+        tz: tzinfo = timezone.get_default_timezone()
+        refreshed_at: datetime = timezone.now()
+        total: int = 0
+        month: date = cls.get_month(start)
+        while month <= end:
+            following: date = cls.get_next_month(month)
+            rows: QuerySet = cls.get_rows(
+                Subscription.active.filter(
+                    created_at__gte=timezone.make_aware(
+                        datetime.combine(month, time.min), tz
+                    ),
+                    created_at__lt=timezone.make_aware(
+                        datetime.combine(following, time.min), tz
+                    ),
+                )
+            )
+            sketches: QuerySet = QuantileSketch.objects.filter(
+                month=month
+            )
+            if ids is not None:
+                selected: Q = Q(pk__in=[])
+                stored: Q = Q(pk__in=[])
+                for dimension, pks in ids.items():
+                    selected |= Q(
+                        **{f"{cls.DIMENSIONS[dimension]}__in": pks}
+                    )
+                    stored |= Q(
+                        dimension=dimension, object_id__in=pks
+                    )
+                rows: QuerySet = rows.filter(selected)
+                sketches: QuerySet = sketches.filter(stored)
+            built: Dict[Tuple[str, str, int, date], Dict] = (
+                cls.get_sketches(rows.iterator(), ids=ids)
+            )
+            with transaction.atomic():
+                sketches.delete()
+                QuantileSketch.objects.bulk_create(
+                    QuantileSketch(
+                        measure=key[0],
+                        dimension=key[1],
+                        object_id=key[2],
+                        month=key[3],
+                        total=sketch["total"],
+                        open=sketch["open"],
+                        buckets=sketch["buckets"].tobytes(),
+                        refreshed_at=refreshed_at,
+                    )
+                    for key, sketch in built.items()
+                )
+            total += len(built)
+            month: date = following
+        refreshed.send(
+            sender=cls,
+            start=cls.get_month(start),
+            end=month - timedelta(days=1),
+        )
+        logger.debug("Rebuilt: %s %s %s %s", cls, start, end, total)
+        return total
+
+    @classmethod
+    def mark(
+        cls,
+        start: date,
+        end: date,
+        ids: Dict[str, Iterable[int]] = None,
+    ) -> int:
+        """
+        Marks the sketches of the months of a date range stale, or
+        only those of some rows of each dimension.
+        """
+        stale: List[StaleSketch] = []
+        month: date = cls.get_month(start)
+        while month <= end:
+            if ids is None:
+                stale.append(StaleSketch(kind=cls.STALE, day=month))
+            else:
+                stale.extend(
+                    StaleSketch(
+                        kind=cls.STALE,
+                        day=month,
+                        dimension=dimension,
+                        object_id=pk,
+                    )
+                    for dimension, pks in ids.items()
+                    for pk in set(pks)
+                    if pk is not None
+                )
+            month: date = cls.get_next_month(month)
+        StaleSketch.objects.bulk_create(stale, ignore_conflicts=True)
+        logger.debug("Marked: %s %s", cls, len(stale))
+        return len(stale)
+
+    @classmethod
+    def mark_subscriptions(
+        cls, subscriptions: QuerySet, ids: Dict[str, Iterable[int]]
+    ) -> int:
+        """
+        Marks the sketches of some rows of each dimension stale, over
+        the months of some subscriptions.
+        """
+        bounds: Dict[str, datetime] = subscriptions.aggregate(
+            start=Min("created_at"), end=Max("created_at")
+        )
+        if bounds["start"] is None:
+            return 0
+        return cls.mark(
+            SketchLogic.get_day(bounds["start"]),
+            SketchLogic.get_day(bounds["end"]),
+            ids=ids,
+        )
+
+    @classmethod
+    def refresh(cls, start: date = None, end: date = None) -> int:
+        """
+        Rebuilds the stale sketches of a date range, or of all months,
+        and those holding open subscriptions whose LTV has grown since
+        they were built. Marks are cleared before rebuilding, so months
+        changed meanwhile are marked again, and restored if the rebuild
+        fails.
+        """
+        months: Q = Q()
+        if start is not None:
+            months &= Q(month__gte=cls.get_month(start))
+        if end is not None:
+            months &= Q(month__lte=end)
+        stale: Dict[date, Dict[str, List[int]]] = {}
+        for month, dimension, pk in (
+            QuantileSketch.objects.filter(
+                months,
+                measure="ltv",
+                open__gt=0,
+                refreshed_at__lt=timezone.make_aware(
+                    datetime.combine(
+                        cls.get_month(timezone.now()), time.min
+                    ),
+                    timezone.get_default_timezone(),
+                ),
+            )
+            .values_list("month", "dimension", "object_id")
+            .order_by("month")
+        ):
+            stale.setdefault(month, {}).setdefault(
+                dimension, []
+            ).append(pk)
+        marks: QuerySet = StaleSketch.objects.filter(kind=cls.STALE)
+        if start is not None:
+            marks: QuerySet = marks.filter(
+                day__gte=cls.get_month(start)
+            )
+        if end is not None:
+            marks: QuerySet = marks.filter(day__lte=end)
+        claimed: List[StaleSketch] = list(marks)
+        StaleSketch.objects.filter(
+            pk__in=[mark.pk for mark in claimed]
+        ).delete()
+        whole: List[date] = []
+        for mark in claimed:
+            if not mark.dimension:
+                whole.append(mark.day)
+            else:
+                stale.setdefault(mark.day, {}).setdefault(
+                    mark.dimension, []
+                ).append(mark.object_id)
+        for month in whole:
+            stale[month] = None
+        try:
+            total: int = sum(
+                cls.rebuild(month, month, ids=ids)
+                for month, ids in sorted(stale.items())
+            )
+        except Exception:
+            StaleSketch.objects.bulk_create(
+                claimed, ignore_conflicts=True
+            )
+            raise
+        logger.debug("Refreshed: %s %s %s", cls, len(stale), total)
+        return total
+
+    @classmethod
+    def get_percentiles(
+        cls,
+        start: datetime,
+        end: datetime,
+        measure: str,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Returns the percentiles of a measure by the months of a date
+        range, grouped by a dimension. With a limit, only the groups
+        with the most subscriptions are returned, and the rest is
+        merged into a None group if other is set. Sketches are only
+        read, and refreshed by the refresh_sketches command.
+        """
+        rows: QuerySet = QuantileSketch.objects.filter(
+            measure=measure,
+            dimension=dimension,
+            month__gte=cls.get_month(start),
+            month__lte=SketchLogic.get_day(end),
+        )
+        if ids is not None:
+            rows: QuerySet = rows.filter(object_id__in=ids)
+        buckets: Dict[int, List[np.ndarray]] = {}
+        totals: Dict[int, int] = {}
+        for pk, total, blob in rows.values_list(
+            "object_id", "total", "buckets"
+        ):
+            buckets.setdefault(pk, []).append(cls.load(blob))
+            totals[pk] = totals.get(pk, 0) + total
+        ranked: List[int] = sorted(
+            totals, key=lambda pk: (-totals[pk], pk)
+        )
+        if limit is None:
+            limit: int = len(ranked)
+        percentiles: Dict[int, Dict[str, float]] = {
+            pk: cls.get_quantiles(cls.merge(buckets[pk]))
+            for pk in ranked[:limit]
+        }
+        if other and ranked[limit:]:
+            percentiles[None] = cls.get_quantiles(
+                cls.merge(
+                    sketch
+                    for pk in ranked[limit:]
+                    for sketch in buckets[pk]
+                )
+            )
+        logger.debug(
+            "Percentiles: %s %s %s %s",
+            cls,
+            measure,
+            dimension,
+            percentiles,
+        )
+        return percentiles
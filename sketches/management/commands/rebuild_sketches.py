@@ -0,0 +1,52 @@
+from datetime import date
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from sketches.logic import QuantileSketchLogic, SketchLogic
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the distinct client sketches from the events, and the
+    quantile sketches from the subscriptions.
+    """
+
+    help: str = (
+        "Rebuilds the sketches of a date range, or of all days. "
+        "Event and subscription writes keep the sketches up to date "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Command line arguments.
+        """
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to rebuild, as YYYY-MM-DD.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to rebuild, as YYYY-MM-DD.",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        """
+        Command entrypoint.
+        """
+        start: date = options["start"]
+        end: date = options["end"]
+        if bool(start) != bool(end):
+            raise CommandError("Both --start and --end are required.")
+        if start and start > end:
+            raise CommandError("--start must not be after --end.")
+        total: int = SketchLogic.rebuild(start, end)
+        self.stdout.write(f"Sketches rebuilt: {total}")
+        total: int = QuantileSketchLogic.rebuild(start, end)
+        self.stdout.write(f"Quantile sketches rebuilt: {total}")
@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from sketches.logic import QuantileSketchLogic, SketchLogic
+
+
+class Command(BaseCommand):
+    """
+    Refreshes the stale sketches, and the quantile sketches holding
+    open subscriptions.
+    """
+
+    help: str = (
+        "Rebuilds the sketches marked stale by event and "
+        "subscription writes, and the LTV sketches of open "
+        "subscriptions not rebuilt this month, of a date range or "
+        "of all months. Schedule it frequently, since changed rows "
+        "only reach the sketches once it runs."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Command line arguments.
+        """
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to refresh, as YYYY-MM-DD.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to refresh, as YYYY-MM-DD.",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        """
+        Command entrypoint.
+        """
+        start: date = options["start"]
+        end: date = options["end"]
+        if bool(start) != bool(end):
+            raise CommandError("Both --start and --end are required.")
+        if start and start > end:
+            raise CommandError("--start must not be after --end.")
+        total: int = SketchLogic.refresh(start, end)
+        self.stdout.write(f"Sketches refreshed: {total}")
+        total: int = QuantileSketchLogic.refresh(start, end)
+        self.stdout.write(f"Quantile sketches refreshed: {total}")
@@ -0,0 +1,39 @@
+# Generated by Django 4.0.3 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Sketch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("dimension", models.CharField(max_length=20)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("registers", models.BinaryField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="sketch",
+            constraint=models.UniqueConstraint(
+                fields=("dimension", "object_id", "day"),
+                name="sketches_sketch_dimension_object_id_day",
+            ),
+        ),
+    ]
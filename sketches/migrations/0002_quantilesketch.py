@@ -0,0 +1,42 @@
+# Generated by Django 4.0.3 on 2026-10-18 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sketches", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuantileSketch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("measure", models.CharField(max_length=20)),
+                ("dimension", models.CharField(max_length=20)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("open", models.PositiveIntegerField(default=0)),
+                ("buckets", models.BinaryField()),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="quantilesketch",
+            constraint=models.UniqueConstraint(
+                fields=("measure", "dimension", "object_id", "month"),
+                name="sketches_quantilesketch_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.0.3 on 2026-10-18 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sketches", "0002_quantilesketch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StaleSketch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=20)),
+                ("day", models.DateField()),
+                (
+                    "dimension",
+                    models.CharField(default="", max_length=20),
+                ),
+                (
+                    "object_id",
+                    models.PositiveBigIntegerField(default=0),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="stalesketch",
+            constraint=models.UniqueConstraint(
+                fields=("kind", "day", "dimension", "object_id"),
+                name="sketches_stalesketch_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,117 @@
+from django.db import models
+
+
+class Sketch(models.Model):
+    """
+    Daily HyperLogLog Sketch Model of the distinct clients of a
+    campaign or page.
+    """
+
+    day: models.DateField = models.DateField(null=False)
+    dimension: models.CharField = models.CharField(
+        max_length=20, null=False
+    )
+    object_id: models.PositiveBigIntegerField = (
+        models.PositiveBigIntegerField(null=False)
+    )
+    registers: models.BinaryField = models.BinaryField(null=False)
+    updated_at: models.DateTimeField = models.DateTimeField(
+        auto_now=True
+    )
+
+    objects: models.Manager = models.Manager()
+
+    class Meta:
+        constraints: list = [
+            models.UniqueConstraint(
+                fields=["dimension", "object_id", "day"],
+                name="sketches_sketch_dimension_object_id_day",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.day}, {self.dimension} {self.object_id}>"
+
+
+class QuantileSketch(models.Model):
+    """
+    Monthly Quantile Sketch Model of a Subscription measure of a
+    campaign or product.
+    """
+
+    month: models.DateField = models.DateField(null=False)
+    measure: models.CharField = models.CharField(
+        max_length=20, null=False
+    )
+    dimension: models.CharField = models.CharField(
+        max_length=20, null=False
+    )
+    object_id: models.PositiveBigIntegerField = (
+        models.PositiveBigIntegerField(null=False)
+    )
+    # Open subscriptions keep growing their LTV, so sketches holding
+    # any of them are rebuilt once per month.
+    total: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0
+    )
+    open: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0
+    )
+    buckets: models.BinaryField = models.BinaryField(null=False)
+    refreshed_at: models.DateTimeField = models.DateTimeField(
+        null=False
+    )
+
+    objects: models.Manager = models.Manager()
+
+    class Meta:
+        constraints: list = [
+            models.UniqueConstraint(
+                fields=["measure", "dimension", "object_id", "month"],
+                name="sketches_quantilesketch_key",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.month}, {self.measure}, {self.dimension} {self.object_id}>"
+
+
+class StaleSketch(models.Model):
+    """
+    Stale Sketch Model of a day of distinct client sketches, or of a
+    month of quantile sketches of every row or one row of a dimension,
+    rebuilt by the refresh_sketches command.
+    """
+
+    kind: models.CharField = models.CharField(
+        max_length=20, null=False
+    )
+    day: models.DateField = models.DateField(null=False)
+    dimension: models.CharField = models.CharField(
+        max_length=20, null=False, default=""
+    )
+    object_id: models.PositiveBigIntegerField = (
+        models.PositiveBigIntegerField(null=False, default=0)
+    )
+
+    objects: models.Manager = models.Manager()
+
+    class Meta:
+        constraints: list = [
+            models.UniqueConstraint(
+                fields=["kind", "day", "dimension", "object_id"],
+                name="sketches_stalesketch_key",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {self.kind}, {self.day}, {self.dimension} {self.object_id}>"
@@ -0,0 +1,315 @@
+"""
+Sketch updates on Event and Subscription writes.
+"""
+
+from datetime import date
+from typing import Dict, List
+
+from analytics.signals import ingested
+from django.db.models.query import QuerySet
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from events.models import Event
+from metrics.models import Metric
+from products.models import Product
+from subscriptions.models import Subscription
+
+from sketches.logic import QuantileSketchLogic, SketchLogic
+
+
+@receiver(pre_save, sender=Event)
+def track(sender: type, instance: Event, **kwargs: dict) -> None:
+    """
+    Collects the stored values of the fields of an Event that its
+    sketches depend on, if a save changes them.
+    """
+    instance._sketch_former = SketchLogic.get_former(
+        instance,
+        ("client_id", "metric_id", "created_at", "deleted_at"),
+    )
+
+
+@receiver(post_save, sender=Event)
+def update(
+    sender: type, instance: Event, created: bool, **kwargs: dict
+) -> None:
+    """
+    Adds the client of a new Event to its sketches. Registers cannot
+    forget a client, so the days of a changed Event are marked stale
+    instead.
+    """
+    day: date = SketchLogic.get_day(instance.created_at)
+    former: Dict[str, object] = getattr(
+        instance, "_sketch_former", {}
+    )
+    if created and instance.deleted_at is None:
+        SketchLogic.update(
+            [
+                (
+                    day,
+                    instance.metric.campaign_id,
+                    instance.metric.page_id,
+                    instance.client_id,
+                )
+            ]
+        )
+    elif former:
+        SketchLogic.mark(
+            {
+                day,
+                SketchLogic.get_day(
+                    former.get("created_at", instance.created_at)
+                ),
+            }
+        )
+
+
+@receiver(post_delete, sender=Event)
+def mark(sender: type, instance: Event, **kwargs: dict) -> None:
+    """
+    Marks the day of a deleted active Event stale.
+    """
+    if instance.deleted_at is None:
+        SketchLogic.mark([SketchLogic.get_day(instance.created_at)])
+
+
+@receiver(pre_save, sender=Metric)
+def track_metric(
+    sender: type, instance: Metric, **kwargs: dict
+) -> None:
+    """
+    Collects the stored campaign and page of a Metric, if a save
+    changes them.
+    """
+    instance._sketch_former = SketchLogic.get_former(
+        instance, ("campaign_id", "page_id")
+    )
+
+
+@receiver(post_save, sender=Metric)
+def mark_metric(
+    sender: type, instance: Metric, created: bool, **kwargs: dict
+) -> None:
+    """
+    Marks the days of the Events of a moved Metric stale.
+    """
+    if created or not getattr(instance, "_sketch_former", {}):
+        return
+    SketchLogic.mark(
+        Event.active.filter(metric=instance)
+        .annotate(
+            day=TruncDate(
+                "created_at", tzinfo=timezone.get_default_timezone()
+            )
+        )
+        .values_list("day", flat=True)
+        .distinct()
+    )
+
+
+@receiver(pre_save, sender=Subscription)
+def track_quantiles(
+    sender: type, instance: Subscription, **kwargs: dict
+) -> None:
+    """
+    Collects the stored values of the fields of a Subscription that
+    its quantile sketches depend on, if a save changes them. Open
+    subscriptions are rebuilt monthly, so canceling one is left to
+    the refresh.
+    """
+    former: Dict[str, object] = SketchLogic.get_former(
+        instance,
+        (
+            "event_id",
+            "product_id",
+            "price",
+            "created_at",
+            "canceled_at",
+            "deleted_at",
+        ),
+    )
+    if former.get("canceled_at", True) is None:
+        del former["canceled_at"]
+    instance._sketch_former = former
+
+
+@receiver(post_save, sender=Subscription)
+def update_quantiles(
+    sender: type,
+    instance: Subscription,
+    created: bool,
+    **kwargs: dict
+) -> None:
+    """
+    Adds a new Subscription to its quantile sketches, and marks the
+    sketches of the months, campaigns and products of a changed one
+    stale.
+    """
+    former: Dict[str, object] = getattr(
+        instance, "_sketch_former", {}
+    )
+    if created:
+        QuantileSketchLogic.update(
+            QuantileSketchLogic.get_rows(
+                Subscription.active.filter(pk=instance.pk)
+            )
+        )
+    elif former:
+        days: List[date] = [
+            SketchLogic.get_day(instance.created_at),
+            SketchLogic.get_day(
+                former.get("created_at", instance.created_at)
+            ),
+        ]
+        QuantileSketchLogic.mark(
+            min(days),
+            max(days),
+            ids={
+                "campaign": Event.objects.filter(
+                    pk__in=[
+                        instance.event_id,
+                        former.get("event_id", instance.event_id),
+                    ]
+                ).values_list("metric__campaign", flat=True),
+                "product": [
+                    instance.product_id,
+                    former.get("product_id", instance.product_id),
+                ],
+            },
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def mark_quantiles(
+    sender: type, instance: Subscription, **kwargs: dict
+) -> None:
+    """
+    Marks the sketches of the month, campaign and product of a
+    deleted active Subscription stale.
+    """
+    if instance.deleted_at is not None:
+        return
+    day: date = SketchLogic.get_day(instance.created_at)
+    QuantileSketchLogic.mark(
+        day,
+        day,
+        ids={
+            "campaign": [instance.event.metric.campaign_id],
+            "product": [instance.product_id],
+        },
+    )
+
+
+@receiver(post_save, sender=Event)
+def mark_event_quantiles(
+    sender: type, instance: Event, created: bool, **kwargs: dict
+) -> None:
+    """
+    Marks the campaign quantile sketches of the months of the
+    Subscriptions of an Event moved to another Metric stale.
+    """
+    former: Dict[str, object] = getattr(
+        instance, "_sketch_former", {}
+    )
+    if created or "metric_id" not in former:
+        return
+    QuantileSketchLogic.mark_subscriptions(
+        Subscription.objects.filter(event=instance),
+        ids={
+            "campaign": Metric.objects.filter(
+                pk__in=[instance.metric_id, former["metric_id"]]
+            ).values_list("campaign", flat=True)
+        },
+    )
+
+
+@receiver(post_save, sender=Metric)
+def mark_metric_quantiles(
+    sender: type, instance: Metric, created: bool, **kwargs: dict
+) -> None:
+    """
+    Marks the quantile sketches of the former and new campaign of a
+    Metric stale over the months of its Subscriptions, when it moves
+    to another campaign.
+    """
+    former: Dict[str, object] = getattr(
+        instance, "_sketch_former", {}
+    )
+    if created or "campaign_id" not in former:
+        return
+    QuantileSketchLogic.mark_subscriptions(
+        Subscription.objects.filter(event__metric=instance),
+        ids={
+            "campaign": [former["campaign_id"], instance.campaign_id]
+        },
+    )
+
+
+@receiver(pre_save, sender=Product)
+def track_product(
+    sender: type, instance: Product, **kwargs: dict
+) -> None:
+    """
+    Collects the stored cost of a Product, if a save changes it.
+    """
+    instance._sketch_former = SketchLogic.get_former(
+        instance, ("cost",)
+    )
+
+
+@receiver(post_save, sender=Product)
+def mark_product_quantiles(
+    sender: type, instance: Product, created: bool, **kwargs: dict
+) -> None:
+    """
+    Marks the quantile sketches of a Product and of the campaigns of
+    its Subscriptions stale when its cost changes their LTVs.
+    """
+    if created or not getattr(instance, "_sketch_former", {}):
+        return
+    subscriptions: QuerySet = Subscription.objects.filter(
+        product=instance
+    )
+    QuantileSketchLogic.mark_subscriptions(
+        subscriptions,
+        ids={
+            "product": [instance.pk],
+            "campaign": subscriptions.values_list(
+                "event__metric__campaign", flat=True
+            ).distinct(),
+        },
+    )
+
+
+@receiver(ingested, sender=Event)
+def update_instances(
+    sender: type, instances: List[Event], **kwargs: dict
+) -> None:
+    """
+    Adds the clients of bulk inserted Events to their sketches.
+    """
+    SketchLogic.update(
+        SketchLogic.get_rows(
+            Event.active.filter(
+                pk__in=[instance.pk for instance in instances]
+            )
+        )
+    )
+
+
+@receiver(ingested, sender=Subscription)
+def update_quantile_instances(
+    sender: type, instances: List[Subscription], **kwargs: dict
+) -> None:
+    """
+    Adds bulk inserted Subscriptions to their quantile sketches.
+    """
+    QuantileSketchLogic.update(
+        QuantileSketchLogic.get_rows(
+            Subscription.active.filter(
+                pk__in=[instance.pk for instance in instances]
+            )
+        )
+    )
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class SnapshotsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "snapshots"
+
+    def ready(self) -> None:
+        """
+        Connects the snapshot invalidation signals.
+        """
+        import snapshots.signals  # noqa: F401
@@ -0,0 +1,504 @@
+import logging
+import time as clock
+from datetime import date, datetime, time, tzinfo
+from threading import Lock
+from typing import Dict, List, Tuple
+from uuid import uuid4
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import BaseCache
+from django.db.models.functions import TruncHour
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from reports.logic import ReportCacheLogic, ReportLogic
+from subscriptions.models import Subscription
+
+logger: logging.RootLogger = logging.getLogger(__name__)
+
+
+class SnapshotLogic:
+    """
+    Business logic related to the in-memory Subscription snapshot.
+
+    Active subscriptions are kept as NumPy columns sorted by creation
+    time and shared by every thread of the process. Rows saved since
+    the last load are merged incrementally, using updated_at as a
+    high-water mark. Writes that bypass updated_at bump a version
+    shared by every process in the report versions cache, so each
+    process reloads on its next check.
+    """
+
+    DIMENSIONS: Dict[str, str] = {
+        "campaign": "event__metric__campaign",
+        "audience": "event__metric__campaign__audience",
+        "product": "product",
+        "city": "event__metric__campaign__city",
+        "state": "event__metric__campaign__city__state",
+        "country": "event__metric__campaign__city__state__country",
+    }
+    COLUMNS: Dict[str, type] = {
+        "pk": np.int64,
+        "created_at": np.int64,
+        "hour": np.int64,
+        "created_month": np.int64,
+        "canceled_month": np.int64,
+        "price": np.float64,
+        "cost": np.float64,
+        **{dimension: np.int64 for dimension in DIMENSIONS},
+    }
+
+    VERSION_KEY: str = "snapshots:version"
+
+    SNAPSHOT: Dict[str, np.ndarray] = {}
+    LOCK: Lock = Lock()
+    VERSION: str = None
+    UPDATED_AT: datetime = None
+    STALE: bool = True
+    LOADED_AT: float = 0.0
+    CHECKED_AT: float = 0.0
+
+    def __init__(self, snapshot: Dict[str, np.ndarray]) -> None:
+        """
+        Snapshot Logic constructor.
+        """
+        self.snapshot: Dict[str, np.ndarray] = snapshot
+
+    def __str__(self) -> str:
+        """
+        String serializer.
+        """
+        return f"<{self.__class__.__name__}: {len(self.snapshot.get('pk', []))}>"
+
+    @classmethod
+    def get_timestamp(cls, value: datetime) -> int:
+        """
+        Returns a date or datetime as microseconds since the epoch.
+        """
+        if not isinstance(value, datetime):
+            value: datetime = datetime.combine(value, time.min)
+        if timezone.is_naive(value):
+            value: datetime = timezone.make_aware(value)
+        return round(value.timestamp() * 1e6)
+
+    @classmethod
+    def get_month(cls, value: datetime) -> int:
+        """
+        Returns the month of a datetime as months since year zero.
+        """
+        value: datetime = timezone.localtime(value)
+        return value.year * 12 + value.month
+
+    @classmethod
+    def get_rows(cls, since: datetime = None) -> QuerySet:
+        """
+        Returns the subscription columns saved since a datetime.
+        """
+        rows: QuerySet = Subscription.objects.all()
+        if since is not None:
+            rows: QuerySet = rows.filter(updated_at__gte=since)
+        return rows.annotate(
+            hour=TruncHour(
+                "created_at", tzinfo=timezone.get_default_timezone()
+            )
+        ).values_list(
+            "pk",
+            "created_at",
+            "hour",
+            "canceled_at",
+            "price",
+            "updated_at",
+            "deleted_at",
+            *cls.DIMENSIONS.values(),
+            "product__cost",
+        )
+
+    @classmethod
+    def load(cls, since: datetime = None) -> Tuple[Dict, datetime]:
+        """
+        Loads the active subscriptions saved since a datetime as
+        columns, and returns them with their newest updated_at.
+        """
+        columns: Dict[str, List] = {
+            column: [] for column in cls.COLUMNS
+        }
+        changed: List[int] = []
+        updated_at: datetime = since
+        for row in cls.get_rows(since=since).iterator():
+            pk, created_at, hour, canceled_at, price = row[:5]
+            updated, deleted_at, *dimensions = row[5:-1]
+            changed.append(pk)
+            if updated_at is None or updated > updated_at:
+                updated_at: datetime = updated
+            if deleted_at is not None:
+                continue
+            columns["pk"].append(pk)
+            columns["created_at"].append(
+                cls.get_timestamp(created_at)
+            )
+            columns["hour"].append(cls.get_timestamp(hour))
+            columns["created_month"].append(cls.get_month(created_at))
+            columns["canceled_month"].append(
+                cls.get_month(canceled_at) if canceled_at else 0
+            )
+            columns["price"].append(price)
+            columns["cost"].append(row[-1])
+            for dimension, value in zip(cls.DIMENSIONS, dimensions):
+                columns[dimension].append(value or 0)
+        snapshot: Dict[str, np.ndarray] = {
+            column: np.array(columns[column], dtype=dtype)
+            for column, dtype in cls.COLUMNS.items()
+        }
+        snapshot["changed"] = np.array(changed, dtype=np.int64)
+        return snapshot, updated_at
+
+    @classmethod
+    def merge(
+        cls,
+        snapshot: Dict[str, np.ndarray],
+        rows: Dict[str, np.ndarray],
+    ) -> Dict[str, np.ndarray]:
+        """
+        Replaces the changed rows of a snapshot, keeping it sorted
+        by creation time.
+        """
+        kept: np.ndarray = ~np.isin(snapshot["pk"], rows["changed"])
+        merged: Dict[str, np.ndarray] = {
+            column: np.concatenate(
+                (snapshot[column][kept], rows[column])
+            )
+            for column in cls.COLUMNS
+        }
+        order: np.ndarray = np.argsort(
+            merged["created_at"], kind="stable"
+        )
+        return {
+            column: values[order] for column, values in merged.items()
+        }
+
+    @classmethod
+    def get_version(cls) -> str:
+        """
+        Returns the shared snapshot version, creating it on first use.
+        """
+        versions: BaseCache = ReportCacheLogic.get_versions()
+        version: str = versions.get(cls.VERSION_KEY)
+        if version is None:
+            versions.add(cls.VERSION_KEY, uuid4().hex, None)
+            version: str = versions.get(cls.VERSION_KEY)
+        return version
+
+    @classmethod
+    def refresh(cls, full: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Reloads the whole snapshot, or merges the rows saved since
+        the last refresh, at most once per interval. The snapshot is
+        reloaded when the shared version changed since it was loaded.
+        """
+        with cls.LOCK:
+            now: float = clock.monotonic()
+            if (
+                not full
+                and not cls.STALE
+                and now - cls.CHECKED_AT <= settings.SNAPSHOT_INTERVAL
+            ):
+                return cls.SNAPSHOT
+            version: str = cls.get_version()
+            full: bool = (
+                full
+                or cls.STALE
+                or version != cls.VERSION
+                or now - cls.LOADED_AT > settings.SNAPSHOT_TIMEOUT
+            )
+            if full:
+                rows, updated_at = cls.load()
+                cls.SNAPSHOT: Dict[str, np.ndarray] = cls.merge(
+                    {
+                        column: rows[column][:0]
+                        for column in cls.COLUMNS
+                    },
+                    rows,
+                )
+                cls.STALE: bool = False
+                cls.VERSION: str = version
+                cls.LOADED_AT: float = now
+            else:
+                rows, updated_at = cls.load(since=cls.UPDATED_AT)
+                if len(rows["changed"]):
+                    cls.SNAPSHOT: Dict[str, np.ndarray] = cls.merge(
+                        cls.SNAPSHOT, rows
+                    )
+            cls.UPDATED_AT: datetime = updated_at
+            cls.CHECKED_AT: float = now
+            logger.debug(
+                "Snapshot: %s %s %s",
+                cls,
+                full,
+                len(cls.SNAPSHOT["pk"]),
+            )
+            return cls.SNAPSHOT
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        Reloads the whole snapshot on its next use, in this process,
+        and in the others on their next check.
+        """
+        ReportCacheLogic.get_versions().set(
+            cls.VERSION_KEY, uuid4().hex, None
+        )
+        with cls.LOCK:
+            cls.STALE: bool = True
+
+    @classmethod
+    def get_snapshot(cls) -> Dict[str, np.ndarray]:
+        """
+        Returns the process snapshot, refreshing it at most once
+        per interval.
+        """
+        snapshot: Dict[str, np.ndarray] = cls.SNAPSHOT
+        if (
+            cls.STALE
+            or clock.monotonic() - cls.CHECKED_AT
+            > settings.SNAPSHOT_INTERVAL
+        ):
+            snapshot: Dict[str, np.ndarray] = cls.refresh()
+        return snapshot
+
+    @classmethod
+    def get_window(
+        cls, start: datetime, end: datetime
+    ) -> Dict[str, np.ndarray]:
+        """
+        Returns the snapshot columns created by date range,
+        as views of the shared arrays.
+        """
+        snapshot: Dict[str, np.ndarray] = cls.get_snapshot()
+        first: int = np.searchsorted(
+            snapshot["created_at"], cls.get_timestamp(start), "left"
+        )
+        last: int = np.searchsorted(
+            snapshot["created_at"], cls.get_timestamp(end), "right"
+        )
+        return {
+            column: snapshot[column][first:last]
+            for column in cls.COLUMNS
+        }
+
+    @classmethod
+    def get_pks(
+        cls, totals: np.ndarray, ids: List[int] = None
+    ) -> np.ndarray:
+        """
+        Returns the non-empty bins of a breakdown that are in a list
+        of ids, if any, so rows are grouped first and filtered per
+        bin.
+        """
+        if ids is None:
+            return np.flatnonzero(totals)
+        return np.intersect1d(
+            np.flatnonzero(totals), np.fromiter(ids, dtype=np.int64)
+        )
+
+    @classmethod
+    def get_frequencies(
+        cls,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, int]:
+        """
+        Counts subscriptions by date range, grouped by a dimension.
+        With a limit, only the largest groups are returned, and the
+        rest is summed into a None group if other is set.
+        """
+        window: Dict[str, np.ndarray] = cls.get_window(start, end)
+        totals: np.ndarray = np.bincount(window[dimension])
+        pks: np.ndarray = cls.get_pks(totals, ids)
+        counts: np.ndarray = totals[pks]
+        if limit is not None:
+            top: np.ndarray = np.lexsort((pks, -counts))[:limit]
+            rest: int = int(counts.sum() - counts[top].sum())
+            pks, counts = pks[top], counts[top]
+        frequencies: Dict[int, int] = dict(
+            zip(pks.tolist(), counts.tolist())
+        )
+        if limit is not None and other and rest:
+            frequencies[None] = rest
+        logger.debug(
+            "Frequencies: %s %s %s", cls, dimension, frequencies
+        )
+        return frequencies
+
+    @classmethod
+    def get_comparison(
+        cls,
+        start: datetime,
+        end: datetime,
+        previous: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Counts subscriptions by date range and by the previous period,
+        from previous to start, grouped by a dimension over a single
+        window. With a limit, only the largest current groups are
+        returned, and the rest is summed into a None group if other
+        is set.
+        """
+        window: Dict[str, np.ndarray] = cls.get_window(previous, end)
+        current: np.ndarray = window[
+            "created_at"
+        ] >= cls.get_timestamp(start)
+        size: int = int(window[dimension].max(initial=-1)) + 1
+        totals: np.ndarray = np.bincount(
+            window[dimension] * 2 + current, minlength=size * 2
+        ).reshape(-1, 2)
+        pks: np.ndarray = cls.get_pks(totals.sum(axis=1), ids)
+        counts: np.ndarray = totals[pks]
+        if limit is not None:
+            top: np.ndarray = np.lexsort(
+                (pks, -counts[:, 0], -counts[:, 1])
+            )[:limit]
+            rest: np.ndarray = counts.sum(axis=0) - counts[top].sum(
+                axis=0
+            )
+            pks, counts = pks[top], counts[top]
+        comparison: Dict[int, Tuple[int, int]] = {
+            pk: (now, before)
+            for pk, (before, now) in zip(
+                pks.tolist(), counts.tolist()
+            )
+        }
+        if limit is not None and other and rest.any():
+            comparison[None] = (int(rest[1]), int(rest[0]))
+        logger.debug(
+            "Comparison: %s %s %s", cls, dimension, comparison
+        )
+        return comparison
+
+    @classmethod
+    def get_histogram(
+        cls, start: datetime, end: datetime
+    ) -> List[Dict[str, float]]:
+        """
+        Returns subscription counts and margins by hour of creation.
+        """
+        window: Dict[str, np.ndarray] = cls.get_window(start, end)
+        tz: tzinfo = timezone.get_default_timezone()
+        hours: np.ndarray = window["hour"]
+        histogram: List[Dict[str, float]] = []
+        if len(hours):
+            firsts: np.ndarray = np.flatnonzero(
+                np.diff(hours, prepend=hours[0] - 1)
+            )
+            totals: np.ndarray = np.diff(firsts, append=len(hours))
+            margins: np.ndarray = np.add.reduceat(
+                window["price"] - window["cost"], firsts
+            )
+            histogram: List[Dict[str, float]] = [
+                {
+                    "hour": datetime.fromtimestamp(hour / 1e6, tz),
+                    "total": total,
+                    "margin": margin,
+                }
+                for hour, total, margin in zip(
+                    hours[firsts].tolist(),
+                    totals.tolist(),
+                    margins.tolist(),
+                )
+            ]
+        logger.debug("Histogram: %s %s", cls, histogram)
+        return histogram
+
+    @classmethod
+    def get_aggregates(
+        cls,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        ids: List[int] = None,
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Aggregates subscription life, margin and LTV by date range,
+        grouped by a dimension.
+        """
+        window: Dict[str, np.ndarray] = cls.get_window(start, end)
+        codes: np.ndarray = window[dimension]
+        until: np.ndarray = window["canceled_month"]
+        until: np.ndarray = np.where(
+            until > 0, until, cls.get_month(timezone.now())
+        )
+        life: np.ndarray = until - window["created_month"]
+        margin: np.ndarray = window["price"] - window["cost"]
+        totals: np.ndarray = np.bincount(codes)
+        lives: np.ndarray = np.bincount(codes, weights=life)
+        margins: np.ndarray = np.bincount(codes, weights=margin)
+        ltvs: np.ndarray = np.bincount(codes, weights=life * margin)
+        aggregates: Dict[int, Dict[str, float]] = {
+            pk: {
+                "total": int(totals[pk]),
+                "life": int(lives[pk]),
+                "margin": float(margins[pk]),
+                "ltv": float(ltvs[pk]),
+                "average_life": float(lives[pk] / totals[pk]),
+                "average_margin": float(margins[pk] / totals[pk]),
+                "average_ltv": float(ltvs[pk] / totals[pk]),
+            }
+            for pk in cls.get_pks(totals, ids).tolist()
+        }
+        logger.debug(
+            "Aggregates: %s %s %s", cls, dimension, aggregates
+        )
+        return aggregates
+
+    @classmethod
+    def get_cohorts(
+        cls, start: datetime, end: datetime, ids: List[int] = None
+    ) -> Dict[date, Dict[int, int]]:
+        """
+        Counts subscriptions by date range, grouped by signup month and
+        months live, so the counts scale with cohorts by offsets.
+        """
+        window: Dict[str, np.ndarray] = cls.get_window(start, end)
+        kept: np.ndarray = (
+            np.ones(len(window["campaign"]), dtype=bool)
+            if ids is None
+            else np.isin(
+                window["campaign"], np.fromiter(ids, dtype=np.int64)
+            )
+        )
+        months: np.ndarray = window["created_month"][kept]
+        until: np.ndarray = window["canceled_month"][kept]
+        until: np.ndarray = np.where(
+            until > 0, until, cls.get_month(timezone.now())
+        )
+        cohorts: Dict[date, Dict[int, int]] = {}
+        if len(months):
+            first: int = int(months.min())
+            offsets: np.ndarray = until - months
+            width: int = int(offsets.max()) + 1
+            totals: np.ndarray = np.bincount(
+                (months - first) * width + offsets,
+                minlength=(int(months.max()) - first + 1) * width,
+            ).reshape(-1, width)
+            for i, j in zip(*np.nonzero(totals)):
+                month: int = first + int(i) - 1
+                cohorts.setdefault(
+                    date(month // 12, month % 12 + 1, 1), {}
+                )[int(j)] = int(totals[i, j])
+        logger.debug("Cohorts: %s %s", cls, cohorts)
+        return cohorts
+
+
+class SnapshotReportLogic(ReportLogic):
+    """
+    Business logic related to Reports, answered from the snapshot.
+    """
+
+    SUBSCRIPTIONS: type = SnapshotLogic
@@ -0,0 +1,45 @@
+"""
+Snapshot invalidation on writes that bypass Subscription.updated_at.
+"""
+
+from campaigns.models import Campaign
+from cities.models import City
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from events.models import Event
+from metrics.models import Metric
+from products.models import Product
+from states.models import State
+from subscriptions.models import Subscription
+
+from snapshots.logic import SnapshotLogic
+
+
+@receiver(post_delete, sender=Subscription)
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+@receiver(post_save, sender=Metric)
+@receiver(post_delete, sender=Metric)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+def invalidate(sender: type, instance: Model, **kwargs: dict) -> None:
+    """
+    Reloads the snapshot on its next use.
+    """
+    SnapshotLogic.invalidate()
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event(
+    sender: type, instance: Event, created: bool, **kwargs: dict
+) -> None:
+    """
+    Reloads the snapshot when an existing Event is moved.
+    """
+    if not created:
+        SnapshotLogic.invalidate()
@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import SearchViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from states.models import State
 from states.serializers import StateSerializer
@@ -14,7 +14,7 @@ from states.serializers import StateSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class StateViewSet(ModelViewSet):
+class StateViewSet(SearchViewSet):
     """
     State Model API View.
     """
@@ -23,29 +23,6 @@ class StateViewSet(ModelViewSet):
     queryset: QuerySet = State.objects.all()
     serializer_class: type = StateSerializer
 
-    def list(self, request: Request) -> Response:
-        """
-        GET /states
-        """
-        states: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            states: QuerySet = State.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: StateSerializer = self.serializer_class(
-            states, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", states)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request: Request) -> Response:
         """
         POST /states
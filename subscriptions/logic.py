@@ -1,8 +1,27 @@
 import logging
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
+from django.db.models import (
+    Avg,
+    Count,
+    DateTimeField,
+    DecimalField,
+    F,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.expressions import Combinable
+from django.db.models.functions import (
+    Coalesce,
+    ExtractMonth,
+    ExtractYear,
+    TruncHour,
+    TruncMonth,
+)
 from django.db.models.query import QuerySet
+from django.utils import timezone
 
 from subscriptions.models import Subscription
 
@@ -14,6 +33,15 @@ class SubscriptionLogic:
     Business logic related to Subscription.
     """
 
+    DIMENSIONS: Dict[str, str] = {
+        "campaign": "event__metric__campaign",
+        "audience": "event__metric__campaign__audience",
+        "product": "product",
+        "city": "event__metric__campaign__city",
+        "state": "event__metric__campaign__city__state",
+        "country": "event__metric__campaign__city__state__country",
+    }
+
     def __init__(self, subscription: Subscription) -> None:
         """
         Subscription Logic constructor.
@@ -39,3 +67,226 @@ class SubscriptionLogic:
         )
         logger.debug("Subscriptions: %s %s", cls, subscriptions)
         return subscriptions
+
+    @classmethod
+    def get_frequencies(
+        cls,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, int]:
+        """
+        Counts subscriptions by date range, grouped by a dimension. With a
+        limit, only the largest groups are returned, ordered and
+        limited by the database, and the rest is summed into a None
+        group if other is set.
+        """
+        field: str = cls.DIMENSIONS[dimension]
+        rows: QuerySet = cls.get_subscriptions(start=start, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        groups: QuerySet = rows.values_list(field).annotate(
+            total=Count("pk")
+        )
+        if limit is None:
+            frequencies: Dict[int, int] = dict(groups.order_by())
+        else:
+            frequencies: Dict[int, int] = dict(
+                groups.order_by("-total", field)[:limit]
+            )
+        if limit is not None and other:
+            rest: int = rows.count() - sum(frequencies.values())
+            if rest:
+                frequencies[None] = rest
+        logger.debug(
+            "Frequencies: %s %s %s", cls, dimension, frequencies
+        )
+        return frequencies
+
+    @classmethod
+    def get_comparison(
+        cls,
+        start: datetime,
+        end: datetime,
+        previous: datetime,
+        dimension: str,
+        ids: List[int] = None,
+        limit: int = None,
+        other: bool = False,
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Counts subscriptions by date range and by the previous period, from
+        previous to start, grouped by a dimension in a single scan. With
+        a limit, only the largest current groups are returned, and the
+        rest is summed into a None group if other is set.
+        """
+        field: str = cls.DIMENSIONS[dimension]
+        current: Q = Q(created_at__gte=start)
+        rows: QuerySet = cls.get_subscriptions(
+            start=previous, end=end
+        )
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        totals: Dict[str, Count] = {
+            "current": Count("pk", filter=current),
+            "previous": Count("pk", filter=~current),
+        }
+        groups: QuerySet = (
+            rows.values_list(field)
+            .annotate(**totals)
+            .order_by("-current", "-previous", field)
+        )
+        if limit is not None:
+            groups: QuerySet = groups[:limit]
+        comparison: Dict[int, Tuple[int, int]] = {
+            pk: (now, before) for pk, now, before in groups
+        }
+        if limit is not None and other:
+            aggregate: Dict[str, int] = rows.aggregate(**totals)
+            rest: Tuple[int, int] = (
+                aggregate["current"]
+                - sum(now for now, _ in comparison.values()),
+                aggregate["previous"]
+                - sum(before for _, before in comparison.values()),
+            )
+            if any(rest):
+                comparison[None] = rest
+        logger.debug(
+            "Comparison: %s %s %s", cls, dimension, comparison
+        )
+        return comparison
+
+    @classmethod
+    def get_histogram(
+        cls, start: datetime, end: datetime
+    ) -> QuerySet:
+        """
+        Returns subscription counts and margins by hour of creation.
+        """
+        histogram: QuerySet = (
+            cls.get_subscriptions(start=start, end=end)
+            .annotate(
+                hour=TruncHour(
+                    "created_at",
+                    tzinfo=timezone.get_default_timezone(),
+                )
+            )
+            .values("hour")
+            .annotate(
+                total=Count("pk"),
+                margin=Sum(
+                    F("price") - F("product__cost"),
+                    output_field=DecimalField(
+                        max_digits=20, decimal_places=4
+                    ),
+                ),
+            )
+            .order_by("hour")
+        )
+        logger.debug("Histogram: %s %s", cls, histogram)
+        return histogram
+
+    @classmethod
+    def get_life(cls) -> Combinable:
+        """
+        Returns the amount of months that a Subscription was live,
+        as a database expression.
+        """
+        until: Combinable = Coalesce(
+            "canceled_at",
+            Value(timezone.now(), output_field=DateTimeField()),
+        )
+        return (
+            (ExtractYear(until) - ExtractYear("created_at")) * 12
+            + ExtractMonth(until)
+            - ExtractMonth("created_at")
+        )
+
+    @classmethod
+    def get_margin(cls) -> Combinable:
+        """
+        Returns the marginal revenue of a Subscription,
+        as a database expression.
+        """
+        return F("price") - F("product__cost")
+
+    @classmethod
+    def get_ltv(cls) -> Combinable:
+        """
+        Returns the LTV of a Subscription, as a database expression.
+        """
+        return cls.get_life() * cls.get_margin()
+
+    @classmethod
+    def get_aggregates(
+        cls,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        ids: List[int] = None,
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Aggregates subscription life, margin and LTV by date range,
+        grouped by a dimension.
+        """
+        field: str = cls.DIMENSIONS[dimension]
+        decimal: DecimalField = DecimalField(
+            max_digits=20, decimal_places=4
+        )
+        rows: QuerySet = cls.get_subscriptions(start=start, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        aggregates: Dict[int, Dict[str, float]] = {
+            row.pop(field): row
+            for row in rows.values(field)
+            .annotate(
+                total=Count("pk"),
+                life=Sum(cls.get_life()),
+                margin=Sum(cls.get_margin(), output_field=decimal),
+                ltv=Sum(cls.get_ltv(), output_field=decimal),
+                average_life=Avg(cls.get_life()),
+                average_margin=Avg(
+                    cls.get_margin(), output_field=decimal
+                ),
+                average_ltv=Avg(cls.get_ltv(), output_field=decimal),
+            )
+            .order_by()
+        }
+        logger.debug(
+            "Aggregates: %s %s %s", cls, dimension, aggregates
+        )
+        return aggregates
+
+    @classmethod
+    def get_cohorts(
+        cls, start: datetime, end: datetime, ids: List[int] = None
+    ) -> Dict[datetime, Dict[int, int]]:
+        """
+        Counts subscriptions by date range, grouped by signup month and
+        months live, so the counts scale with cohorts by offsets.
+        """
+        field: str = cls.DIMENSIONS["campaign"]
+        rows: QuerySet = cls.get_subscriptions(start=start, end=end)
+        if ids is not None:
+            rows: QuerySet = rows.filter(**{f"{field}__in": ids})
+        cohorts: Dict[datetime, Dict[int, int]] = {}
+        for row in (
+            rows.annotate(
+                cohort=TruncMonth(
+                    "created_at",
+                    tzinfo=timezone.get_default_timezone(),
+                ),
+                offset=cls.get_life(),
+            )
+            .values("cohort", "offset")
+            .annotate(total=Count("pk"))
+            .order_by("cohort", "offset")
+        ):
+            cohorts.setdefault(row["cohort"], {})[row["offset"]] = (
+                row["total"]
+            )
+        logger.debug("Cohorts: %s %s", cls, cohorts)
+        return cohorts
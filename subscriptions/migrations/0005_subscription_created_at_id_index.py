@@ -0,0 +1,20 @@
+# Generated by Django 4.0.3 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("subscriptions", "0004_subscription_price"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="subscription",
+            index=models.Index(
+                fields=["created_at", "id"],
+                name="subscriptio_created_086be6_idx",
+            ),
+        ),
+    ]
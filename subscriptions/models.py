@@ -1,10 +1,10 @@
 from datetime import datetime
 
 from django.db import models
-from django.db.models import Q
 from django.db.models.query import QuerySet
 from events.models import Event
 from products.models import Product
+from searches.models import SearchDocument
 
 
 class ActiveManager(models.Manager):
@@ -31,23 +31,9 @@ class ActiveManager(models.Manager):
                 created_at__lte=end,
             )
         if search:
-            queryset: Queryset = queryset.filter(
-                Q(product__title__icontains=search)
-                | Q(event__client__name__icontains=search)
-                | Q(event__client__email__icontains=search)
-                | Q(product__title__icontains=search)
-                | Q(event__metric__campaign__title__icontains=search)
-                | Q(
-                    event__metric__campaign__audience__title__icontains=search
-                )
-                | Q(
-                    event__metric__campaign__city__title__icontains=search
-                )
-                | Q(
-                    event__metric__campaign__city__state__title__icontains=search
-                )
-                | Q(
-                    event__metric__campaign__city__state__country__title__icontains=search
+            queryset: QuerySet = queryset.filter(
+                pk__in=SearchDocument.objects.match(
+                    self.model, search
                 )
             )
         return queryset
@@ -90,6 +76,11 @@ class Subscription(models.Model):
     objects: models.Manager = models.Manager()
     active: ActiveManager = ActiveManager()
 
+    class Meta:
+        indexes: list = [
+            models.Index(fields=["created_at", "id"]),
+        ]
+
     def __str__(self) -> str:
         """
         String serializer.
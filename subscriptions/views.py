@@ -2,11 +2,11 @@ import logging
 from datetime import datetime
 from typing import List
 
+from analytics.viewsets import BulkViewSet
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
 from subscriptions.models import Subscription
 from subscriptions.serializers import SubscriptionSerializer
@@ -14,7 +14,7 @@ from subscriptions.serializers import SubscriptionSerializer
 logger: logging.RootLogger = logging.getLogger(__name__)
 
 
-class SubscriptionViewSet(ModelViewSet):
+class SubscriptionViewSet(BulkViewSet):
     """
     Subscription Model API View.
     """
@@ -22,29 +22,12 @@ class SubscriptionViewSet(ModelViewSet):
     http_method_names: List[str] = ["get", "post", "put", "delete"]
     queryset: QuerySet = Subscription.objects.all()
     serializer_class: type = SubscriptionSerializer
-
-    def list(self, request: Request) -> Response:
-        """
-        GET /subscriptions
-        """
-        subscriptions: QuerySet = self.get_queryset()
-        if any(
-            [
-                request.query_params.get("search"),
-                request.query_params.get("start"),
-                request.query_params.get("end"),
-            ]
-        ):
-            subscriptions: QuerySet = Subscription.active.search(
-                search=request.query_params.get("search"),
-                start=request.query_params.get("start"),
-                end=request.query_params.get("end"),
-            )
-        serializer: SubscriptionSerializer = self.serializer_class(
-            subscriptions, many=True, context={"request": request}
-        )
-        logger.debug("List: %s", subscriptions)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    bulk_fields: List[str] = [
+        "event",
+        "product",
+        "price",
+        "canceled_at",
+    ]
 
     def create(self, request: Request) -> Response:
         """